@@ -1,4 +1,6 @@
 import os
+import sys
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # LangChain imports
@@ -9,23 +11,76 @@ from langchain_community.vectorstores import Chroma
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain.retrievers.multi_query import MultiQueryRetriever
 
+from answer_cache import AnswerCache
+from embedding_cache import CachedEmbeddings
+from fused_retriever import FusedMultiQueryRetriever, compare_latency
+from incremental_index import MANIFEST_NAME, IncrementalIndexer
+from ingest_pipeline import EMBED_CONCURRENCY, INGEST_WORKERS, stream_pdf_documents
+
 # Load environment variables
 load_dotenv()
 
+# Paths (run from the repository root)
+DATA_DIR = os.path.join(os.getcwd(), "04-RAG", "data")
+VDB_DIR = os.path.join(os.getcwd(), "04-RAG", "db", "climate_vectorstore")
+
+# Splitter settings; changing them re-indexes every chunk (see incremental_index)
+SPLITTER_CONFIG = {
+    "chunk_size": 1000,  # Size of each chunk
+    "chunk_overlap": 200,  # Overlap between chunks to maintain context
+    "separators": [  # Split by these separators in order
+        "\n\nChapter",  # Split by chapters first
+        "\n\n",  # Then by paragraphs
+        "\n",  # Then by lines
+        " ",  # Finally by spaces
+        "",
+    ],
+    "add_start_index": True,  # Track where chunks come from
+}
+
+# PDFs are parsed by INGEST_WORKERS processes (pymupdf); 0 = PyPDFLoader, one
+# file at a time. The loader is part of the index fingerprint because both
+# extract slightly different text
+LOADER = "pymupdf" if INGEST_WORKERS > 0 else "pypdf"
+
+# ================================
+# SHARED CLIENTS
+# ================================
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model="gpt-3.5-turbo", temperature=0.3):
+    """One ChatOpenAI per (model, temperature), reused by every call"""
+    return ChatOpenAI(model=model, temperature=temperature)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings_model():
+    """Embeddings model (cached on disk, shared with the other scripts)"""
+    return CachedEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small"))
+
+
+@lru_cache(maxsize=None)
+def get_answer_cache(vdb_dir=VDB_DIR):
+    """Answer cache, cleared whenever the index manifest of vdb_dir changes"""
+    return AnswerCache(
+        manifest_path=os.path.join(vdb_dir, MANIFEST_NAME),
+        embeddings=get_embeddings_model(),
+    )
+
+
 # ================================
 # STEP 1: DOCUMENT LOADING
 # ================================
 
 
-def load_climate_document():
+def load_climate_document(file_path=None):
     """Load the climate change PDF document"""
     print("📄 Loading climate change document...")
 
     # Set up file path
-    cur_dir = os.getcwd()
-    file_path = os.path.join(
-        cur_dir, "04-RAG", "data", "understanding_climate_change.pdf"
-    )
+    if file_path is None:
+        file_path = os.path.join(DATA_DIR, "Understanding_Climate_Change.pdf")
 
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"PDF file not found at {file_path}")
@@ -48,18 +103,7 @@ def split_documents(documents):
     print("✂️ Splitting documents into chunks...")
 
     # Create text splitter - separates by chapters and topics
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,  # Size of each chunk
-        chunk_overlap=200,  # Overlap between chunks to maintain context
-        separators=[  # Split by these separators in order
-            "\n\nChapter",  # Split by chapters first
-            "\n\n",  # Then by paragraphs
-            "\n",  # Then by lines
-            " ",  # Finally by spaces
-            "",
-        ],
-        add_start_index=True,  # Track where chunks come from
-    )
+    text_splitter = RecursiveCharacterTextSplitter(**SPLITTER_CONFIG)
 
     chunks = text_splitter.split_documents(documents)
 
@@ -76,29 +120,41 @@ def split_documents(documents):
 # ================================
 
 
-def create_vector_store(chunks):
-    """Create embeddings and store in vector database"""
-    print("🔢 Creating embeddings and vector store...")
+def create_vector_store(data_dir=DATA_DIR, vdb_dir=VDB_DIR):
+    """Create or incrementally update the vector store from the PDFs in data_dir"""
+    print("🔢 Syncing embeddings and vector store...")
 
-    # Initialize embeddings model
-    embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small")
+    # Initialize embeddings model (cached on disk, shared with the other scripts)
+    embeddings_model = get_embeddings_model()
 
-    # Set up vector store directory
-    cur_dir = os.getcwd()
-    vdb_dir = os.path.join(cur_dir, "04-RAG", "db", "climate_vectorstore")
+    # Open (or create) the vector store
+    vectorstore = Chroma(persist_directory=vdb_dir, embedding_function=embeddings_model)
 
-    # Create vector store
-    if not os.path.exists(vdb_dir):
-        print("Creating new vector store...")
-        vectorstore = Chroma.from_documents(
-            documents=chunks, embedding=embeddings_model, persist_directory=vdb_dir
-        )
-    else:
-        print("Loading existing vector store...")
-        vectorstore = Chroma(
-            persist_directory=vdb_dir, embedding_function=embeddings_model
-        )
+    # Only new or changed PDFs are parsed, and only new chunks are embedded
+    indexer = IncrementalIndexer(
+        vectorstore,
+        manifest_path=os.path.join(vdb_dir, MANIFEST_NAME),
+        load_fn=load_climate_document,
+        split_fn=split_documents,
+        split_config={**SPLITTER_CONFIG, "loader": LOADER},
+        stream_fn=stream_pdf_documents if INGEST_WORKERS > 0 else None,
+        # Embedding requests for new chunks overlap the parsing of the next PDFs
+        max_concurrency=EMBED_CONCURRENCY,
+    )
+    pdfs = [
+        os.path.join(data_dir, name)
+        for name in os.listdir(data_dir)
+        if name.lower().endswith(".pdf")
+    ]
+    stats = indexer.sync(pdfs)
 
+    print(
+        f"📑 {stats['parsed']} PDFs parsed, {stats['skipped']} unchanged | "
+        f"+{stats['added']} / -{stats['deleted']} chunks "
+        f"({stats['elapsed_ms']:.0f}ms)"
+    )
+    cache = embeddings_model.stats()
+    print(f"📦 Embedding cache: {cache['hits']} hits, {cache['misses']} misses")
     print("✅ Vector store ready!")
     return vectorstore
 
@@ -113,33 +169,71 @@ def setup_retriever(vectorstore):
     print("🔍 Setting up retriever...")
 
     # Initialize LLM for query generation
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-
-    # Create base retriever
-    base_retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 5},  # Retrieve top 5 most similar chunks
+    llm = get_chat_model(temperature=0)
+
+    # Generate query variants once, embed them in one batch, search them in
+    # parallel and merge the results with reciprocal rank fusion
+    retriever = FusedMultiQueryRetriever.from_llm(
+        vectorstore,
+        llm,
+        k=5,  # Retrieve top 5 most similar chunks per query variant
     )
 
-    # Wrap with MultiQueryRetriever for better results
-    retriever = MultiQueryRetriever.from_llm(retriever=base_retriever, llm=llm)
-
     print("✅ Retriever ready!")
     return retriever
 
 
+def setup_multi_query_retriever(vectorstore):
+    """Previous retriever: LangChain's MultiQueryRetriever (for comparison)"""
+    llm = get_chat_model(temperature=0)
+    base_retriever = vectorstore.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": 5},
+    )
+    return MultiQueryRetriever.from_llm(retriever=base_retriever, llm=llm)
+
+
+def compare_retrievers(vectorstore, queries, repeats=1):
+    """Latency of the fused retriever against MultiQueryRetriever"""
+    print("⏱️ Comparing retrievers...")
+    report = compare_latency(
+        {
+            "MultiQueryRetriever": setup_multi_query_retriever(vectorstore),
+            "FusedMultiQueryRetriever": setup_retriever(vectorstore),
+        },
+        queries,
+        repeats,
+    )
+    for name, stats in report.items():
+        print(
+            f"{name:26s} mean {stats['mean_ms']:7.0f}ms | p50 {stats['p50_ms']:7.0f}ms"
+            f" | max {stats['max_ms']:7.0f}ms | {stats['docs']:.1f} docs"
+        )
+    return report
+
+
 # ================================
 # STEP 5: ANSWER GENERATION
 # ================================
 
 
-def generate_answer(query, retriever):
-    """Generate answer using retrieved context"""
+def generate_answer(query, retriever, cache=None):
+    """Generate answer using retrieved context (repeated questions are cached)"""
     print(f"❓ Processing query: {query}")
+    cache = get_answer_cache() if cache is None else cache
 
-    # Retrieve relevant documents
+    # Retrieve relevant documents (skipped when the question was already asked)
     print("🔍 Retrieving relevant information...")
-    relevant_docs = retriever.invoke(query)
+    relevant_docs = cache.get_retrieval(query)
+    if relevant_docs is None:
+        relevant_docs = retriever.invoke(query)
+        cache.put_retrieval(query, relevant_docs)
+
+    # Same question (exact) or a very similar one (semantic) with the same chunks
+    answer, level = cache.get(query, relevant_docs)
+    if answer is not None:
+        print(f"⚡ Answer served from cache ({level} match)")
+        return answer, relevant_docs
 
     # Prepare context from retrieved documents
     context = "\n\n".join(
@@ -164,7 +258,7 @@ Context:
 
     # Generate answer
     print("🤖 Generating answer...")
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.3)
+    llm = get_chat_model()
 
     messages = [
         SystemMessage(content=system_prompt.format(context=context)),
@@ -172,6 +266,7 @@ Context:
     ]
 
     response = llm.invoke(messages)
+    cache.put(query, relevant_docs, response.content)
 
     print("✅ Answer generated!")
     return response.content, relevant_docs
@@ -187,14 +282,8 @@ def build_rag_system():
     print("🚀 Building Climate Change RAG System...")
     print("=" * 50)
 
-    # Step 1: Load documents
-    documents = load_climate_document()
-
-    # Step 2: Split into chunks
-    chunks = split_documents(documents)
-
-    # Step 3: Create vector store
-    vectorstore = create_vector_store(chunks)
+    # Steps 1-3: Load, split and embed only the PDFs that changed
+    vectorstore = create_vector_store()
 
     # Step 4: Setup retriever
     retriever = setup_retriever(vectorstore)
@@ -232,9 +321,6 @@ def ask_question(retriever, query):
 # ================================
 
 if __name__ == "__main__":
-    # Build the RAG system
-    retriever = build_rag_system()
-
     # Example questions about climate change
     sample_questions = [
         "What is climate change?",
@@ -244,6 +330,14 @@ if __name__ == "__main__":
         "How can technology help with climate change mitigation?",
     ]
 
+    # python 04-RAG/RAG_pipeline.py --compare-retrievers
+    if "--compare-retrievers" in sys.argv:
+        compare_retrievers(create_vector_store(), sample_questions)
+        sys.exit(0)
+
+    # Build the RAG system
+    retriever = build_rag_system()
+
     print("\n🎓 DEMO: Asking sample questions...")
 
     # Ask a sample question
@@ -279,5 +373,7 @@ def interactive_chat(retriever):
             print("Please enter a question.")
 
 
-# To run interactive chat:
-interactive_chat(retriever)
+# To run interactive chat (guarded: the ingestion worker processes re-import
+# this file on Windows/macOS):
+if __name__ == "__main__":
+    interactive_chat(retriever)
@@ -0,0 +1,196 @@
+# ================================
+# ANSWER CACHE FOR THE RAG PIPELINE
+# ================================
+#
+# Repeated questions skip the LLM (and the retriever):
+# 1. Exact level: normalized question + hash of the retrieved chunk IDs
+# 2. Semantic level: a differently worded question whose embedding is very
+#    close to a cached one AND that retrieved the same chunks reuses its answer
+# 3. Entries expire after a TTL, and everything is dropped when the vector
+#    index changes (the incremental indexer's manifest is rewritten)
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+SIMILARITY_THRESHOLD = 0.95
+MAX_ANSWERS = 1000
+
+
+def normalize_query(query):
+    """Lowercase, collapse spaces and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+def chunk_id(document):
+    """ID of a retrieved chunk (vector store ID, or a hash of source + text)"""
+    if getattr(document, "id", None):
+        return document.id
+    source = document.metadata.get("source", "")
+    start = document.metadata.get("start_index", "")
+    return hashlib.sha256(
+        f"{source}\0{start}\0{document.page_content}".encode("utf-8")
+    ).hexdigest()
+
+
+def context_key(documents):
+    """Hash of the set of retrieved chunks (order does not matter)"""
+    ids = sorted(chunk_id(document) for document in documents)
+    return hashlib.sha256("\0".join(ids).encode("utf-8")).hexdigest()
+
+
+def index_version(manifest_path):
+    """Changes whenever the indexer rewrites the manifest"""
+    try:
+        info = os.stat(manifest_path)
+    except FileNotFoundError:
+        return None
+    return f"{info.st_size}:{info.st_mtime_ns}"
+
+
+class AnswerCache:
+    """
+    In-memory answer cache with exact and semantic lookups
+
+    Example:
+        cache = AnswerCache(manifest_path, embeddings=embeddings_model)
+        docs = cache.get_retrieval(query) or retriever.invoke(query)
+        answer, level = cache.get(query, docs)  # level: "exact", "semantic" or None
+        cache.put(query, docs, answer)
+    """
+
+    def __init__(
+        self,
+        manifest_path=None,
+        embeddings=None,
+        ttl_s=ANSWER_CACHE_TTL,
+        similarity_threshold=SIMILARITY_THRESHOLD,
+        max_entries=MAX_ANSWERS,
+    ):
+        """
+        Args:
+            manifest_path: Index manifest; when it changes the cache is cleared
+            embeddings: Embeddings for the semantic level (None: exact only)
+            ttl_s: Seconds an answer stays valid
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Answers kept (least recently used are dropped)
+        """
+        self.manifest_path = manifest_path
+        self.embeddings = embeddings
+        self.ttl_s = ttl_s
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._answers = OrderedDict()  # exact key -> entry
+        self._retrievals = OrderedDict()  # normalized query -> (documents, created)
+        self._vectors = {}  # query embedded by a missed get(), reused by put()
+        self._version = self._current_version()
+        self.stats = {"exact": 0, "semantic": 0, "misses": 0, "retrievals": 0}
+
+    def _current_version(self):
+        return index_version(self.manifest_path) if self.manifest_path else None
+
+    def _check_version(self):
+        """Drop everything if the index was rebuilt since the last lookup"""
+        version = self._current_version()
+        if version != self._version:
+            self._answers.clear()
+            self._retrievals.clear()
+            self._vectors.clear()
+            self._version = version
+
+    def _fresh(self, created):
+        return time.time() - created < self.ttl_s
+
+    def _embed(self, query):
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # ================================
+    # RETRIEVAL
+    # ================================
+
+    def get_retrieval(self, query):
+        """Chunks already retrieved for this question, or None"""
+        with self._lock:
+            self._check_version()
+            cached = self._retrievals.get(normalize_query(query))
+            if cached and self._fresh(cached[1]):
+                self.stats["retrievals"] += 1
+                return cached[0]
+        return None
+
+    def put_retrieval(self, query, documents):
+        with self._lock:
+            self._retrievals[normalize_query(query)] = (documents, time.time())
+            self._retrievals.move_to_end(normalize_query(query))
+            while len(self._retrievals) > self.max_entries:
+                self._retrievals.popitem(last=False)
+
+    # ================================
+    # ANSWERS
+    # ================================
+
+    def get(self, query, documents):
+        """
+        Cached answer for this question and context
+
+        Returns:
+            (answer, "exact" | "semantic") or (None, None)
+        """
+        context = context_key(documents)
+        key = f"{normalize_query(query)}\0{context}"
+        with self._lock:
+            self._check_version()
+            entry = self._answers.get(key)
+            if entry and self._fresh(entry["created"]):
+                self._answers.move_to_end(key)
+                self.stats["exact"] += 1
+                return entry["answer"], "exact"
+            candidates = [
+                e
+                for e in self._answers.values()
+                if e["context"] == context
+                and e["vector"] is not None
+                and self._fresh(e["created"])
+            ]
+
+        if self.embeddings is not None and candidates:
+            vector = self._embed(query)
+            best = max(candidates, key=lambda e: float(vector @ e["vector"]))
+            if float(vector @ best["vector"]) >= self.similarity_threshold:
+                with self._lock:
+                    self.stats["semantic"] += 1
+                return best["answer"], "semantic"
+            with self._lock:
+                self._vectors[normalize_query(query)] = vector
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None, None
+
+    def put(self, query, documents, answer):
+        normalized = normalize_query(query)
+        with self._lock:
+            vector = self._vectors.pop(normalized, None)
+        if vector is None and self.embeddings is not None:
+            vector = self._embed(query)
+        context = context_key(documents)
+        key = f"{normalized}\0{context}"
+        with self._lock:
+            self._answers[key] = {
+                "answer": answer,
+                "context": context,
+                "vector": vector,
+                "created": time.time(),
+            }
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_entries:
+                self._answers.popitem(last=False)
@@ -8,6 +8,8 @@ from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import CharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
 
+from embedding_cache import CachedEmbeddings
+
 # ================================
 # EXAMPLE 1: Create FAISS Vector Store
 # ================================
@@ -22,6 +24,9 @@ embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small")
 # Option 2: Ollama embeddings (comment/uncomment to switch)
 # embeddings_model = OllamaEmbeddings(model="mxbai-embed-large:latest")
 
+# Cache embeddings on disk: text already embedded (by any script) is reused
+embeddings_model = CachedEmbeddings(embeddings_model)
+
 # Load and chunk documents
 loader = PyPDFLoader("04-RAG/data/Understanding_Climate_Change.pdf")
 docs = loader.load()
@@ -29,7 +34,7 @@ docs = loader.load()
 splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
 chunks = splitter.split_documents(docs)
 
-print(f"Model being used: {type(embeddings_model).__name__}")
+print(f"Model being used: {embeddings_model.namespace}")
 print(f"Number of chunks: {len(chunks)}")
 
 # Create FAISS vector store
@@ -167,3 +172,5 @@ print("- You need fast retrieval")
 print("- Working with large document collections")
 print("- Want to experiment with different search parameters")
 print("- Need to enrich context with many similar chunks")
+
+print(f"\n📦 Embedding cache: {embeddings_model.stats()}")
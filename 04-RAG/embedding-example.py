@@ -5,6 +5,8 @@
 from langchain_openai import OpenAIEmbeddings
 from langchain_ollama import OllamaEmbeddings
 
+from embedding_cache import CachedEmbeddings
+
 
 # ================================
 # EXAMPLE 1: Basic Embeddings
@@ -18,6 +20,9 @@ from langchain_ollama import OllamaEmbeddings
 # Option 2: Ollama embeddings (comment/uncomment to switch)
 embeddings_model = OllamaEmbeddings(model="mxbai-embed-large:latest")
 
+# Cache embeddings on disk: text already embedded (by any script) is reused
+embeddings_model = CachedEmbeddings(embeddings_model)
+
 
 # ================================
 # EXAMPLE: Chunk Embedding
@@ -109,3 +114,5 @@ print(f"'{word3}' first 10: {word_embeddings[2][:10]}")
 
 print("\nNotice: Similar words (climate/weather) have more similar numbers")
 print("than different words (climate/banana)")
+
+print(f"\n📦 Embedding cache: {embeddings_model.stats()}")
@@ -0,0 +1,311 @@
+# ================================
+# PERSISTENT EMBEDDING CACHE
+# ================================
+#
+# Wraps any LangChain embeddings object so identical text is embedded once:
+# 1. Key = hash of model name + text; the same chunk embedded by another
+#    script (or another run) is read back instead of sent to the API
+# 2. Vectors live in memory-mapped float32 files (one per dimension) and an
+#    SQLite table maps each key to its slot in that file
+# 3. Lookups are batched, the cache is capped with LRU eviction and hit/miss
+#    counters show how much work was saved
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+CACHE_DIR = os.path.join(os.getcwd(), "04-RAG", "db", "embedding_cache")
+MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# SQLite limits the number of parameters per statement
+_SQL_BATCH = 500
+_INITIAL_SLOTS = 1024
+# Seconds a process waits for another one holding the index lock
+_BUSY_TIMEOUT = 60
+
+
+def model_name(embeddings):
+    """Name that identifies the embedding model (vectors differ per model)"""
+    name = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", "")
+    return f"{type(embeddings).__name__}:{name}"
+
+
+def text_key(model, text, kind="document"):
+    """Cache key of one text; queries get their own key (some models differ)"""
+    return hashlib.sha256(f"{model}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """SQLite key index + memory-mapped float32 vectors, with LRU eviction"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=MAX_ENTRIES):
+        """
+        Args:
+            cache_dir: Directory for index.sqlite and the vectors_<dim>.f32 files
+            max_entries: Vectors kept before the least recently used are evicted
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._maps = {}
+
+        # Autocommit mode: transactions are opened explicitly with BEGIN
+        # IMMEDIATE (see _transaction), so other processes wait instead of failing
+        self._db = sqlite3.connect(
+            os.path.join(cache_dir, "index.sqlite"),
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=_BUSY_TIMEOUT,
+        )
+        self._enable_wal()
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS files (
+                dim INTEGER PRIMARY KEY,
+                next_slot INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS free_slots (
+                dim INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                PRIMARY KEY (dim, slot)
+            );
+            """
+        )
+
+    def _enable_wal(self):
+        """
+        Switch the index to WAL, retrying while another process holds it
+
+        The switch needs an exclusive lock and fails with "database is locked"
+        without waiting on the busy timeout, e.g. when several processes open
+        a new cache directory at the same time.
+        """
+        deadline = time.monotonic() + _BUSY_TIMEOUT
+        while True:
+            try:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    # ================================
+    # VECTOR FILES
+    # ================================
+
+    def _path(self, dim):
+        return os.path.join(self.cache_dir, f"vectors_{dim}.f32")
+
+    def _map(self, dim, min_slots=0):
+        """Memory map of the vectors of one dimension, grown to min_slots"""
+        vectors = self._maps.get(dim)
+        if vectors is not None and len(vectors) >= min_slots:
+            return vectors
+
+        # Release the old map before resizing (required on Windows)
+        self._maps.pop(dim, None)
+        del vectors
+        path = self._path(dim)
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        slots = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if slots < min_slots or slots == 0:
+            # Grow by doubling so appends stay amortized O(1)
+            slots = max(min_slots, slots * 2, _INITIAL_SLOTS)
+            with open(path, "ab") as f:
+                f.truncate(slots * row_bytes)
+        vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(slots, dim))
+        self._maps[dim] = vectors
+        return vectors
+
+    # ================================
+    # LOOKUP / STORE
+    # ================================
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Write lock on the index, shared by every process using this cache_dir
+
+        Slots are allocated, written and reused (after eviction) under this
+        lock, and reads take it too: a slot read outside it could be reused
+        for another text by a different process between the SELECT and the
+        read of the vector.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def get_many(self, keys):
+        """Vectors of the keys found in the cache: {key: list of floats}"""
+        found = {}
+        with self._transaction():
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start : start + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, dim, slot FROM entries WHERE key IN ({marks})", batch
+                ).fetchall()
+                for key, dim, slot in rows:
+                    found[key] = self._map(dim, slot + 1)[slot].tolist()
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return found
+
+    def put_many(self, items):
+        """Store {key: vector}; evicts the least recently used beyond the cap"""
+        if not items:
+            return 0
+        now = time.time()
+        with self._transaction():
+            for key, vector in items.items():
+                vector = np.asarray(vector, dtype=np.float32)
+                dim = len(vector)
+                row = self._db.execute(
+                    "SELECT slot FROM entries WHERE key = ? AND dim = ?", (key, dim)
+                ).fetchone()
+                slot = row[0] if row else self._allocate(dim)
+                self._map(dim, slot + 1)[slot] = vector
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, dim, slot, now),
+                )
+            # Vectors reach the file before the index rows become visible
+            for vectors in self._maps.values():
+                vectors.flush()
+            evicted = self._evict()
+        return evicted
+
+    def _allocate(self, dim):
+        row = self._db.execute(
+            "SELECT slot FROM free_slots WHERE dim = ? LIMIT 1", (dim,)
+        ).fetchone()
+        if row:
+            self._db.execute(
+                "DELETE FROM free_slots WHERE dim = ? AND slot = ?", (dim, row[0])
+            )
+            return row[0]
+        row = self._db.execute(
+            "SELECT next_slot FROM files WHERE dim = ?", (dim,)
+        ).fetchone()
+        slot = row[0] if row else 0
+        self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?)", (dim, slot + 1))
+        return slot
+
+    def _evict(self):
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        rows = self._db.execute(
+            "SELECT key, dim, slot FROM entries ORDER BY last_used LIMIT ?", (excess,)
+        ).fetchall()
+        self._db.executemany(
+            "DELETE FROM entries WHERE key = ?", [(r[0],) for r in rows]
+        )
+        # Freed slots are reused by the next inserts, so the files stop growing
+        self._db.executemany(
+            "INSERT OR IGNORE INTO free_slots VALUES (?, ?)", [r[1:] for r in rows]
+        )
+        return len(rows)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for vectors in self._maps.values():
+                vectors.flush()
+            self._maps.clear()
+            self._db.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper backed by an EmbeddingStore
+
+    Example:
+        embeddings_model = CachedEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small"))
+        Chroma(..., embedding_function=embeddings_model)
+        print(embeddings_model.stats())
+    """
+
+    def __init__(self, embeddings, store=None, namespace=None):
+        """
+        Args:
+            embeddings: Any LangChain embeddings object (OpenAI, Ollama, ...)
+            store: Shared EmbeddingStore (default: one at CACHE_DIR)
+            namespace: Model name used in the keys (default: class + model)
+        """
+        self.embeddings = embeddings
+        # Not `store or ...`: an empty store has len() 0
+        self.store = EmbeddingStore() if store is None else store
+        self.namespace = namespace or model_name(embeddings)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()  # Counters are shared by writer threads
+
+    def _embed(self, texts, kind, embed_fn):
+        keys = [text_key(self.namespace, text, kind) for text in texts]
+        cached = self.store.get_many(list(dict.fromkeys(keys)))
+
+        # Each distinct missing text is embedded once, in a single batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        # Repeats inside the batch count as hits: they are not embedded again
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            new = dict(zip(missing, vectors))
+            evicted = self.store.put_many(new)
+            with self._lock:
+                self.evictions += evicted
+            cached.update(new)
+        return [list(cached[key]) for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(texts, "document", self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed(
+            [text], "query", lambda texts: [self.embeddings.embed_query(texts[0])]
+        )[0]
+
+    def stats(self):
+        """Hits, misses, hit rate, evictions and entries stored"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.store),
+        }
@@ -0,0 +1,235 @@
+# ================================
+# INCREMENTAL, CONTENT-HASHED INDEXING
+# ================================
+#
+# Keeps a vector store in sync with a directory of PDFs without rebuilding it:
+# 1. A JSON manifest stores, per source file, its size/mtime, its content hash
+#    and the IDs of the chunks it produced
+# 2. Unchanged files (same size and mtime, or same content hash) are never
+#    parsed again, so a restart with nothing changed takes milliseconds
+# 3. Chunk IDs hash the chunk text together with the splitter settings, so
+#    only new or changed chunks are embedded and stale ones are deleted
+# 4. Changed files can be parsed in parallel (stream_fn) and new chunks are
+#    embedded in batches while the next files are parsed (BatchWriter)
+
+import hashlib
+import json
+import os
+import time
+
+from ingest_pipeline import EMBED_BATCH_SIZE, BatchWriter
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "index_manifest.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash of the file contents (read in blocks)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_fingerprint(config):
+    """Stable hash of the splitter settings (any JSON-serializable dict)"""
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def chunk_ids(chunks, fingerprint):
+    """
+    One ID per chunk: hash of splitter fingerprint + source + chunk text
+
+    Identical chunks inside the same source get an occurrence suffix, so
+    every ID in a batch is unique.
+    """
+    ids = []
+    seen = {}
+    for chunk in chunks:
+        source = str(chunk.metadata.get("source", ""))
+        digest = hashlib.sha256(
+            f"{fingerprint}\0{source}\0{chunk.page_content}".encode("utf-8")
+        ).hexdigest()[:32]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return ids
+
+
+class IncrementalIndexer:
+    """Syncs a LangChain vector store (Chroma) with a set of source files"""
+
+    def __init__(
+        self,
+        vectorstore,
+        manifest_path,
+        load_fn,
+        split_fn,
+        split_config,
+        stream_fn=None,
+        batch_size=EMBED_BATCH_SIZE,
+        max_concurrency=1,
+    ):
+        """
+        Args:
+            vectorstore: Vector store with add_documents(ids=...), delete(ids=...)
+                and get() (e.g. Chroma)
+            manifest_path: JSON file that records what is already indexed
+            load_fn: load_fn(path) -> list of Documents (e.g. one per page)
+            split_fn: split_fn(documents) -> list of chunk Documents
+            split_config: Settings used by split_fn; changing them re-indexes
+            stream_fn: stream_fn(paths) -> iterator of (path, Documents) in any
+                order (e.g. stream_pdf_documents); replaces load_fn
+            batch_size: Chunks per add_documents call (one embedding request)
+            max_concurrency: add_documents calls in flight at the same time
+        """
+        self.vectorstore = vectorstore
+        self.manifest_path = manifest_path
+        self.load_fn = load_fn
+        self.split_fn = split_fn
+        self.stream_fn = stream_fn or self._load_each
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.fingerprint = config_fingerprint(split_config)
+        self.manifest = self._read_manifest()
+
+    # ================================
+    # MANIFEST
+    # ================================
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self):
+        # Write to a temporary file first so a crash never leaves half a manifest
+        temporary = f"{self.manifest_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(temporary, self.manifest_path)
+
+    def _reset_store(self):
+        """Drop chunks that were indexed without a manifest (or with an old one)"""
+        existing = self.vectorstore.get(include=[])["ids"]
+        if existing:
+            self.vectorstore.delete(ids=existing)
+        self.manifest = {
+            "version": MANIFEST_VERSION,
+            "splitter": self.fingerprint,
+            "sources": {},
+        }
+        return len(existing)
+
+    # ================================
+    # SYNC
+    # ================================
+
+    def sync(self, paths):
+        """
+        Index new and changed files, and remove the chunks of deleted files
+
+        Args:
+            paths: Source files that should be in the index
+
+        Returns:
+            Dict with parsed, skipped, added, deleted and elapsed_ms
+        """
+        start = time.perf_counter()
+        stats = {"parsed": 0, "skipped": 0, "added": 0, "deleted": 0}
+
+        changed = False
+        if self.manifest is None or self.manifest["splitter"] != self.fingerprint:
+            stats["deleted"] += self._reset_store()
+            changed = True
+        sources = self.manifest["sources"]
+
+        wanted = {os.path.abspath(path) for path in paths}
+        for source in sorted(set(sources) - wanted):
+            ids = sources.pop(source)["chunks"]
+            if ids:
+                self.vectorstore.delete(ids=ids)
+            stats["deleted"] += len(ids)
+            changed = True
+
+        to_parse = {}
+        for path in sorted(wanted):
+            entry = sources.get(path)
+            info = os.stat(path)
+            signature = {"size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+            # Cheapest check first: same size and mtime means same file
+            if entry and all(entry[k] == v for k, v in signature.items()):
+                stats["skipped"] += 1
+                continue
+            sha256 = file_sha256(path)
+            if entry and entry["sha256"] == sha256:
+                entry.update(signature)  # Touched, not modified
+                stats["skipped"] += 1
+                changed = True
+                continue
+            to_parse[path] = {**signature, "sha256": sha256}
+
+        if to_parse:
+            self._index_files(to_parse, stats)
+            changed = True
+
+        if changed:
+            self._write_manifest()
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return stats
+
+    def _load_each(self, paths):
+        for path in paths:
+            yield path, self.load_fn(path)
+
+    def _index_files(self, to_parse, stats):
+        """Parse, split and embed the changed files, streaming batches"""
+        sources = self.manifest["sources"]
+        writer = BatchWriter(self.vectorstore, self.batch_size, self.max_concurrency)
+
+        def record(done):
+            # A file enters the manifest only after all its chunks are stored,
+            # so an interrupted sync resumes where it stopped
+            for path, entry in done:
+                sources[path] = entry
+            if done:
+                self._write_manifest()
+
+        try:
+            for path, documents in self.stream_fn(list(to_parse)):
+                ids, new, stale = self._diff_file(path, documents, sources.get(path))
+                if stale:
+                    self.vectorstore.delete(ids=stale)
+                writer.add(
+                    [chunk for _, chunk in new],
+                    [i for i, _ in new],
+                    tag=(path, {**to_parse[path], "chunks": ids}),
+                )
+                stats["parsed"] += 1
+                stats["added"] += len(new)
+                stats["deleted"] += len(stale)
+                record(writer.drain())
+            writer.flush()
+        finally:
+            writer.close()
+            record(writer.drain())
+
+    def _diff_file(self, path, documents, entry):
+        """Split one parsed file; returns (chunk ids, new (id, chunk), stale ids)"""
+        chunks = self.split_fn(documents)
+        for chunk in chunks:
+            chunk.metadata["source"] = path
+        ids = chunk_ids(chunks, self.fingerprint)
+
+        old_ids = set(entry["chunks"]) if entry else set()
+        new = [(i, c) for i, c in zip(ids, chunks) if i not in old_ids]
+        stale = sorted(old_ids - set(ids))
+        return ids, new, stale
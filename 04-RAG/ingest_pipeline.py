@@ -0,0 +1,223 @@
+# ================================
+# PARALLEL, BATCHED PDF INGESTION
+# ================================
+#
+# Streams a directory of PDFs into a vector store without separate full passes:
+# 1. Page extraction runs in a process pool (pymupdf), in page ranges, so big
+#    PDFs are spread across cores too
+# 2. A generator yields each PDF's pages as soon as all its ranges finish,
+#    while the remaining files are still being parsed
+# 3. A BatchWriter groups chunks into fixed-size batches and embeds/stores
+#    them in a few threads, so parsing (CPU) overlaps embedding (I/O)
+
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from langchain_core.documents import Document
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+PAGES_PER_TASK = 16
+EMBED_BATCH_SIZE = 64
+EMBED_CONCURRENCY = 4
+
+
+# ================================
+# PAGE EXTRACTION (PROCESS POOL)
+# ================================
+
+
+def count_pages(path):
+    """Number of pages (only reads the PDF structure, not the text)"""
+    import pymupdf
+
+    with pymupdf.open(path) as pdf:
+        return pdf.page_count
+
+
+def extract_pages(path, start, stop):
+    """Text of pages [start, stop) of one PDF; runs in a worker process"""
+    import pymupdf
+
+    with pymupdf.open(path) as pdf:
+        return [pdf[number].get_text() for number in range(start, stop)]
+
+
+def stream_pdf_documents(
+    paths, max_workers=INGEST_WORKERS, pages_per_task=PAGES_PER_TASK
+):
+    """
+    Parse PDFs in parallel and yield them in the order they finish
+
+    Args:
+        paths: PDF files to parse
+        max_workers: Worker processes
+        pages_per_task: Pages extracted per task (a large PDF becomes many tasks)
+
+    Yields:
+        (path, one Document per page), with source/page metadata like PyPDFLoader
+    """
+    tasks = (
+        (path, start, min(start + pages_per_task, total))
+        for path, total in ((path, count_pages(path)) for path in paths)
+        for start in range(0, max(total, 1), pages_per_task)
+    )
+    ranges_left = {}  # path -> ranges still being parsed
+    pages = {}  # path -> {start: page texts}
+    futures = {}
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+
+        def submit(limit):
+            # Bounded: thousands of files never sit in the queue at once
+            for path, start, stop in itertools.islice(tasks, limit):
+                ranges_left[path] = ranges_left.get(path, 0) + 1
+                future = pool.submit(extract_pages, path, start, stop)
+                futures[future] = (path, start)
+
+        submit(max_workers * 2)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, start = futures.pop(future)
+                pages.setdefault(path, {})[start] = future.result()
+                ranges_left[path] -= 1
+                if ranges_left[path] == 0:
+                    del ranges_left[path]
+                    texts = [
+                        text
+                        for _, chunk in sorted(pages.pop(path).items())
+                        for text in chunk
+                    ]
+                    yield (
+                        path,
+                        [
+                            Document(
+                                page_content=text,
+                                metadata={
+                                    "source": path,
+                                    "page": number,
+                                    "total_pages": len(texts),
+                                },
+                            )
+                            for number, text in enumerate(texts)
+                        ],
+                    )
+            submit(len(done))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ================================
+# BATCHED EMBEDDING (THREAD POOL)
+# ================================
+
+
+class _Pending:
+    def __init__(self, tag, remaining):
+        self.tag = tag
+        self.remaining = remaining
+
+
+class BatchWriter:
+    """
+    Adds documents to a vector store in fixed-size batches from a few threads
+
+    Each batch is one add_documents call (one embedding request). At most
+    max_concurrency batches are in flight: add() blocks beyond that, which
+    also slows down the parser instead of buffering the whole corpus.
+
+    Example:
+        writer = BatchWriter(vectorstore)
+        writer.add(chunks, ids, tag=path)
+        writer.drain()  # tags whose documents are all stored
+        writer.flush()
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        batch_size=EMBED_BATCH_SIZE,
+        max_concurrency=EMBED_CONCURRENCY,
+    ):
+        self.vectorstore = vectorstore
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="embed"
+        )
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._futures = set()
+        self._done = deque()
+        self._error = None
+        self.batches = 0
+
+    def add(self, documents, ids, tag=None):
+        """Queue documents; tag shows up in drain() once all of them are stored"""
+        self._raise_error()
+        if not documents:
+            self._done.append(tag)
+            return
+        pending = _Pending(tag, len(documents))
+        self._buffer.extend(
+            (document, id_, pending) for document, id_ in zip(documents, ids)
+        )
+        while len(self._buffer) >= self.batch_size:
+            self._submit()
+
+    def drain(self):
+        """Tags completed since the last call"""
+        done = []
+        while self._done:
+            done.append(self._done.popleft())
+        return done
+
+    def flush(self):
+        """Write what is buffered and wait for every batch in flight"""
+        while self._buffer:
+            self._submit()
+        wait(list(self._futures))
+        self._raise_error()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _submit(self):
+        batch = self._buffer[: self.batch_size]
+        self._buffer = self._buffer[self.batch_size :]
+        self._slots.acquire()
+        future = self._executor.submit(self._write, batch)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._finished)
+        self.batches += 1
+
+    def _write(self, batch):
+        self.vectorstore.add_documents(
+            [document for document, _, _ in batch], ids=[id_ for _, id_, _ in batch]
+        )
+        with self._lock:
+            for _, _, pending in batch:
+                pending.remaining -= 1
+                if pending.remaining == 0:
+                    self._done.append(pending.tag)
+
+    def _finished(self, future):
+        with self._lock:
+            self._futures.discard(future)
+            if future.exception() is not None and self._error is None:
+                self._error = future.exception()
+        self._slots.release()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
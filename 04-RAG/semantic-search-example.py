@@ -8,6 +8,8 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_ollama import OllamaEmbeddings
 from langchain_chroma import Chroma
 
+from embedding_cache import CachedEmbeddings
+
 load_dotenv()
 
 # ================================
@@ -28,10 +30,13 @@ print(f"Database directory: {vdb_dir}")
 # Option 2: Ollama embeddings (comment/uncomment to switch)
 embeddings_model = OllamaEmbeddings(model="mxbai-embed-large:latest")
 
+# Cache embeddings on disk: text already embedded (by any script) is reused
+embeddings_model = CachedEmbeddings(embeddings_model)
+
 # Connect to existing vector database
 db = Chroma(persist_directory=vdb_dir, embedding_function=embeddings_model)
 
-print(f"Model being used: {type(embeddings_model).__name__}")
+print(f"Model being used: {embeddings_model.namespace}")
 print("✅ Connected to vector database!")
 
 # ================================
@@ -120,3 +125,5 @@ print("2. Database compares your vector to all stored chunk vectors")
 print("3. Finds chunks with most similar vectors (closest meaning)")
 print("4. Returns the most relevant chunks")
 print("5. This is called 'semantic search' - search by meaning!")
+
+print(f"\n📦 Embedding cache: {embeddings_model.stats()}")
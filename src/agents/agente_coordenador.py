@@ -1,9 +1,77 @@
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from utils.state import StateSuporteSimples
-from memory.workflow_memory import checkpointer as default_checkpointer, in_memory_store
+from langchain_core.output_parsers import PydanticOutputParser
+from utils.state import StateSuporteSimples, ResultadoTriagem
+from utils.historico import RedutorHistorico
+from utils.pool_llm import obter_llm, obter_chain
+from utils.indice_palavras import IndicePalavrasChave
+from agents.agente_tecnico import (
+    KNOWLEDGE_BASE_TECNICO,
+    SINONIMOS_TECNICO,
+    PALAVRAS_COMPLEXAS,
+)
+from agents.agente_financeiro import PALAVRAS_FINANCEIRAS
+from agents.agente_geral import PALAVRAS_INFO_EMPRESA
+from memory.workflow_memory import obter_checkpointer, obter_store
+
+# --- Prompts de Triagem (compilados uma vez, no import) ---
+
+PROMPT_CATEGORIZACAO = ChatPromptTemplate.from_template(
+    """
+    Analise a seguinte consulta de cliente e categorize em uma dessas opções:
+    - Technical: Problemas técnicos, bugs, funcionalidades.
+    - Billing: Questões financeiras, cobranças, pagamentos.
+    - General: Informações gerais, horários, políticas.
+    
+    Consulta: {query}
+    
+    Responda apenas com uma palavra: Technical, Billing ou General
+    """
+)
+
+PROMPT_SENTIMENTO = ChatPromptTemplate.from_template(
+    """
+    Analise o sentimento da seguinte consulta de cliente:
+    
+    Consulta: {query}
+    
+    Classifique como:
+    - Positive: Cliente satisfeito, elogiando.
+    - Neutral: Consulta neutra, apenas pergunta.
+    - Negative: Cliente insatisfeito, reclamando, frustrado.
+    
+    Responda apenas: Positive, Neutral ou Negative
+    """
+)
+
+PROMPT_TRIAGEM_CONJUNTA = ChatPromptTemplate.from_template(
+    """
+    Faça a triagem da consulta de cliente abaixo e responda em JSON.
+
+    category:
+    - Technical: Problemas técnicos, bugs, funcionalidades.
+    - Billing: Questões financeiras, cobranças, pagamentos.
+    - General: Informações gerais, horários, políticas.
+
+    sentiment:
+    - Positive: Cliente satisfeito, elogiando.
+    - Neutral: Consulta neutra, apenas pergunta.
+    - Negative: Cliente insatisfeito, reclamando, frustrado.
+
+    priority:
+    - High: Sentimento negativo.
+    - Medium: Questões financeiras ou problemas técnicos neutros.
+    - Low: Demais casos.
+
+    Responda apenas com o JSON no formato:
+    {{"category": "...", "sentiment": "...", "priority": "..."}}
+
+    Consulta: {query}
+    """
+)
+
+PARSER_TRIAGEM = PydanticOutputParser(pydantic_object=ResultadoTriagem)
+
 
 # --- Definição das Ferramentas (Tools) ---
 
@@ -19,23 +87,15 @@ def categorizar_consulta(query: str) -> str:
     Returns:
         str: Uma das categorias: Technical, Billing ou General.
     """
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    prompt = ChatPromptTemplate.from_template(
-        """
-        Analise a seguinte consulta de cliente e categorize em uma dessas opções:
-        - Technical: Problemas técnicos, bugs, funcionalidades.
-        - Billing: Questões financeiras, cobranças, pagamentos.
-        - General: Informações gerais, horários, políticas.
-        
-        Consulta: {query}
-        
-        Responda apenas com uma palavra: Technical, Billing ou General
-        """
-    )
-    chain = prompt | llm
+    chain = obter_chain("categorizar", PROMPT_CATEGORIZACAO)
     return chain.invoke({"query": query}).content.strip()
 
 
+async def _acategorizar_consulta(query: str) -> str:
+    chain = obter_chain("categorizar", PROMPT_CATEGORIZACAO)
+    return (await chain.ainvoke({"query": query})).content.strip()
+
+
 @tool
 def analisar_sentimento(query: str) -> str:
     """
@@ -47,25 +107,51 @@ def analisar_sentimento(query: str) -> str:
     Returns:
         str: Positive, Neutral ou Negative.
     """
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    prompt = ChatPromptTemplate.from_template(
-        """
-        Analise o sentimento da seguinte consulta de cliente:
-        
-        Consulta: {query}
-        
-        Classifique como:
-        - Positive: Cliente satisfeito, elogiando.
-        - Neutral: Consulta neutra, apenas pergunta.
-        - Negative: Cliente insatisfeito, reclamando, frustrado.
-        
-        Responda apenas: Positive, Neutral ou Negative
-        """
-    )
-    chain = prompt | llm
+    chain = obter_chain("sentimento", PROMPT_SENTIMENTO)
     return chain.invoke({"query": query}).content.strip()
 
 
+async def _aanalisar_sentimento(query: str) -> str:
+    chain = obter_chain("sentimento", PROMPT_SENTIMENTO)
+    return (await chain.ainvoke({"query": query})).content.strip()
+
+
+@tool
+def classificar_consulta(query: str) -> dict:
+    """
+    Classifica a consulta em uma única chamada: categoria, sentimento e prioridade.
+
+    Args:
+        query: A consulta do cliente.
+
+    Returns:
+        dict: {"category": ..., "sentiment": ..., "priority": ...} validado
+        contra CategoryType, SentimentType e PriorityType.
+    """
+    return _chain_triagem_conjunta().invoke({"query": query}).model_dump(mode="json")
+
+
+async def _aclassificar_consulta(query: str) -> dict:
+    resultado = await _chain_triagem_conjunta().ainvoke({"query": query})
+    return resultado.model_dump(mode="json")
+
+
+def _chain_triagem_conjunta():
+    # JSON mode garante uma resposta parseável; o parser valida os enums
+    return obter_chain(
+        "triagem_conjunta",
+        PROMPT_TRIAGEM_CONJUNTA,
+        parser=PARSER_TRIAGEM,
+        response_format={"type": "json_object"},
+    )
+
+
+# Versões assíncronas usadas por ainvoke (sem ocupar uma thread por chamada)
+categorizar_consulta.coroutine = _acategorizar_consulta
+analisar_sentimento.coroutine = _aanalisar_sentimento
+classificar_consulta.coroutine = _aclassificar_consulta
+
+
 @tool
 def determinar_prioridade(categoria: str, sentimento: str) -> str:
     """
@@ -108,6 +194,89 @@ def determinar_rota(categoria: str, sentimento: str) -> str:
     return "agent_geral"
 
 
+# --- Pré-classificação por Regras (sem LLM) ---
+
+# Mesmos vocabulários usados pelas tools dos agentes especialistas
+INDICE_CATEGORIAS = IndicePalavrasChave(
+    {
+        "Technical": [
+            *KNOWLEDGE_BASE_TECNICO,
+            *(s for sinonimos in SINONIMOS_TECNICO.values() for s in sinonimos),
+            *PALAVRAS_COMPLEXAS,
+        ],
+        "Billing": PALAVRAS_FINANCEIRAS,
+        "General": [p for palavras in PALAVRAS_INFO_EMPRESA.values() for p in palavras],
+    }
+)
+
+PALAVRAS_NEGATIVAS = [
+    "irritado",
+    "irritada",
+    "absurdo",
+    "pessimo",
+    "horrivel",
+    "revoltado",
+    "revoltada",
+    "inaceitavel",
+    "raiva",
+    "cansei",
+    "decepcionado",
+    "decepcionada",
+]
+INDICE_NEGATIVO = IndicePalavrasChave({"Negative": PALAVRAS_NEGATIVAS})
+
+# Fração mínima da pontuação que a categoria vencedora precisa ter
+LIMIAR_CONFIANCA_REGRAS = 0.8
+# Palavras-chave distintas exigidas: uma só palavra fraca daria confiança 1.0
+MIN_PALAVRAS_REGRAS = 2
+
+
+def pre_classificar_consulta(query: str):
+    """
+    Classifica a categoria da consulta por palavras-chave quando não há ambiguidade
+
+    O sentimento não é inferido aqui: a ausência de palavras negativas não
+    indica tom neutro, então ele continua vindo do LLM.
+
+    Args:
+        query: A consulta do cliente.
+
+    Returns:
+        dict com category e confianca quando a confiança atinge
+        LIMIAR_CONFIANCA_REGRAS com pelo menos MIN_PALAVRAS_REGRAS
+        palavras-chave; None quando o LLM deve decidir.
+    """
+    ocorrencias = INDICE_CATEGORIAS.buscar_detalhado(query)
+    if not ocorrencias:
+        return None
+
+    categoria, pontuacao, palavras = ocorrencias[0]
+    confianca = pontuacao / sum(p for _, p, _ in ocorrencias)
+    if confianca < LIMIAR_CONFIANCA_REGRAS or palavras < MIN_PALAVRAS_REGRAS:
+        return None
+
+    return {"category": categoria, "confianca": confianca}
+
+
+def estimar_prioridade(query: str) -> str:
+    """
+    Prioridade provável da consulta só por palavras-chave (sem LLM)
+
+    Ordena a admissão dos tickets antes da triagem (ver AgendadorTickets);
+    a prioridade definitiva continua vindo da triagem.
+
+    Args:
+        query: A consulta do cliente.
+
+    Returns:
+        str: A prioridade estimada: High, Medium ou Low.
+    """
+    ocorrencias = INDICE_CATEGORIAS.buscar(query)
+    categoria = ocorrencias[0][0] if ocorrencias else "General"
+    sentimento = "Negative" if INDICE_NEGATIVO.contem(query) else "Neutral"
+    return determinar_prioridade.func(categoria, sentimento)
+
+
 # --- Lista de Tools do Coordenador ---
 coordenador_tools = [
     categorizar_consulta,
@@ -148,12 +317,20 @@ class AgenteCoordenador:
     Agente Coordenador usando create_react_agent - versão minimalista.
     """
 
-    def __init__(self):
+    def __init__(self, store=None):
+        """
+        Args:
+            store: Store de longo prazo do LangGraph (padrão: StoreSQLite global)
+        """
+        # Import tardio: langgraph.prebuilt só é carregado se o agente for usado
+        from langgraph.prebuilt import create_react_agent
+
         self.agent = create_react_agent(
-            model=ChatOpenAI(model="gpt-4o-mini"),
+            model=obter_llm("gpt-4o-mini", temperature=None),
             tools=coordenador_tools,
             prompt=coordenador_prompt,
             state_schema=StateSuporteSimples,
-            checkpointer=default_checkpointer,
-            store=in_memory_store,
+            pre_model_hook=RedutorHistorico(),
+            checkpointer=obter_checkpointer(),
+            store=store if store is not None else obter_store(),
         )
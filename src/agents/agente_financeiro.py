@@ -1,7 +1,8 @@
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
 from utils.state import StateSuporteSimples
+from utils.historico import RedutorHistorico
+from utils.pool_llm import obter_llm
+from utils.reembolso import FAIXAS_REEMBOLSO, percentual_reembolso
 
 # --- Base de Conhecimento Financeiro ---
 
@@ -11,6 +12,23 @@ SISTEMA_FINANCEIRO = {
     "prazo_processamento_estorno": "Estornos no cartão de crédito são processados em até 5 dias úteis e podem levar até duas faturas para aparecer.",
 }
 
+# Vocabulário que identifica consultas financeiras
+PALAVRAS_FINANCEIRAS = [
+    "reembolso",
+    "estorno",
+    "pagamento",
+    "pagar",
+    "cobranca",
+    "cobrado",
+    "cobrada",
+    "fatura",
+    "boleto",
+    "pix",
+    "cartao",
+    "duplicata",
+    "nota fiscal",
+]
+
 # --- Ferramentas do Agente Financeiro ---
 
 
@@ -49,21 +67,15 @@ def calcular_reembolso(valor_original: float, dias_desde_compra: int) -> str:
     Returns:
         str: Uma string informando se o cliente é elegível, o percentual e o valor do reembolso.
     """
-    if dias_desde_compra <= 30:
-        percentual = 100
-    elif dias_desde_compra <= 60:
-        percentual = 50
-    else:
-        percentual = 0
+    # Faixas compartilhadas com o cálculo em lote (utils/reembolso.py)
+    percentual = percentual_reembolso(dias_desde_compra)
 
     valor_reembolso = valor_original * (percentual / 100)
 
     if percentual > 0:
         return f"Elegível para reembolso de {percentual}%. Valor a ser reembolsado: R${valor_reembolso:.2f}."
     else:
-        return (
-            "Não elegível para reembolso, pois a compra foi feita há mais de 60 dias."
-        )
+        return f"Não elegível para reembolso, pois a compra foi feita há mais de {FAIXAS_REEMBOLSO[-1][0]} dias."
 
 
 # --- Lista de Tools do Agente Financeiro ---
@@ -100,9 +112,13 @@ class AgenteFinanceiro:
     """
 
     def __init__(self):
+        # Import tardio: langgraph.prebuilt só é carregado se o agente for usado
+        from langgraph.prebuilt import create_react_agent
+
         self.agent = create_react_agent(
-            model=ChatOpenAI(model="gpt-4o-mini", temperature=0.2),
+            model=obter_llm("gpt-4o-mini", temperature=0.2),
             tools=financeiro_tools,
             prompt=financeiro_prompt,
             state_schema=StateSuporteSimples,
+            pre_model_hook=RedutorHistorico(),
         )
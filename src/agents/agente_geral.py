@@ -1,7 +1,8 @@
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
 from utils.state import StateSuporteSimples
+from utils.historico import RedutorHistorico
+from utils.pool_llm import obter_llm
+from utils.indice_palavras import IndicePalavrasChave
 
 # --- Base de Conhecimento da Empresa ---
 
@@ -13,6 +14,26 @@ INFO_EMPRESA = {
     "entrega": "O prazo de entrega padrão para todo o Brasil é de 5 a 10 dias úteis.",
 }
 
+# Palavras-chave e sinônimos de cada informação
+PALAVRAS_INFO_EMPRESA = {
+    "horario_funcionamento": [
+        "horario",
+        "funcionamento",
+        "abre",
+        "abrem",
+        "fecha",
+        "fecham",
+        "expediente",
+    ],
+    "contato": ["contato", "telefone", "email", "e-mail", "whatsapp", "ligar"],
+    "endereco": ["endereco", "localizacao", "onde fica", "escritorio"],
+    "garantia": ["garantia", "defeito", "troca"],
+    "entrega": ["entrega", "frete", "envio", "prazo de entrega"],
+}
+
+# Índice compilado uma única vez, no import
+INDICE_EMPRESA = IndicePalavrasChave(PALAVRAS_INFO_EMPRESA)
+
 # --- Ferramentas do Agente Geral ---
 
 
@@ -27,13 +48,14 @@ def buscar_informacao_empresa(tipo_info: str) -> str:
     Returns:
         str: A informação solicitada ou uma mensagem de que a informação não foi encontrada.
     """
-    info_lower = tipo_info.lower()
-    for key in INFO_EMPRESA:
-        if info_lower in key:
-            return INFO_EMPRESA[key]
+    # O agente costuma passar a própria chave (ex.: 'horario_funcionamento')
+    chave = tipo_info.strip().lower()
+    if chave in INFO_EMPRESA:
+        return INFO_EMPRESA[chave]
 
-    if "funcionamento" in info_lower:
-        return INFO_EMPRESA["horario_funcionamento"]
+    ocorrencias = INDICE_EMPRESA.buscar(tipo_info)
+    if ocorrencias:
+        return INFO_EMPRESA[ocorrencias[0][0]]
 
     return "Desculpe, não encontrei essa informação específica. Posso ajudar com horários, contato, endereço, garantia ou entrega."
 
@@ -70,9 +92,13 @@ class AgenteGeral:
     """
 
     def __init__(self):
+        # Import tardio: langgraph.prebuilt só é carregado se o agente for usado
+        from langgraph.prebuilt import create_react_agent
+
         self.agent = create_react_agent(
-            model=ChatOpenAI(model="gpt-4o-mini", temperature=0.4),
+            model=obter_llm("gpt-4o-mini", temperature=0.4),
             tools=geral_tools,
             prompt=geral_prompt,
             state_schema=StateSuporteSimples,
+            pre_model_hook=RedutorHistorico(),
         )
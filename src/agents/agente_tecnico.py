@@ -1,7 +1,8 @@
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
 from utils.state import StateSuporteSimples
+from utils.historico import RedutorHistorico
+from utils.pool_llm import obter_llm
+from utils.indice_palavras import IndicePalavrasChave
 
 # --- Base de Conhecimento Técnico ---
 
@@ -12,6 +13,34 @@ KNOWLEDGE_BASE_TECNICO = {
     "lentidao": "Feche outros programas ou abas do navegador que não esteja usando e verifique o uso de CPU no gerenciador de tarefas.",
 }
 
+# Sinônimos que também ativam cada entrada da base (além da própria chave)
+SINONIMOS_TECNICO = {
+    "login": ["logar", "senha", "acesso", "acessar", "entrar na conta"],
+    "conexao": ["internet", "wifi", "rede", "conectar", "desconecta"],
+    "erro": ["bug", "falha", "nao funciona"],
+    "lentidao": ["lento", "lenta", "devagar", "demora"],
+}
+
+PALAVRAS_COMPLEXAS = [
+    "sistema travou",
+    "erro crítico",
+    "dados perdidos",
+    "perda de dados",
+    "perdi meus dados",
+    "perdi todos os meus dados",
+    "servidor",
+    "banco de dados",
+]
+
+# Índices compilados uma única vez, no import
+INDICE_TECNICO = IndicePalavrasChave(
+    {
+        chave: [chave, *SINONIMOS_TECNICO.get(chave, [])]
+        for chave in KNOWLEDGE_BASE_TECNICO
+    }
+)
+INDICE_COMPLEXIDADE = IndicePalavrasChave({"escalate": PALAVRAS_COMPLEXAS})
+
 # --- Ferramentas do Agente Técnico ---
 
 
@@ -26,10 +55,13 @@ def buscar_solucao_tecnica(problema: str) -> str:
     Returns:
         str: A solução encontrada na base de conhecimento ou uma mensagem indicando que nada foi encontrado.
     """
-    problema_lower = problema.lower()
-    for keyword, solucao in KNOWLEDGE_BASE_TECNICO.items():
-        if keyword in problema_lower:
-            return f"Solução encontrada: {solucao}"
+    ocorrencias = INDICE_TECNICO.buscar(problema)
+    if ocorrencias:
+        melhor, *outras = [chave for chave, _ in ocorrencias]
+        resposta = f"Solução encontrada: {KNOWLEDGE_BASE_TECNICO[melhor]}"
+        for chave in outras:
+            resposta += f"\nTambém pode ajudar: {KNOWLEDGE_BASE_TECNICO[chave]}"
+        return resposta
     return "Nenhuma solução específica encontrada na base de conhecimento. Por favor, descreva o problema com mais detalhes."
 
 
@@ -44,15 +76,7 @@ def avaliar_complexidade_tecnica(query: str) -> str:
     Returns:
         str: Retorna 'escalate' se for complexo, ou 'continue' caso contrário.
     """
-    palavras_complexas = [
-        "sistema travou",
-        "erro crítico",
-        "dados perdidos",
-        "servidor",
-        "banco de dados",
-    ]
-    query_lower = query.lower()
-    if any(palavra in query_lower for palavra in palavras_complexas):
+    if INDICE_COMPLEXIDADE.contem(query):
         return "escalate"
     return "continue"
 
@@ -92,9 +116,13 @@ class AgenteTecnico:
     """
 
     def __init__(self):
+        # Import tardio: langgraph.prebuilt só é carregado se o agente for usado
+        from langgraph.prebuilt import create_react_agent
+
         self.agent = create_react_agent(
-            model=ChatOpenAI(model="gpt-4o-mini", temperature=0.3),
+            model=obter_llm("gpt-4o-mini", temperature=0.3),
             tools=tecnico_tools,
             prompt=tecnico_prompt,
             state_schema=StateSuporteSimples,
+            pre_model_hook=RedutorHistorico(),
         )
@@ -0,0 +1,7 @@
+"""
+Benchmarks e Relatórios de Desempenho
+Separados da demo (src/main.py); cada módulo importa o grafo e as
+dependências só quando o benchmark roda. Uso (a partir da raiz do projeto):
+    python src/benchmarks --help
+    python src/benchmarks triagem --atraso 0.2 --repeticoes 5
+"""
@@ -0,0 +1,157 @@
+"""
+Linha de comando dos benchmarks
+
+Uso (a partir da raiz do projeto):
+    python src/benchmarks triagem --atraso 0.2 --repeticoes 5
+    python src/benchmarks replay tickets.jsonl --baseline baseline.json
+"""
+
+import argparse
+import os
+import sys
+
+if __package__ in (None, ""):
+    # Executado como `python src/benchmarks`: os imports partem de src/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _argumentos_llm_simulado(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--atraso", type=float, default=0.2, help="Atraso do LLM simulado (s)"
+    )
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções por caso")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python src/benchmarks",
+        description="Benchmarks e relatórios de desempenho do sistema multi-agente",
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    _argumentos_llm_simulado(
+        comandos.add_parser(
+            "triagem", help="Compara os modos de triagem com LLM simulado"
+        )
+    )
+    _argumentos_llm_simulado(
+        comandos.add_parser(
+            "regras",
+            help="Mede tickets categorizados pelas regras e latência economizada",
+        )
+    )
+
+    metricas = comandos.add_parser(
+        "metricas", help="Mostra p50/p95 por nó, tokens e tools (LLM simulado)"
+    )
+    _argumentos_llm_simulado(metricas)
+    metricas.add_argument("--trace", help="Arquivo JSONL com os eventos de trace")
+    metricas.add_argument("--prometheus", help="Arquivo com as métricas (Prometheus)")
+
+    replay = comandos.add_parser(
+        "replay",
+        help="Reexecuta um corpus JSONL de tickets com LLM simulado (sem rede)",
+    )
+    replay.add_argument("corpus", help="Corpus JSONL (gerado se não existir)")
+    replay.add_argument("--tickets", type=int, default=1000, help="Tickets do corpus")
+    replay.add_argument(
+        "--atraso", type=float, default=0.2, help="Atraso do LLM simulado (s)"
+    )
+    replay.add_argument(
+        "--jitter", type=float, default=0.0, help="Jitter do LLM simulado (s)"
+    )
+    replay.add_argument(
+        "--concorrencia", type=int, default=8, help="Tickets simultâneos"
+    )
+    replay.add_argument("--saida", help="Arquivo JSON com o resultado")
+    replay.add_argument("--baseline", help="Resultado anterior; regressão sai com erro")
+
+    comandos.add_parser(
+        "roteador",
+        help="Compara custo e latência: só modelo grande vs modelo local + fallback",
+    )
+    comandos.add_parser(
+        "prioridade",
+        help="Compara p95 por prioridade: fila FIFO vs fila por prioridade",
+    )
+    comandos.add_parser(
+        "checkpointer", help="Compara checkpointers SQLite com 32 threads concorrentes"
+    )
+    comandos.add_parser(
+        "estado", help="Compara bytes e tempo de serialização dos checkpoints"
+    )
+    store = comandos.add_parser(
+        "store", help="Compara InMemoryStore e StoreSQLite com 1M itens"
+    )
+    store.add_argument("--itens", type=int, default=1_000_000, help="Itens gravados")
+    comandos.add_parser(
+        "indice",
+        help="Compara varredura linear vs índice de palavras-chave (base de 10k)",
+    )
+    comandos.add_parser(
+        "inicializacao", help="Mede o tempo de partida a frio, fase a fase"
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = criar_parser().parse_args(argv)
+
+    # Cada comando importa só o seu módulo (e as dependências dele)
+    if args.comando == "triagem":
+        from benchmarks.triagem import benchmark_triagem
+
+        benchmark_triagem(args.atraso, args.repeticoes)
+    elif args.comando == "regras":
+        from benchmarks.triagem import benchmark_regras
+
+        benchmark_regras(args.atraso, args.repeticoes)
+    elif args.comando == "metricas":
+        from benchmarks.triagem import relatorio_metricas
+
+        relatorio_metricas(args.atraso, args.repeticoes, args.trace, args.prometheus)
+    elif args.comando == "replay":
+        from benchmarks.replay import benchmark_replay
+
+        return benchmark_replay(
+            args.corpus,
+            args.tickets,
+            args.atraso,
+            args.jitter,
+            args.concorrencia,
+            args.saida,
+            args.baseline,
+        )
+    elif args.comando == "roteador":
+        from benchmarks.roteador import benchmark_roteador
+
+        benchmark_roteador()
+    elif args.comando == "prioridade":
+        from benchmarks.prioridade import benchmark_prioridade
+
+        benchmark_prioridade()
+    elif args.comando == "checkpointer":
+        from benchmarks.persistencia import benchmark_checkpointer
+
+        benchmark_checkpointer()
+    elif args.comando == "estado":
+        from benchmarks.persistencia import benchmark_estado
+
+        benchmark_estado()
+    elif args.comando == "store":
+        from benchmarks.persistencia import benchmark_store
+
+        benchmark_store(args.itens)
+    elif args.comando == "indice":
+        from benchmarks.indice import benchmark_indice
+
+        benchmark_indice()
+    elif args.comando == "inicializacao":
+        from benchmarks.inicializacao import relatorio_inicializacao
+
+        relatorio_inicializacao()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Relatório de Inicialização (cold start)
+Mede, em processos novos, quanto cada fase da partida de src/main.py custa
+"""
+
+import os
+
+# Executado em um interpretador novo para medir a partida a frio de verdade
+_SCRIPT_INICIALIZACAO = """
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, sys.argv[1])  # pasta src
+fases = {}
+
+import main
+fases["import main"] = time.perf_counter() - inicio
+
+marco = time.perf_counter()
+from graph.workflow_suporte import criar_workflow
+fases["import do grafo (langgraph + agentes)"] = time.perf_counter() - marco
+
+marco = time.perf_counter()
+workflow = criar_workflow()
+fases["criar_workflow()"] = time.perf_counter() - marco
+
+marco = time.perf_counter()
+workflow.app
+fases["compilar grafo"] = time.perf_counter() - marco
+
+from utils import pool_llm
+from utils.llm_simulado import LLMSimulado
+pool_llm.definir_llm_override(LLMSimulado())
+marco = time.perf_counter()
+workflow.processar_consulta(main.casos_teste[0]["query"], "relatorio_inicializacao")
+fases["primeira consulta (LLM simulado)"] = time.perf_counter() - marco
+fases["total"] = time.perf_counter() - inicio
+
+modulos = ["langchain_openai", "langgraph.prebuilt", "langgraph.checkpoint.sqlite"]
+print(json.dumps({"fases": fases, "modulos": {m: m in sys.modules for m in modulos}}))
+"""
+
+
+def relatorio_inicializacao(execucoes: int = 3):
+    """
+    Mede a partida a frio de src/main.py, fase a fase, em processos novos
+
+    Args:
+        execucoes: Processos medidos (o relatório usa a mediana de cada fase)
+    """
+    import json
+    import subprocess
+    import sys
+    from utils.estatisticas import percentil
+
+    print("⏱️ RELATÓRIO DE INICIALIZAÇÃO (cold start)")
+    print(f"Execuções: {execucoes}")
+    print("=" * 50)
+
+    pasta_src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    medicoes = []
+    for _ in range(execucoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", _SCRIPT_INICIALIZACAO, pasta_src],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        # Os nós imprimem o progresso; o JSON é a última linha
+        medicoes.append(json.loads(saida.strip().splitlines()[-1]))
+
+    for fase in medicoes[0]["fases"]:
+        mediana = percentil([m["fases"][fase] for m in medicoes], 50)
+        print(f"  {fase:<38} {mediana * 1000:>8.1f}ms")
+    print("\n📦 Módulos carregados até a primeira consulta:")
+    for modulo, carregado in medicoes[-1]["modulos"].items():
+        print(f"  {'✅' if carregado else '💤'} {modulo}")
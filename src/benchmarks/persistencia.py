@@ -0,0 +1,277 @@
+"""
+Benchmarks de Persistência
+1. benchmark_checkpointer: checkpointers SQLite sob threads concorrentes
+2. benchmark_estado: bytes e tempo de serialização dos checkpoints
+3. benchmark_store: InMemoryStore vs StoreSQLite
+"""
+
+import contextlib
+import io
+import os
+import time
+
+from main import casos_teste
+
+
+# === BENCHMARK DO CHECKPOINTER SQLITE ===
+
+
+def benchmark_checkpointer(threads: int = 32, consultas: int = 640):
+    """
+    Compara a conexão única com lock e o SqliteSaverPool em chamadas
+    concorrentes de processar_consulta (LLM simulado sem atraso, para que o
+    custo do checkpointer domine)
+
+    Args:
+        threads: Threads chamando processar_consulta ao mesmo tempo
+        consultas: Total de consultas (cada uma em sua thread_id)
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from memory.workflow_memory import criar_checkpointer
+    from utils import pool_llm
+    from utils.estatisticas import resumo_latencias
+    from utils.llm_simulado import LLMSimulado
+
+    print("⏱️ BENCHMARK DO CHECKPOINTER SQLITE (LLM simulado)")
+    print(f"Threads: {threads} | Consultas: {consultas}")
+    print("=" * 50)
+
+    pool_llm.definir_llm_override(LLMSimulado())
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            for pool in (False, True):
+                nome = "pool" if pool else "conexão única"
+                saver = criar_checkpointer(
+                    pool=pool, caminho=os.path.join(pasta, f"bench_{pool}.db")
+                )
+                workflow = WorkflowSuporteMultiAgente(
+                    checkpointer=saver, usar_regras=False
+                )
+
+                def consultar(i):
+                    caso = casos_teste[i % len(casos_teste)]
+                    inicio = time.perf_counter()
+                    workflow.processar_consulta(caso["query"], f"bench_ckpt_{i}")
+                    return time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    with ThreadPoolExecutor(max_workers=threads) as executor:
+                        tempos = list(executor.map(consultar, range(consultas)))
+                duracao = time.perf_counter() - inicio
+
+                resumo = resumo_latencias(tempos)
+                print(f"\n📊 {nome}:")
+                print(f"  Vazão: {consultas / duracao:.1f} consultas/s")
+                print(
+                    f"  Latência: p50={resumo['p50'] * 1000:.1f}ms "
+                    f"p95={resumo['p95'] * 1000:.1f}ms"
+                )
+                if pool:
+                    metricas = saver.metricas
+                    print(
+                        f"  Escritas por commit: "
+                        f"{metricas['escritas'] / max(metricas['commits'], 1):.1f}"
+                    )
+                    saver.fechar()
+                else:
+                    saver.conn.close()
+    finally:
+        pool_llm.definir_llm_override(None)
+
+
+# === BENCHMARK DO ESTADO SERIALIZADO ===
+
+
+def benchmark_estado(tickets: int = 200, mensagens: int = 100):
+    """
+    Compara o serializador padrão e o SerializadorCompacto: bytes gravados por
+    ticket, tempo de serialização no fluxo real e em um histórico longo
+
+    Args:
+        tickets: Consultas processadas com cada serializador
+        mensagens: Tamanho do histórico do segundo teste
+    """
+    import sqlite3
+    import tempfile
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from memory.serializador_compacto import SerializadorCompacto, caminho_mensagens
+    from memory.workflow_memory import criar_checkpointer
+    from utils import pool_llm
+    from utils.llm_simulado import LLMSimulado
+
+    print("⏱️ BENCHMARK DO ESTADO SERIALIZADO (LLM simulado)")
+    print(f"Tickets: {tickets} | Histórico longo: {mensagens} mensagens")
+    print("=" * 50)
+
+    def cronometrar(serde, tempos):
+        dumps, loads = serde.dumps_typed, serde.loads_typed
+
+        def medir(funcao, chave):
+            def medida(valor):
+                inicio = time.perf_counter()
+                try:
+                    return funcao(valor)
+                finally:
+                    tempos[chave] += time.perf_counter() - inicio
+
+            return medida
+
+        serde.dumps_typed = medir(dumps, "dumps")
+        serde.loads_typed = medir(loads, "loads")
+
+    pool_llm.definir_llm_override(LLMSimulado())
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            for compacto in (False, True):
+                caminho = os.path.join(pasta, f"estado_{compacto}.db")
+                saver = criar_checkpointer(
+                    pool=False, caminho=caminho, compacto=compacto
+                )
+                tempos = {"dumps": 0.0, "loads": 0.0}
+                cronometrar(saver.serde, tempos)
+                workflow = WorkflowSuporteMultiAgente(
+                    checkpointer=saver, usar_regras=False
+                )
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for i in range(tickets):
+                        caso = casos_teste[i % len(casos_teste)]
+                        workflow.processar_consulta(caso["query"], f"estado_{i}")
+                for i in range(tickets):
+                    saver.get_tuple({"configurable": {"thread_id": f"estado_{i}"}})
+
+                total = sum(
+                    saver.conn.execute(sql).fetchone()[0] or 0
+                    for sql in (
+                        "SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints",
+                        "SELECT SUM(LENGTH(value)) FROM writes",
+                    )
+                )
+                if compacto:
+                    conn = sqlite3.connect(caminho_mensagens(caminho))
+                    total += conn.execute(
+                        "SELECT SUM(LENGTH(hash) + LENGTH(dados)) FROM mensagens_checkpoint"
+                    ).fetchone()[0]
+                    conn.close()
+                    saver.serde.mensagens.fechar()
+                saver.conn.close()
+
+                nome = "compacto" if compacto else "padrão"
+                print(f"\n📦 Serializador {nome}:")
+                print(f"  Bytes por ticket: {total / tickets:.0f}")
+                print(
+                    f"  Serialização: {tempos['dumps'] / tickets * 1e6:.0f}µs por ticket"
+                    f" | Leitura do checkpoint: {tempos['loads'] / tickets * 1e6:.0f}µs"
+                )
+
+            # Histórico longo: o mesmo estado serializado a cada passo do grafo
+            historico = [
+                (HumanMessage if i % 2 == 0 else AIMessage)(
+                    content=f"Mensagem {i}: " + "detalhes do atendimento " * 12
+                )
+                for i in range(mensagens)
+            ]
+            checkpoint = {"channel_values": {"messages": historico, "query": "..."}}
+            print(f"\n📜 Checkpoint com {mensagens} mensagens:")
+            for nome, serde in (
+                ("padrão", JsonPlusSerializer()),
+                ("compacto", SerializadorCompacto(os.path.join(pasta, "longo.db"))),
+            ):
+                serde.dumps_typed(checkpoint)  # Mensagens já gravadas
+                inicio = time.perf_counter()
+                for _ in range(100):
+                    tipo, dados = serde.dumps_typed(checkpoint)
+                dumps = (time.perf_counter() - inicio) / 100
+                inicio = time.perf_counter()
+                for _ in range(100):
+                    serde.loads_typed((tipo, dados))
+                loads = (time.perf_counter() - inicio) / 100
+                print(
+                    f"  {nome}: {len(dados)} bytes | dumps {dumps * 1e6:.0f}µs | "
+                    f"loads {loads * 1e6:.0f}µs"
+                )
+                if isinstance(serde, SerializadorCompacto):
+                    serde.mensagens.fechar()
+    finally:
+        pool_llm.definir_llm_override(None)
+
+
+# === BENCHMARK DO STORE DE LONGO PRAZO ===
+
+
+def benchmark_store(
+    itens: int = 1_000_000, namespaces: int = 1_000, consultas: int = 200
+):
+    """
+    Compara InMemoryStore e StoreSQLite em get e search com muitos itens
+
+    Args:
+        itens: Total de itens gravados em cada store
+        namespaces: Namespaces ("clientes", "cN") entre os quais os itens se dividem
+        consultas: Operações medidas por tipo
+    """
+    import random
+    import tempfile
+    from langgraph.store.base import PutOp
+    from langgraph.store.memory import InMemoryStore
+    from memory.store_sqlite import StoreSQLite
+    from utils.estatisticas import resumo_latencias
+
+    print("⏱️ BENCHMARK DO STORE DE LONGO PRAZO")
+    print(f"Itens: {itens} | Namespaces: {namespaces} | Consultas: {consultas}")
+    print("=" * 50)
+
+    categorias = ["Technical", "Billing", "General"]
+    aleatorio = random.Random(42)
+    sorteios = [aleatorio.randrange(itens) for _ in range(consultas)]
+
+    def medir(operacao):
+        tempos = []
+        for i in sorteios:
+            inicio = time.perf_counter()
+            operacao(i)
+            tempos.append(time.perf_counter() - inicio)
+        return resumo_latencias(tempos)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        stores = {
+            "InMemoryStore": InMemoryStore(),
+            "StoreSQLite": StoreSQLite(os.path.join(pasta, "store.db")),
+        }
+        for nome, store in stores.items():
+            inicio = time.perf_counter()
+            for lote in range(0, itens, 50_000):
+                store.batch(
+                    PutOp(
+                        ("clientes", f"c{i % namespaces}"),
+                        f"item_{i}",
+                        {"categoria": categorias[i % 3], "n": i},
+                    )
+                    for i in range(lote, min(lote + 50_000, itens))
+                )
+            carga = time.perf_counter() - inicio
+
+            resultados = {
+                "get": medir(
+                    lambda i: store.get(("clientes", f"c{i % namespaces}"), f"item_{i}")
+                ),
+                "search namespace": medir(
+                    lambda i: store.search(("clientes", f"c{i % namespaces}"), limit=10)
+                ),
+                "search prefixo + filtro": medir(
+                    lambda i: store.search(
+                        ("clientes",), filter={"categoria": categorias[i % 3]}, limit=10
+                    )
+                ),
+            }
+            print(f"\n📊 {nome} (carga: {carga:.1f}s):")
+            for operacao, resumo in resultados.items():
+                print(
+                    f"  {operacao:<24} p50={resumo['p50'] * 1000:.3f}ms "
+                    f"p95={resumo['p95'] * 1000:.3f}ms"
+                )
+        stores["StoreSQLite"].fechar()
@@ -0,0 +1,82 @@
+"""
+Replay Offline de Tickets
+Reexecuta um corpus JSONL com LLM simulado (sem rede) e compara o resultado
+com um baseline, para barrar regressões de vazão, latência e acurácia
+"""
+
+import os
+
+
+def benchmark_replay(
+    corpus: str,
+    tickets: int = 1000,
+    atraso: float = 0.05,
+    jitter: float = 0.0,
+    concorrencia: int = 8,
+    saida: str = None,
+    baseline: str = None,
+) -> int:
+    """
+    Reexecuta um corpus JSONL de tickets com LLM simulado (sem rede)
+
+    Args:
+        corpus: Arquivo JSONL; se não existir, um corpus sintético é gerado
+        tickets: Tamanho do corpus sintético (e limite de tickets lidos)
+        atraso: Latência média de cada chamada ao LLM simulado (segundos)
+        jitter: Variação (±) da latência do LLM simulado
+        concorrencia: Tickets processados ao mesmo tempo
+        saida: Arquivo JSON que recebe o resultado (para virar baseline)
+        baseline: Resultado anterior; regressões fazem o comando falhar
+
+    Returns:
+        Código de saída do processo (1 quando há regressão)
+    """
+    import json
+    from utils.replay import carregar_corpus, comparar_com_baseline, gerar_corpus
+    from utils.replay import executar_replay
+
+    if not os.path.exists(corpus):
+        gerar_corpus(corpus, tickets)
+        print(f"🧪 Corpus sintético gerado: {corpus} ({tickets} tickets)")
+
+    casos = carregar_corpus(corpus, limite=tickets)
+    print("🔁 REPLAY OFFLINE DE TICKETS (LLM simulado)")
+    print(
+        f"Tickets: {len(casos)} | Atraso: {atraso:.3f}s ± {jitter:.3f}s | "
+        f"Concorrência: {concorrencia}"
+    )
+    print("=" * 50)
+
+    resultado = executar_replay(
+        casos, atraso=atraso, jitter=jitter, concorrencia=concorrencia
+    )
+    latencia = resultado["latencia_ms"]
+    print(
+        f"🚀 Vazão: {resultado['vazao_tickets_s']:.1f} tickets/s "
+        f"({resultado['duracao_s']:.2f}s no total, {resultado['erros']} erros)"
+    )
+    print(
+        f"⏱️ Latência: p50 {latencia['p50']:.1f}ms | p95 {latencia['p95']:.1f}ms | "
+        f"p99 {latencia['p99']:.1f}ms"
+    )
+    for campo, acuracia in resultado["acuracia"].items():
+        print(f"🎯 Acurácia de {campo}: {acuracia:.1%}")
+    print(f"📏 Fast path por regras: {resultado['fast_path']:.0%}")
+    mais_lento = next(iter(resultado["nos_p95_ms"].items()), None)
+    if mais_lento:
+        print(f"🐢 Nó com maior p95: {mais_lento[0]} ({mais_lento[1]:.1f}ms)")
+
+    if saida:
+        with open(saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultado salvo em: {saida}")
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            regressoes = comparar_com_baseline(resultado, json.load(f))
+        for regressao in regressoes:
+            print(f"❌ Regressão: {regressao}")
+        if regressoes:
+            return 1
+        print("✅ Sem regressões em relação ao baseline")
+    return 0
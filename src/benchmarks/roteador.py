@@ -0,0 +1,88 @@
+"""
+Benchmark do Roteamento de Modelos
+Custo e latência da redação por rota: só o modelo grande vs modelo local com
+fallback (LLMs simulados, sem rede)
+"""
+
+import contextlib
+import io
+
+
+def benchmark_roteador(
+    tickets: int = 300,
+    atraso_local: float = 0.03,
+    atraso_grande: float = 0.15,
+    taxa_incerteza: float = 0.15,
+):
+    """
+    Compara custo e latência da redação por rota: só o modelo grande vs
+    roteamento com modelo local + fallback (LLMs simulados, sem rede)
+
+    Args:
+        tickets: Tickets processados em cada cenário
+        atraso_local: Latência simulada do modelo local (segundos)
+        atraso_grande: Latência simulada do modelo grande (segundos)
+        taxa_incerteza: Fração das consultas em que o modelo local falha na
+            validação e a rota sobe para o modelo grande
+    """
+    import random
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from utils import pool_llm
+    from utils.instrumentacao import Instrumentacao
+    from utils.llm_simulado import LLMSimulado, responder_redacao
+    from utils.replay import MODELOS_TICKETS
+    from utils.roteador_modelos import ROTAS_PADRAO, RoteadorModelos
+
+    rng = random.Random(42)
+    consultas = []
+    for i in range(tickets):
+        categoria = rng.choice(list(MODELOS_TICKETS))
+        consultas.append(f"{rng.choice(MODELOS_TICKETS[categoria])} (ticket {i})")
+
+    llms = {
+        "local": LLMSimulado(
+            atraso=atraso_local, responder=responder_redacao(taxa_incerteza)
+        ),
+        "grande": LLMSimulado(atraso=atraso_grande, responder=responder_redacao()),
+    }
+    cenarios = {
+        "Só grande": {rota: ["grande"] for rota in ROTAS_PADRAO},
+        "Roteado": ROTAS_PADRAO,
+    }
+
+    print("💸 BENCHMARK DO ROTEAMENTO DE MODELOS (LLMs simulados)")
+    print(
+        f"Tickets: {tickets} | Local: {atraso_local * 1000:.0f}ms | "
+        f"Grande: {atraso_grande * 1000:.0f}ms | Incerteza do local: "
+        f"{taxa_incerteza:.0%}"
+    )
+    print("=" * 50)
+
+    pool_llm.definir_llm_override(LLMSimulado())
+    try:
+        for nome, rotas in cenarios.items():
+            instrumentacao = Instrumentacao()
+            workflow = WorkflowSuporteMultiAgente(
+                checkpointer=MemorySaver(),
+                instrumentacao=instrumentacao,
+                roteador=RoteadorModelos(rotas=rotas, llms=llms),
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                workflow.processar_lote(consultas)
+
+            print(f"📊 {nome}")
+            custo_total = 0.0
+            for rota, r in sorted(instrumentacao.relatorio_rotas().items()):
+                custo_total += r["custo_usd"]
+                niveis = " | ".join(
+                    f"{nivel} {n['contagem']:.0f}x p95 {n['p95'] * 1000:.0f}ms"
+                    for nivel, n in sorted(r["por_nivel"].items())
+                )
+                print(
+                    f"   {rota:<17} {niveis} | fallbacks {r['fallbacks']} | "
+                    f"US$ {r['custo_usd']:.6f}"
+                )
+            print(f"   💰 Custo total: US$ {custo_total:.6f}")
+    finally:
+        pool_llm.definir_llm_override(None)
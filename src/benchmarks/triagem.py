@@ -0,0 +1,189 @@
+"""
+Benchmarks da Triagem (LLM simulado)
+1. benchmark_triagem: modos sequencial, paralelo e conjunto
+2. benchmark_regras: fast path por palavras-chave vs só LLM
+3. relatorio_metricas: p50/p95 por nó, tokens e tools
+"""
+
+import contextlib
+import io
+import time
+
+from main import casos_teste
+
+
+# === BENCHMARK DA TRIAGEM ===
+
+
+def benchmark_triagem(atraso: float = 0.2, repeticoes: int = 5):
+    """
+    Compara os modos de triagem (sequencial, paralela, conjunta) com LLM simulado
+
+    Args:
+        atraso: Latência simulada (segundos) de cada chamada ao LLM
+        repeticoes: Execuções por caso de teste em cada modo
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import ModoTriagem, WorkflowSuporteMultiAgente
+    from utils import pool_llm
+    from utils.llm_simulado import LLMSimulado
+    from utils.estatisticas import resumo_latencias
+
+    print("⏱️ BENCHMARK DA TRIAGEM (LLM simulado)")
+    print(f"Atraso por chamada: {atraso:.3f}s | Repetições: {repeticoes}")
+    print("=" * 50)
+
+    pool_llm.definir_llm_override(LLMSimulado(atraso=atraso))
+    try:
+        for modo in ModoTriagem:
+            nome = modo.value
+            workflow = WorkflowSuporteMultiAgente(
+                modo_triagem=modo, checkpointer=MemorySaver(), usar_regras=False
+            )
+            print(f"\n📊 Modo {nome}:")
+            for i, caso in enumerate(casos_teste, 1):
+                tempos = []
+                for r in range(repeticoes):
+                    inicio = time.perf_counter()
+                    # Silencia os prints dos nós para não poluir o relatório
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        workflow.processar_consulta(
+                            caso["query"], f"bench_{nome}_{i}_{r}"
+                        )
+                    tempos.append(time.perf_counter() - inicio)
+                resumo = resumo_latencias(tempos)
+                print(
+                    f"  Caso {i}: p50={resumo['p50'] * 1000:.1f}ms "
+                    f"p95={resumo['p95'] * 1000:.1f}ms"
+                )
+        print(f"\n♻️ Pool de LLM: {pool_llm.estatisticas_pool()}")
+    finally:
+        pool_llm.definir_llm_override(None)
+
+
+# === BENCHMARK DO FAST PATH POR REGRAS ===
+
+
+def benchmark_regras(atraso: float = 0.2, repeticoes: int = 5):
+    """
+    Mede a fração de tickets categorizados pelas regras e a latência economizada,
+    comparando o workflow com e sem pré-classificação (LLM simulado)
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from utils import pool_llm
+    from utils.llm_simulado import LLMSimulado
+
+    print("⏱️ BENCHMARK DO FAST PATH POR REGRAS (LLM simulado)")
+    print(f"Atraso por chamada: {atraso:.3f}s | Repetições: {repeticoes}")
+    print("=" * 50)
+
+    pool_llm.definir_llm_override(LLMSimulado(atraso=atraso))
+    try:
+        tempos = {}
+        atalhos = 0
+        for usar_regras in (False, True):
+            workflow = WorkflowSuporteMultiAgente(
+                checkpointer=MemorySaver(), usar_regras=usar_regras
+            )
+            tempos[usar_regras] = []
+            for i, caso in enumerate(casos_teste, 1):
+                for r in range(repeticoes):
+                    inicio = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        resultado = workflow.processar_consulta(
+                            caso["query"], f"bench_regras_{usar_regras}_{i}_{r}"
+                        )
+                    tempos[usar_regras].append(time.perf_counter() - inicio)
+                    if usar_regras and resultado["fast_path"]:
+                        atalhos += 1
+
+        total = len(tempos[True])
+        media_llm = sum(tempos[False]) / total
+        media_regras = sum(tempos[True]) / total
+        print(f"📏 Tickets pelo fast path: {atalhos}/{total} ({atalhos / total:.0%})")
+        print(f"🤖 Latência média só com LLM: {media_llm * 1000:.1f}ms")
+        print(f"⚡ Latência média com regras: {media_regras * 1000:.1f}ms")
+        print(
+            f"💰 Economia: {(media_llm - media_regras) * 1000:.1f}ms por ticket "
+            f"({(media_llm - media_regras) * total:.2f}s no total)"
+        )
+    finally:
+        pool_llm.definir_llm_override(None)
+
+
+# === MÉTRICAS POR NÓ ===
+
+
+def relatorio_metricas(
+    atraso: float = 0.2,
+    repeticoes: int = 5,
+    trace: str = None,
+    prometheus: str = None,
+):
+    """
+    Roda os casos de teste com LLM simulado e mostra qual nó domina o p95
+
+    Args:
+        atraso: Latência simulada de cada chamada ao LLM (segundos)
+        repeticoes: Execuções de cada caso
+        trace: Arquivo JSONL que recebe um evento por nó, LLM e tool
+        prometheus: Arquivo que recebe as métricas no formato do Prometheus
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from utils import pool_llm
+    from utils.instrumentacao import Instrumentacao, SinkJSONL
+    from utils.llm_simulado import LLMSimulado
+
+    print("📊 MÉTRICAS POR NÓ (LLM simulado)")
+    print(f"Atraso por chamada: {atraso:.3f}s | Repetições: {repeticoes}")
+    print("=" * 50)
+
+    sink = SinkJSONL(trace) if trace else None
+    instrumentacao = Instrumentacao(sink=sink)
+    # Sem o fast path por regras, para que a triagem pelo LLM apareça
+    workflow = WorkflowSuporteMultiAgente(
+        checkpointer=MemorySaver(), usar_regras=False, instrumentacao=instrumentacao
+    )
+
+    pool_llm.definir_llm_override(LLMSimulado(atraso=atraso))
+    try:
+        for i, caso in enumerate(casos_teste, 1):
+            for r in range(repeticoes):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    workflow.processar_consulta(caso["query"], f"metricas_{i}_{r}")
+    finally:
+        pool_llm.definir_llm_override(None)
+        if sink is not None:
+            sink.fechar()
+
+    print(f"{'Nó':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'execuções':>11}")
+    for no, r in instrumentacao.relatorio_nos():
+        print(
+            f"{no:<22}{r['p50'] * 1000:>7.1f}ms{r['p95'] * 1000:>7.1f}ms"
+            f"{r['p99'] * 1000:>7.1f}ms{r['contagem']:>11.0f}"
+        )
+
+    tokens = {}
+    for rotulos, valor in instrumentacao.tokens.valores().items():
+        no = dict(rotulos)["no"]
+        tokens[no] = tokens.get(no, 0) + valor
+    for no, total in sorted(tokens.items(), key=lambda item: -item[1]):
+        print(f"🔤 Tokens em {no}: {total:.0f}")
+
+    for rotulos, r in sorted(instrumentacao.tools.resumo().items()):
+        print(f"🔧 Tool {dict(rotulos)['tool']}: p95 {r['p95'] * 1000:.1f}ms")
+
+    triagens = {
+        dict(rotulos)["origem"]: valor
+        for rotulos, valor in instrumentacao.triagem.valores().items()
+    }
+    print(f"🗂️ Triagem por origem: {triagens}")
+
+    if trace:
+        print(f"🧾 Trace JSONL salvo em: {trace}")
+    if prometheus:
+        with open(prometheus, "w", encoding="utf-8") as f:
+            f.write(instrumentacao.registro.exportar_prometheus())
+        print(f"📈 Métricas Prometheus salvas em: {prometheus}")
@@ -0,0 +1,228 @@
+"""
+Agendador de Tickets por Prioridade
+Fila em processo na frente do coordenador, em dois estágios:
+1. Triagem (por prioridade estimada): os tickets admitidos esperam em uma
+   fila ordenada pela prioridade que as palavras-chave sugerem
+   (estimar_prioridade, sem LLM); a triagem do grafo (regras, cache ou LLM),
+   onde está a latência do LLM, define a prioridade e pausa a thread
+2. Especialistas (por prioridade): os tickets triados esperam em uma fila
+   ordenada por prazo virtual = chegada + folga da prioridade
+
+Com folga 0 para High, tickets urgentes passam na frente sob carga. A folga
+finita de Low é o envelhecimento: um ticket Low que já esperou mais que a
+diferença entre as folgas passa na frente de um High recém-chegado.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# === CONFIGURAÇÃO PADRÃO ===
+
+# Folga (segundos) somada à chegada de cada prioridade
+FOLGAS_PADRAO = {
+    "High": 0.0,
+    "Medium": float(os.getenv("FILA_FOLGA_MEDIUM", "2")),
+    "Low": float(os.getenv("FILA_FOLGA_LOW", "10")),
+}
+TRABALHADORES_TRIAGEM = int(os.getenv("FILA_TRABALHADORES_TRIAGEM", "2"))
+TRABALHADORES_ESPECIALISTAS = int(os.getenv("FILA_TRABALHADORES_ESPECIALISTAS", "4"))
+
+
+class FilaPrioridade:
+    """
+    Heap por prazo virtual (chegada + folga da prioridade), segura entre threads
+
+    A chave é fixa na entrada, então colocar e retirar custam O(log n) e a
+    espera máxima de qualquer prioridade fica limitada pela sua folga.
+    """
+
+    def __init__(self, folgas: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            folgas: Prioridade -> folga em segundos (padrão: FOLGAS_PADRAO);
+                prioridades desconhecidas usam a maior folga
+        """
+        self.folgas = dict(folgas or FOLGAS_PADRAO)
+        self._folga_maxima = max(self.folgas.values(), default=0.0)
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._fechada = False
+
+    def colocar(self, item: Any, prioridade: str, chegada: Optional[float] = None):
+        chegada = time.monotonic() if chegada is None else chegada
+        prazo = chegada + self.folgas.get(prioridade, self._folga_maxima)
+        with self._condicao:
+            if self._fechada:
+                raise RuntimeError("fila fechada")
+            heapq.heappush(self._heap, (prazo, next(self._sequencia), item))
+            self._condicao.notify()
+
+    def retirar(self) -> Optional[Any]:
+        """Próximo item (bloqueia); None quando a fila foi fechada e esvaziou"""
+        with self._condicao:
+            while not self._heap and not self._fechada:
+                self._condicao.wait()
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[2]
+
+    def fechar(self):
+        """Não aceita novos itens; os que já estão na fila ainda saem"""
+        with self._condicao:
+            self._fechada = True
+            self._condicao.notify_all()
+
+    def __len__(self) -> int:
+        with self._condicao:
+            return len(self._heap)
+
+
+class _Ticket:
+    def __init__(self, query: str, thread_id: str):
+        self.query = query
+        self.thread_id = thread_id
+        self.futuro: Future = Future()
+        self.chegada = time.monotonic()
+        self.triado_em = 0.0
+        self.prioridade_estimada = ""
+        self.prioridade = ""
+
+
+class AgendadorTickets:
+    """
+    Pool de trabalhadores com triagem e especialistas ordenados por prioridade
+
+    Exemplo:
+        agendador = AgendadorTickets(criar_workflow())
+        futuro = agendador.submeter("Fui cobrado duas vezes!")
+        resultado = futuro.result()  # mesmo dict de processar_consulta + tempos
+    """
+
+    def __init__(
+        self,
+        workflow=None,
+        trabalhadores_triagem: int = TRABALHADORES_TRIAGEM,
+        trabalhadores_especialistas: int = TRABALHADORES_ESPECIALISTAS,
+        folgas: Optional[Dict[str, float]] = None,
+        triar: Optional[Callable[[str, str], Dict[str, Any]]] = None,
+        processar: Optional[Callable[[str], Dict[str, Any]]] = None,
+        estimar: Optional[Callable[[str], str]] = None,
+        priorizar_admissao: bool = True,
+    ):
+        """
+        Args:
+            workflow: WorkflowSuporteMultiAgente (fornece triar_consulta e
+                concluir_consulta quando triar/processar não são passados)
+            trabalhadores_triagem: Threads do estágio de triagem
+            trabalhadores_especialistas: Threads do estágio dos especialistas
+            folgas: Prioridade -> folga em segundos (ver FilaPrioridade)
+            triar: f(query, thread_id) -> dict com "priority"
+            processar: f(thread_id) -> resultado final do ticket
+            estimar: f(query) -> prioridade usada para ordenar a triagem
+                (padrão: estimar_prioridade, por palavras-chave)
+            priorizar_admissao: False faz a triagem em ordem de chegada (FIFO)
+        """
+        if estimar is None:
+            from agents.agente_coordenador import estimar_prioridade as estimar
+
+        self.triar = triar or workflow.triar_consulta
+        self.processar = processar or workflow.concluir_consulta
+        self.estimar = estimar
+        self.priorizar_admissao = priorizar_admissao
+        self.fila_triagem = FilaPrioridade(folgas)
+        self.fila = FilaPrioridade(folgas)
+        self.metricas = {"admitidos": 0, "concluidos": 0, "erros": 0}
+        self._lock = threading.Lock()
+
+        self._triagem = self._iniciar(
+            self._loop_triagem, "fila-triagem", trabalhadores_triagem
+        )
+        self._especialistas = self._iniciar(
+            self._loop_especialista, "fila-especialista", trabalhadores_especialistas
+        )
+
+    @staticmethod
+    def _iniciar(alvo: Callable[[], None], nome: str, quantidade: int):
+        trabalhadores = [
+            threading.Thread(target=alvo, name=f"{nome}-{i}", daemon=True)
+            for i in range(quantidade)
+        ]
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        return trabalhadores
+
+    def submeter(self, query: str, thread_id: Optional[str] = None) -> Future:
+        """Admite o ticket; o futuro recebe o resultado ou a exceção"""
+        ticket = _Ticket(query, thread_id or f"fila_{uuid.uuid4().hex[:12]}")
+        with self._lock:
+            self.metricas["admitidos"] += 1
+        if self.priorizar_admissao:
+            try:
+                ticket.prioridade_estimada = self.estimar(query)
+            except Exception:
+                ticket.prioridade_estimada = ""  # Maior folga: fica na ordem
+        # Com a mesma folga para todos, a heap se comporta como FIFO
+        self.fila_triagem.colocar(ticket, ticket.prioridade_estimada, ticket.chegada)
+        return ticket.futuro
+
+    def _loop_triagem(self):
+        while True:
+            ticket = self.fila_triagem.retirar()
+            if ticket is None:
+                return
+            self._triar(ticket)
+
+    def _triar(self, ticket: _Ticket):
+        try:
+            prioridade = self.triar(ticket.query, ticket.thread_id).get("priority")
+            ticket.prioridade = getattr(prioridade, "value", prioridade)  # Enum ou str
+            ticket.triado_em = time.monotonic()
+            self.fila.colocar(ticket, ticket.prioridade, ticket.chegada)
+        except BaseException as e:
+            self._falhar(ticket, e)
+
+    def _loop_especialista(self):
+        while True:
+            ticket = self.fila.retirar()
+            if ticket is None:
+                return
+            inicio = time.monotonic()
+            try:
+                resultado = dict(self.processar(ticket.thread_id))
+            except BaseException as e:
+                self._falhar(ticket, e)
+                continue
+            fim = time.monotonic()
+            resultado.update(
+                {
+                    "prioridade": ticket.prioridade,
+                    "prioridade_estimada": ticket.prioridade_estimada,
+                    "espera_triagem_s": ticket.triado_em - ticket.chegada,
+                    "espera_fila_s": inicio - ticket.triado_em,
+                    "latencia_s": fim - ticket.chegada,
+                }
+            )
+            with self._lock:
+                self.metricas["concluidos"] += 1
+            ticket.futuro.set_result(resultado)
+
+    def _falhar(self, ticket: _Ticket, erro: BaseException):
+        with self._lock:
+            self.metricas["erros"] += 1
+        ticket.futuro.set_exception(erro)
+
+    def fechar(self):
+        """Processa o que já foi admitido e encerra os trabalhadores"""
+        self.fila_triagem.fechar()
+        for trabalhador in self._triagem:
+            trabalhador.join()
+        self.fila.fechar()
+        for trabalhador in self._especialistas:
+            trabalhador.join()
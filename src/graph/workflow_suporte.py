@@ -3,8 +3,26 @@ Workflow de Suporte Multi-Agente usando LangGraph
 Versão simplificada e estável para fins educacionais
 """
 
-from typing import Dict, Any
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Any,
+    AsyncIterator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from enum import Enum
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from langgraph.config import get_config, get_stream_writer
 from langgraph.graph import StateGraph, END
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import RunnableLambda
 from datetime import datetime
 
 # Imports dos agentes e estado
@@ -14,39 +32,257 @@ from utils.state import (
     AgentType,
     criar_estado_inicial,
 )
-from agents.agente_coordenador import categorizar_consulta, analisar_sentimento
+from agents.agente_coordenador import (
+    categorizar_consulta,
+    analisar_sentimento,
+    classificar_consulta,
+    determinar_prioridade,
+    pre_classificar_consulta,
+)
 from agents.agente_tecnico import buscar_solucao_tecnica, avaliar_complexidade_tecnica
 from agents.agente_financeiro import consultar_politica_financeira, calcular_reembolso
 from agents.agente_geral import buscar_informacao_empresa
-from memory.workflow_memory import checkpointer
+from memory.workflow_memory import obter_checkpointer, criar_checkpointer_async
+from utils.instrumentacao import Instrumentacao, instrumentacao_padrao
+
+if TYPE_CHECKING:
+    from memory.cache_triagem import CacheTriagem
+    from utils.roteador_modelos import RoteadorModelos
+
+logger = logging.getLogger(__name__)
+
+
+class ModoTriagem(str, Enum):
+    """Como a triagem (categoria + sentimento) é executada"""
+
+    SEQUENCIAL = "sequencial"  # Duas chamadas ao LLM, uma após a outra
+    PARALELA = "paralela"  # Duas chamadas ao LLM no mesmo passo do grafo
+    CONJUNTA = "conjunta"  # Uma única chamada com saída estruturada
+
+
+# Nós cujas atualizações definem a triagem (categoria, sentimento, prioridade)
+NOS_TRIAGEM = {
+    "pre_classificar",
+    "consultar_cache",
+    "reavaliar_sentimento",
+    "categorizar",
+    "analisar_sentimento",
+    "triagem_conjunta",
+    "consolidar_triagem",
+}
+
+# Nós dos agentes especialistas (a triagem termina antes deles)
+NOS_ESPECIALISTAS = ["agent_tecnico", "agent_financeiro", "agent_geral"]
+
+# Campo do estado -> evento emitido por stream_consulta
+EVENTOS_TRIAGEM = {
+    "category": "categoria",
+    "sentiment": "sentimento",
+    "priority": "prioridade",
+}
+
+# Chave do config: liga a geração por stream do roteador (só em stream_consulta)
+TRANSMITIR_TOKENS = "transmitir_tokens"
 
 
 class WorkflowSuporteMultiAgente:
     """Workflow principal usando tools diretamente - versão educacional simplificada"""
 
-    def __init__(self):
-        # Criar workflow
-        self.app = self._criar_workflow()
+    def __init__(
+        self,
+        modo_triagem: ModoTriagem = ModoTriagem.PARALELA,
+        checkpointer=None,
+        cache_triagem: Optional["CacheTriagem"] = None,
+        checkpointer_async=None,
+        usar_regras: bool = True,
+        instrumentacao: Optional[Instrumentacao] = None,
+        roteador: Optional["RoteadorModelos"] = None,
+    ):
+        """
+        Args:
+            modo_triagem: Estratégia de triagem (sequencial, paralela ou conjunta)
+            checkpointer: Checkpointer usado pelo grafo compilado (padrão: o
+                checkpointer SQLite global, aberto na primeira compilação)
+            cache_triagem: Cache consultado antes da triagem (None desativa)
+            checkpointer_async: Checkpointer do caminho assíncrono (padrão:
+                AsyncSqliteSaver criado no primeiro uso, dentro do event loop)
+            usar_regras: Pré-classifica a categoria por palavras-chave e pula
+                a categorização pelo LLM quando a confiança é alta
+            instrumentacao: Destino das métricas (tempo por nó, tokens, tools,
+                cache) e dos traces JSONL (padrão: a instrumentação global)
+            roteador: Redige a resposta dos especialistas com o modelo mais
+                barato que passa na validação (None mantém os templates)
+        """
+        self.modo_triagem = ModoTriagem(modo_triagem)
+        self._checkpointer = checkpointer
+        self.cache_triagem = cache_triagem
+        self.checkpointer_async = checkpointer_async
+        self.usar_regras = usar_regras
+        self.instrumentacao = instrumentacao or instrumentacao_padrao
+        self.roteador = roteador
+
+        # Grafo compilado na primeira consulta (ver propriedade app)
+        self._app = None
+        # Mesmo grafo, pausado antes dos especialistas (ver triar_consulta)
+        self._app_triagem = None
+        self._lock_app = threading.Lock()
+
+        # Grafo assíncrono é compilado sob demanda (ver _obter_app_async)
+        self._app_async_task: Optional[asyncio.Task] = None
+        self._loop_async = None
+        # Checkpointer assíncrono criado por nós (e que, portanto, fechamos)
+        self._checkpointer_async_proprio = None
+
+    @property
+    def checkpointer(self):
+        if self._checkpointer is None:
+            self._checkpointer = obter_checkpointer()
+        return self._checkpointer
+
+    @property
+    def app(self):
+        """Grafo compilado (uma vez por instância, no primeiro uso)"""
+        if self._app is None:
+            with self._lock_app:
+                if self._app is None:
+                    self._app = self._criar_workflow()
+        return self._app
+
+    @property
+    def app_triagem(self):
+        """Grafo compilado com interrupção antes dos agentes especialistas"""
+        if self._app_triagem is None:
+            with self._lock_app:
+                if self._app_triagem is None:
+                    self._app_triagem = self._construir_grafo().compile(
+                        checkpointer=self.checkpointer,
+                        interrupt_before=NOS_ESPECIALISTAS,
+                    )
+        return self._app_triagem
 
     def _criar_workflow(self) -> StateGraph:
         """Cria workflow simplificado usando tools diretamente"""
+        return self._construir_grafo().compile(checkpointer=self.checkpointer)
+
+    def _construir_grafo(self) -> StateGraph:
+        """Monta o grafo (sem compilar); cada nó tem versão síncrona e assíncrona"""
         workflow = StateGraph(StateSuporteSimples)
 
         # === NÓSAÇÕES ===
-        workflow.add_node("inicializar", self._inicializar)
-        workflow.add_node("categorizar", self._categorizar)
-        workflow.add_node("analisar_sentimento", self._analisar_sentimento)
-        workflow.add_node("agent_tecnico", self._processar_tecnico)
-        workflow.add_node("agent_financeiro", self._processar_financeiro)
-        workflow.add_node("agent_geral", self._processar_geral)
+        # invoke usa a função síncrona e ainvoke a assíncrona de cada nó;
+        # as duas registram o tempo de parede do nó na instrumentação
+        medir_no = self.instrumentacao.medir_no
+
+        def no(nome, func, afunc):
+            def executar(state, config):
+                with medir_no(nome, config):
+                    return func(state)
+
+            async def aexecutar(state, config):
+                with medir_no(nome, config):
+                    return await afunc(state)
+
+            return RunnableLambda(executar, afunc=aexecutar, name=nome)
+
+        workflow.add_node(
+            "inicializar", no("inicializar", self._inicializar, self._ainicializar)
+        )
+        workflow.add_node(
+            "pre_classificar",
+            no("pre_classificar", self._pre_classificar, self._apre_classificar),
+        )
+        workflow.add_node(
+            "consultar_cache",
+            no("consultar_cache", self._consultar_cache, self._aconsultar_cache),
+        )
+        workflow.add_node(
+            "reavaliar_sentimento",
+            no(
+                "reavaliar_sentimento",
+                self._analisar_sentimento,
+                self._aanalisar_sentimento,
+            ),
+        )
+        workflow.add_node(
+            "categorizar", no("categorizar", self._categorizar, self._acategorizar)
+        )
+        workflow.add_node(
+            "analisar_sentimento",
+            no(
+                "analisar_sentimento",
+                self._analisar_sentimento,
+                self._aanalisar_sentimento,
+            ),
+        )
+        workflow.add_node(
+            "triagem_conjunta",
+            no("triagem_conjunta", self._triagem_conjunta, self._atriagem_conjunta),
+        )
+        workflow.add_node(
+            "consolidar_triagem",
+            no(
+                "consolidar_triagem",
+                self._consolidar_triagem,
+                self._aconsolidar_triagem,
+            ),
+        )
+        workflow.add_node(
+            "agent_tecnico",
+            no("agent_tecnico", self._processar_tecnico, self._aprocessar_tecnico),
+        )
+        workflow.add_node(
+            "agent_financeiro",
+            no(
+                "agent_financeiro",
+                self._processar_financeiro,
+                self._aprocessar_financeiro,
+            ),
+        )
+        workflow.add_node(
+            "agent_geral",
+            no("agent_geral", self._processar_geral, self._aprocessar_geral),
+        )
 
         # === EDGES ===
-        workflow.add_edge("inicializar", "categorizar")
-        workflow.add_edge("categorizar", "analisar_sentimento")
+        inicio_triagem = self._inicio_triagem()
+        inicio_cache = (
+            ["consultar_cache"] if self.cache_triagem is not None else inicio_triagem
+        )
+        if self.usar_regras:
+            # Regras com alta confiança dispensam a categorização pelo LLM
+            workflow.add_edge("inicializar", "pre_classificar")
+            workflow.add_conditional_edges(
+                "pre_classificar",
+                self._rotear_regras,
+                ["reavaliar_sentimento", *inicio_cache],
+            )
+        else:
+            for no in inicio_cache:
+                workflow.add_edge("inicializar", no)
+
+        if self.cache_triagem is not None:
+            # Hit exato pula a triagem; hit semântico só recalcula o sentimento
+            workflow.add_conditional_edges(
+                "consultar_cache",
+                self._rotear_cache,
+                ["consolidar_triagem", "reavaliar_sentimento", *inicio_triagem],
+            )
+        workflow.add_edge("reavaliar_sentimento", "consolidar_triagem")
+
+        if self.modo_triagem == ModoTriagem.CONJUNTA:
+            workflow.add_edge("triagem_conjunta", "consolidar_triagem")
+        elif self.modo_triagem == ModoTriagem.PARALELA:
+            # Fan-in: aguarda as duas análises antes do roteamento
+            workflow.add_edge(
+                ["categorizar", "analisar_sentimento"], "consolidar_triagem"
+            )
+        else:
+            workflow.add_edge("categorizar", "analisar_sentimento")
+            workflow.add_edge("analisar_sentimento", "consolidar_triagem")
 
         # Roteamento direto após análise
         workflow.add_conditional_edges(
-            "analisar_sentimento",
+            "consolidar_triagem",
             self._rotear_agente,
             {
                 "agent_tecnico": "agent_tecnico",
@@ -63,40 +299,241 @@ class WorkflowSuporteMultiAgente:
         # Ponto de entrada
         workflow.set_entry_point("inicializar")
 
-        return workflow.compile(checkpointer=checkpointer)
+        return workflow
+
+    async def _compilar_async(self):
+        checkpointer_async = self.checkpointer_async
+        if checkpointer_async is None:
+            # Conexão de um event loop anterior não serve mais
+            await self.afechar()
+            checkpointer_async = await criar_checkpointer_async()
+            self._checkpointer_async_proprio = checkpointer_async
+        return self._construir_grafo().compile(checkpointer=checkpointer_async)
+
+    async def _obter_app_async(self):
+        """Grafo compilado com checkpointer assíncrono (um por event loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop_async is not loop:
+            # Sem await entre o teste e a atribuição: chamadas concorrentes
+            # aguardam a mesma task em vez de compilar o grafo duas vezes
+            self._loop_async = loop
+            self._app_async_task = loop.create_task(self._compilar_async())
+        return await self._app_async_task
+
+    def _inicio_triagem(self) -> List[str]:
+        """Primeiros nós da triagem para o modo configurado"""
+        if self.modo_triagem == ModoTriagem.CONJUNTA:
+            return ["triagem_conjunta"]
+        if self.modo_triagem == ModoTriagem.PARALELA:
+            # Fan-out: as duas análises só leem a query e rodam no mesmo passo
+            return ["categorizar", "analisar_sentimento"]
+        return ["categorizar"]
 
     # === FUNÇÕES DOS NÓS ===
 
     def _inicializar(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Inicializa estado com timestamp"""
-        print("🚀 Inicializando processamento...")
-        return {**state, "timestamp": datetime.now().isoformat()}
+        logger.info("🚀 Inicializando processamento...")
+        return {"timestamp": datetime.now().isoformat()}
+
+    async def _ainicializar(self, state: StateSuporteSimples) -> StateSuporteSimples:
+        return self._inicializar(state)
+
+    def _pre_classificar(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        """Classificação determinística por palavras-chave (sem LLM)"""
+        triagem = pre_classificar_consulta(state["query"])
+        if triagem is None:
+            logger.info("📏 Regras: baixa confiança - triagem pelo LLM")
+            return {"fast_path": False}
+
+        self.instrumentacao.registrar_triagem("regras")
+        confianca = triagem.pop("confianca")
+        logger.info(
+            f"📏 Regras: {triagem['category']} (confiança {confianca:.0%}) "
+            "- só o sentimento vai ao LLM"
+        )
+        # Parcial: o sentimento ainda é analisado antes da prioridade
+        return {**triagem, "fast_path": True, "triagem_parcial": True}
+
+    async def _apre_classificar(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        return self._pre_classificar(state)
+
+    def _rotear_regras(self, state: StateSuporteSimples) -> List[str]:
+        """Só analisa o sentimento quando as regras classificaram a categoria"""
+        if self.cache_triagem is not None:
+            # Um hit exato ainda poupa a chamada de sentimento
+            return ["consultar_cache"]
+        if state.get("fast_path"):
+            return ["reavaliar_sentimento"]
+        return self._inicio_triagem()
+
+    def _consultar_cache(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        """Procura a triagem da consulta no cache (exato e semântico)"""
+        return self._resultado_cache(self.cache_triagem.buscar(state["query"]))
+
+    async def _aconsultar_cache(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        # SQLite é bloqueante: roda fora do event loop
+        triagem = await asyncio.to_thread(self.cache_triagem.buscar, state["query"])
+        return self._resultado_cache(triagem)
+
+    def _resultado_cache(self, triagem: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if triagem is None:
+            logger.info("🗄️ Cache de triagem: miss")
+            self.instrumentacao.registrar_triagem("cache_miss")
+            return {"cache_hit": False}
+
+        self.instrumentacao.registrar_triagem("cache")
+        # Hit semântico traz só a categoria (o tom da consulta pode ser outro)
+        parcial = "sentiment" not in triagem
+        logger.info(
+            f"🗄️ Cache de triagem: hit {'semântico' if parcial else 'exato'} "
+            f"({triagem['category']})"
+        )
+        return {**triagem, "cache_hit": True, "triagem_parcial": parcial}
+
+    def _rotear_cache(self, state: StateSuporteSimples) -> List[str]:
+        """Pula a triagem quando a consulta foi encontrada no cache"""
+        if state.get("triagem_parcial"):
+            return ["reavaliar_sentimento"]
+        if state.get("cache_hit"):
+            return ["consolidar_triagem"]
+        return self._inicio_triagem()
 
     def _categorizar(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Categoriza consulta usando tool de categorização diretamente"""
-        print("🎯 Categorizando consulta...")
+        logger.info("🎯 Categorizando consulta...")
 
         # Usar tool de categorização diretamente
         query = state["query"]
         categoria = categorizar_consulta.invoke({"query": query})
 
-        print(f"📂 Categoria identificada: {categoria}")
-        return {**state, "category": categoria}
+        logger.info(f"📂 Categoria identificada: {categoria}")
+        # Retorna só o campo alterado: no modo paralelo os dois nós escrevem no mesmo passo
+        return {"category": categoria}
+
+    async def _acategorizar(self, state: StateSuporteSimples) -> StateSuporteSimples:
+        logger.info("🎯 Categorizando consulta...")
+        categoria = await categorizar_consulta.ainvoke({"query": state["query"]})
+        logger.info(f"📂 Categoria identificada: {categoria}")
+        return {"category": categoria}
 
     def _analisar_sentimento(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Analisa sentimento usando tool de sentimento diretamente"""
-        print("😊 Analisando sentimento...")
+        logger.info("😊 Analisando sentimento...")
 
         # Usar tool de sentimento diretamente
         query = state["query"]
         sentimento = analisar_sentimento.invoke({"query": query})
 
-        print(f"💭 Sentimento detectado: {sentimento}")
-        return {**state, "sentiment": sentimento}
+        logger.info(f"💭 Sentimento detectado: {sentimento}")
+        return {"sentiment": sentimento}
+
+    async def _aanalisar_sentimento(
+        self, state: StateSuporteSimples
+    ) -> StateSuporteSimples:
+        logger.info("😊 Analisando sentimento...")
+        sentimento = await analisar_sentimento.ainvoke({"query": state["query"]})
+        logger.info(f"💭 Sentimento detectado: {sentimento}")
+        return {"sentiment": sentimento}
+
+    def _triagem_conjunta(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        """Categoria, sentimento e prioridade em uma única chamada ao LLM"""
+        logger.info("🎯 Triagem conjunta (categoria + sentimento + prioridade)...")
+
+        query = state["query"]
+        try:
+            triagem = classificar_consulta.invoke({"query": query})
+        except OutputParserException:
+            # JSON inválido ou fora dos enums: volta para as tools separadas
+            logger.warning("⚠️ Triagem conjunta inválida - usando tools separadas")
+            categoria = categorizar_consulta.invoke({"query": query})
+            sentimento = analisar_sentimento.invoke({"query": query})
+            return self._triagem_separada(categoria, sentimento)
+
+        self._exibir_triagem(triagem)
+        return triagem
+
+    async def _atriagem_conjunta(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        logger.info("🎯 Triagem conjunta (categoria + sentimento + prioridade)...")
+
+        query = state["query"]
+        try:
+            triagem = await classificar_consulta.ainvoke({"query": query})
+        except OutputParserException:
+            logger.warning("⚠️ Triagem conjunta inválida - usando tools separadas")
+            categoria, sentimento = await asyncio.gather(
+                categorizar_consulta.ainvoke({"query": query}),
+                analisar_sentimento.ainvoke({"query": query}),
+            )
+            return self._triagem_separada(categoria, sentimento)
+
+        self._exibir_triagem(triagem)
+        return triagem
+
+    def _triagem_separada(self, categoria: str, sentimento: str) -> Dict[str, Any]:
+        return {
+            "category": categoria,
+            "sentiment": sentimento,
+            "priority": determinar_prioridade.invoke(
+                {"categoria": categoria, "sentimento": sentimento}
+            ),
+        }
+
+    def _exibir_triagem(self, triagem: Dict[str, Any]):
+        logger.info(
+            f"📂 Categoria: {triagem['category']} | 💭 Sentimento: "
+            f"{triagem['sentiment']} | 🚦 Prioridade: {triagem['priority']}"
+        )
+
+    def _consolidar_triagem(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        """Ponto de junção da triagem - categoria e sentimento já estão no estado"""
+        if self._triagem_pronta(state):
+            # Categoria, sentimento e prioridade vieram do cache
+            return {}
+
+        triagem = self._triagem_consolidada(state)
+        if not state.get("triagem_parcial"):
+            self.instrumentacao.registrar_triagem("llm")
+        if self.cache_triagem is not None:
+            self.cache_triagem.salvar(state["query"], triagem)
+        return {"priority": triagem["priority"]}
+
+    async def _aconsolidar_triagem(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        if self._triagem_pronta(state):
+            return {}
+
+        triagem = self._triagem_consolidada(state)
+        if not state.get("triagem_parcial"):
+            self.instrumentacao.registrar_triagem("llm")
+        if self.cache_triagem is not None:
+            await asyncio.to_thread(self.cache_triagem.salvar, state["query"], triagem)
+        return {"priority": triagem["priority"]}
+
+    def _triagem_pronta(self, state: StateSuporteSimples) -> bool:
+        """Triagem completa veio do cache exato"""
+        if state.get("triagem_parcial"):
+            return False
+        return bool(state.get("cache_hit"))
+
+    def _triagem_consolidada(self, state: StateSuporteSimples) -> Dict[str, Any]:
+        if self.modo_triagem == ModoTriagem.CONJUNTA and not state.get(
+            "triagem_parcial"
+        ):
+            # Prioridade já veio da triagem conjunta
+            prioridade = state["priority"]
+        else:
+            prioridade = determinar_prioridade.invoke(
+                {"categoria": state["category"], "sentimento": state["sentiment"]}
+            )
+        return {
+            "category": state["category"],
+            "sentiment": state["sentiment"],
+            "priority": prioridade,
+        }
 
     def _processar_tecnico(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Processa com ferramentas técnicas diretamente"""
-        print("🔧 Processando com Agente Técnico...")
+        logger.info("🔧 Processando com Agente Técnico...")
 
         query = state["query"]
 
@@ -104,6 +541,23 @@ class WorkflowSuporteMultiAgente:
         solucao = buscar_solucao_tecnica.invoke({"problema": query})
         complexidade = avaliar_complexidade_tecnica.invoke({"query": query})
 
+        saida = self._resposta_tecnica(solucao, complexidade)
+        return self._finalizar("agent_tecnico", state, saida, solucao)
+
+    async def _aprocessar_tecnico(
+        self, state: StateSuporteSimples
+    ) -> StateSuporteSimples:
+        logger.info("🔧 Processando com Agente Técnico...")
+
+        query = state["query"]
+        solucao, complexidade = await asyncio.gather(
+            buscar_solucao_tecnica.ainvoke({"problema": query}),
+            avaliar_complexidade_tecnica.ainvoke({"query": query}),
+        )
+        saida = self._resposta_tecnica(solucao, complexidade)
+        return await self._afinalizar("agent_tecnico", state, saida, solucao)
+
+    def _resposta_tecnica(self, solucao: str, complexidade: str) -> Dict[str, Any]:
         # Criar resposta baseada nas tools
         if complexidade == "escalate":
             resposta = f"⚠️ Este problema será escalado para um especialista de nível 2.\n\n{solucao}"
@@ -112,9 +566,8 @@ class WorkflowSuporteMultiAgente:
             resposta = f"🔧 Solução técnica encontrada:\n\n{solucao}"
             escalado = False
 
-        print("✅ Solução técnica gerada")
+        logger.info("✅ Solução técnica gerada")
         return {
-            **state,
             "response": resposta,
             "agent_used": AgentType.TECNICO,
             "escalated": escalado,
@@ -122,29 +575,47 @@ class WorkflowSuporteMultiAgente:
 
     def _processar_financeiro(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Processa com ferramentas financeiras diretamente"""
-        print("💰 Processando com Agente Financeiro...")
+        logger.info("💰 Processando com Agente Financeiro...")
 
-        query = state["query"]
+        tipo_consulta = self._tipo_consulta_financeira(state["query"])
 
         # Usar tools financeiras diretamente
+        politica = consultar_politica_financeira.invoke(
+            {"tipo_consulta": tipo_consulta}
+        )
+        saida = self._resposta_financeira(tipo_consulta, politica)
+        return self._finalizar("agent_financeiro", state, saida, politica)
+
+    async def _aprocessar_financeiro(
+        self, state: StateSuporteSimples
+    ) -> StateSuporteSimples:
+        logger.info("💰 Processando com Agente Financeiro...")
+
+        tipo_consulta = self._tipo_consulta_financeira(state["query"])
+        politica = await consultar_politica_financeira.ainvoke(
+            {"tipo_consulta": tipo_consulta}
+        )
+        saida = self._resposta_financeira(tipo_consulta, politica)
+        return await self._afinalizar("agent_financeiro", state, saida, politica)
+
+    def _tipo_consulta_financeira(self, query: str) -> str:
         if "reembolso" in query.lower() or "estorno" in query.lower():
-            politica = consultar_politica_financeira.invoke(
-                {"tipo_consulta": "reembolso"}
-            )
+            return "reembolso"
+        if "pagamento" in query.lower():
+            return "pagamento"
+        # Consulta geral financeira
+        return query
+
+    def _resposta_financeira(self, tipo_consulta: str, politica: str) -> Dict[str, Any]:
+        if tipo_consulta == "reembolso":
             resposta = f"💰 Política de Reembolso:\n\n{politica}\n\nSe precisar calcular um valor específico, por favor informe o valor da compra e há quantos dias foi realizada."
-        elif "pagamento" in query.lower():
-            politica = consultar_politica_financeira.invoke(
-                {"tipo_consulta": "pagamento"}
-            )
+        elif tipo_consulta == "pagamento":
             resposta = f"💳 Formas de Pagamento:\n\n{politica}"
         else:
-            # Consulta geral financeira
-            politica = consultar_politica_financeira.invoke({"tipo_consulta": query})
             resposta = f"💰 Informação Financeira:\n\n{politica}"
 
-        print("✅ Resposta financeira gerada")
+        logger.info("✅ Resposta financeira gerada")
         return {
-            **state,
             "response": resposta,
             "agent_used": AgentType.FINANCEIRO,
             "escalated": False,
@@ -152,22 +623,103 @@ class WorkflowSuporteMultiAgente:
 
     def _processar_geral(self, state: StateSuporteSimples) -> StateSuporteSimples:
         """Processa com ferramentas gerais diretamente"""
-        print("ℹ️ Processando com Agente Geral...")
-
-        query = state["query"]
+        logger.info("ℹ️ Processando com Agente Geral...")
 
         # Usar tool geral diretamente
-        informacao = buscar_informacao_empresa.invoke({"tipo_info": query})
+        informacao = buscar_informacao_empresa.invoke({"tipo_info": state["query"]})
+        saida = self._resposta_geral(informacao)
+        return self._finalizar("agent_geral", state, saida, informacao)
+
+    async def _aprocessar_geral(
+        self, state: StateSuporteSimples
+    ) -> StateSuporteSimples:
+        logger.info("ℹ️ Processando com Agente Geral...")
+
+        informacao = await buscar_informacao_empresa.ainvoke(
+            {"tipo_info": state["query"]}
+        )
+        saida = self._resposta_geral(informacao)
+        return await self._afinalizar("agent_geral", state, saida, informacao)
+
+    def _resposta_geral(self, informacao: str) -> Dict[str, Any]:
         resposta = f"ℹ️ Informação da Empresa:\n\n{informacao}"
 
-        print("✅ Informações gerais fornecidas")
+        logger.info("✅ Informações gerais fornecidas")
         return {
-            **state,
             "response": resposta,
             "agent_used": AgentType.GERAL,
             "escalated": False,
         }
 
+    def _finalizar(
+        self,
+        rota: str,
+        state: StateSuporteSimples,
+        saida: Dict[str, Any],
+        contexto: str,
+    ) -> Dict[str, Any]:
+        """Redige a resposta com o roteador de modelos (se houver) e a transmite"""
+        writer = get_stream_writer()
+        if self.roteador is not None:
+            # Os tokens do modelo seguem pelo stream "custom" enquanto ele gera
+            texto, registro = self.roteador.redigir(
+                rota, state["query"], contexto, transmitir=self._transmissor(writer)
+            )
+            self._aplicar_redacao(saida, texto, registro)
+            if texto is not None:
+                return saida
+        self._transmitir_resposta(writer, saida["response"])
+        return saida
+
+    async def _afinalizar(
+        self,
+        rota: str,
+        state: StateSuporteSimples,
+        saida: Dict[str, Any],
+        contexto: str,
+    ) -> Dict[str, Any]:
+        writer = get_stream_writer()
+        if self.roteador is not None:
+            texto, registro = await self.roteador.aredigir(
+                rota, state["query"], contexto, transmitir=self._transmissor(writer)
+            )
+            self._aplicar_redacao(saida, texto, registro)
+            if texto is not None:
+                return saida
+        self._transmitir_resposta(writer, saida["response"])
+        return saida
+
+    @staticmethod
+    def _transmissor(writer):
+        """
+        Writer para os tokens do roteador, ou None fora de stream_consulta
+
+        O LangGraph entrega um writer mesmo em invoke; gerar por stream sem
+        ninguém consumindo só custa latência (e, na OpenAI, o uso de tokens
+        vem apenas no último pedaço).
+        """
+        if get_config().get("configurable", {}).get(TRANSMITIR_TOKENS):
+            return writer
+        return None
+
+    def _aplicar_redacao(
+        self, saida: Dict[str, Any], texto: Optional[str], registro: Dict[str, Any]
+    ):
+        # Nenhum nível passou na validação: fica a resposta do template
+        if texto is not None:
+            saida["response"] = texto
+        saida["roteamento"] = registro
+        self.instrumentacao.registrar_rota(registro)
+
+    def _transmitir_resposta(self, writer, resposta: str):
+        """
+        Envia pelo stream "custom" uma resposta que não veio de um LLM
+
+        A resposta do template já existe inteira: vai em um único evento, e
+        não como tokens. Sem um stream ativo o writer do LangGraph não faz nada.
+        """
+        writer({"resposta": resposta})
+
     def _rotear_agente(self, state: StateSuporteSimples) -> str:
         """Determina qual agente deve processar a consulta"""
 
@@ -175,13 +727,18 @@ class WorkflowSuporteMultiAgente:
         category = state.get("category", CategoryType.GENERAL)
         sentiment = state.get("sentiment", "Neutral")
 
-        print(
+        logger.info(
             f"🎯 Roteando baseado em - Categoria: {category}, Sentimento: {sentiment}"
         )
 
         if sentiment == "Negative":
-            print("⚠️ Sentimento negativo detectado - processando com atenção especial")
+            logger.info(
+                "⚠️ Sentimento negativo detectado - processando com atenção especial"
+            )
 
+        return self._rota_por_categoria(category)
+
+    def _rota_por_categoria(self, category: str) -> str:
         # Roteamento baseado na categoria
         if category == "Technical":
             return "agent_tecnico"
@@ -198,27 +755,281 @@ class WorkflowSuporteMultiAgente:
         """
         Interface principal para processar uma consulta com memória
         """
-        print(f"\n🎯 Processando consulta: '{query[:50]}...'")
+        logger.info(f"\n🎯 Processando consulta: '{query[:50]}...'")
 
         # Estado inicial
         initial_state = criar_estado_inicial(query)
 
         # Configuração para usar thread específica (memória)
-        config = {"configurable": {"thread_id": thread_id}}
+        config = self._config(thread_id)
 
         # Executar workflow com memória
         result = self.app.invoke(initial_state, config=config)
 
-        print(f"🎉 Processamento concluído por: {result['agent_used']}")
+        logger.info(f"🎉 Processamento concluído por: {result['agent_used']}")
+
+        return self._formatar_resultado(result, thread_id)
+
+    def triar_consulta(
+        self, query: str, thread_id: str = "demo_session"
+    ) -> Dict[str, Any]:
+        """
+        Executa só a triagem e pausa a thread antes do agente especialista
+
+        O estado fica no checkpointer; concluir_consulta(thread_id) retoma a
+        execução. Usado pelo AgendadorTickets para ordenar por prioridade.
 
-        # Retornar resultado limpo
+        Returns:
+            category, sentiment, priority, fast_path e cache_hit
+        """
+        estado = self.app_triagem.invoke(
+            criar_estado_inicial(query), config=self._config(thread_id)
+        )
+        return {
+            campo: estado[campo]
+            for campo in ("category", "sentiment", "priority", "fast_path", "cache_hit")
+        }
+
+    def concluir_consulta(self, thread_id: str) -> Dict[str, Any]:
+        """Retoma uma thread pausada por triar_consulta e roda o especialista"""
+        result = self.app_triagem.invoke(None, config=self._config(thread_id))
+        return self._formatar_resultado(result, thread_id)
+
+    def stream_consulta(
+        self, query: str, thread_id: str = "demo_session"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa a consulta emitindo eventos assim que cada informação existe
+
+        Usa app.stream com stream_mode=["updates", "custom", "values"]: as
+        atualizações dos nós de triagem viram eventos de categoria, sentimento,
+        prioridade e rota, a resposta do agente chega pelo modo "custom" e o
+        último "values" é o estado final.
+
+        Yields:
+            {"evento": "categoria" | "sentimento" | "prioridade" | "rota", "valor": ...}
+            {"evento": "token", "valor": token do LLM, "nivel": nível do roteador}
+            {"evento": "descartado", "valor": nível, "motivo": ...}: o rascunho
+                transmitido reprovou na validação e será substituído
+            {"evento": "resposta", "valor": resposta inteira} quando ela vem
+                do template (sem roteador ou nenhum nível aprovado)
+            {"evento": "fim", "resultado": mesmo dict de processar_consulta}
+        """
+        config = self._config(thread_id, transmitir_tokens=True)
+        emitidos: Dict[str, Any] = {}
+        result = None
+        for modo, chunk in self.app.stream(
+            criar_estado_inicial(query),
+            config=config,
+            stream_mode=["updates", "custom", "values"],
+        ):
+            if modo == "values":
+                result = chunk  # Estado completo após cada passo
+                continue
+            yield from self._eventos_stream(modo, chunk, emitidos)
+
+        yield {
+            "evento": "fim",
+            "resultado": self._formatar_resultado(result, thread_id),
+        }
+
+    async def astream_consulta(
+        self, query: str, thread_id: str = "demo_session"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Versão assíncrona de stream_consulta (app.astream no event loop)"""
+        app = await self._obter_app_async()
+        config = self._config(thread_id, transmitir_tokens=True)
+        emitidos: Dict[str, Any] = {}
+        result = None
+        async for modo, chunk in app.astream(
+            criar_estado_inicial(query),
+            config=config,
+            stream_mode=["updates", "custom", "values"],
+        ):
+            if modo == "values":
+                result = chunk
+                continue
+            for evento in self._eventos_stream(modo, chunk, emitidos):
+                yield evento
+
+        yield {
+            "evento": "fim",
+            "resultado": self._formatar_resultado(result, thread_id),
+        }
+
+    def _eventos_stream(
+        self, modo: str, chunk: Any, emitidos: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Converte um chunk do stream do LangGraph em eventos de stream_consulta"""
+        if modo == "custom":
+            if "token" in chunk:
+                yield {
+                    "evento": "token",
+                    "valor": chunk["token"],
+                    "nivel": chunk["nivel"],
+                }
+            elif "descartado" in chunk:
+                yield {
+                    "evento": "descartado",
+                    "valor": chunk["descartado"],
+                    "motivo": chunk["motivo"],
+                }
+            elif "resposta" in chunk:
+                yield {"evento": "resposta", "valor": chunk["resposta"]}
+            return
+
+        for no, atualizacao in chunk.items():
+            if no not in NOS_TRIAGEM:
+                continue
+            for campo, evento in EVENTOS_TRIAGEM.items():
+                valor = (atualizacao or {}).get(campo)
+                if valor is not None and emitidos.get(campo) != valor:
+                    emitidos[campo] = valor
+                    yield {"evento": evento, "valor": getattr(valor, "value", valor)}
+            # A triagem termina em consolidar_triagem: a rota já está definida
+            if no == "consolidar_triagem":
+                rota = self._rota_por_categoria(emitidos.get("category"))
+                yield {"evento": "rota", "valor": rota}
+
+    def processar_lote(
+        self,
+        queries: List[str],
+        max_concurrency: int = 8,
+        thread_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa várias consultas em paralelo pelo grafo compilado
+
+        Args:
+            queries: Consultas a processar
+            max_concurrency: Número máximo de consultas executando ao mesmo tempo
+            thread_ids: Thread de cada consulta (padrão: uma thread nova por item)
+
+        Returns:
+            Resultados na mesma ordem de `queries`; itens que falharam trazem
+            apenas query, thread_id e "erro"
+        """
+        if thread_ids is None:
+            lote_id = uuid.uuid4().hex[:8]
+            thread_ids = [f"lote_{lote_id}_{i}" for i in range(len(queries))]
+        if len(thread_ids) != len(queries):
+            raise ValueError("thread_ids deve ter o mesmo tamanho de queries")
+
+        logger.info(f"\n📦 Processando lote de {len(queries)} consultas...")
+
+        estados = [criar_estado_inicial(query) for query in queries]
+        configs = [
+            self._config(thread_id, max_concurrency=max_concurrency)
+            for thread_id in thread_ids
+        ]
+
+        # batch preserva a ordem de entrada; exceções voltam no lugar do item
+        resultados = self.app.batch(estados, configs, return_exceptions=True)
+
+        saida = []
+        for query, thread_id, result in zip(queries, thread_ids, resultados):
+            if isinstance(result, Exception):
+                saida.append(
+                    {"query": query, "thread_id": thread_id, "erro": str(result)}
+                )
+            else:
+                saida.append(self._formatar_resultado(result, thread_id))
+
+        erros = sum(1 for r in saida if "erro" in r)
+        logger.info(f"🎉 Lote concluído: {len(saida) - erros} ok, {erros} com erro")
+        return saida
+
+    async def aprocessar_consulta(
+        self, query: str, thread_id: str = "demo_session"
+    ) -> Dict[str, Any]:
+        """
+        Versão assíncrona de processar_consulta: todo o grafo roda no event loop
+        (ainvoke nas tools e checkpointer aiosqlite), sem bloquear uma thread
+        """
+        logger.info(f"\n🎯 Processando consulta: '{query[:50]}...'")
+
+        app = await self._obter_app_async()
+        config = self._config(thread_id)
+        result = await app.ainvoke(criar_estado_inicial(query), config=config)
+
+        logger.info(f"🎉 Processamento concluído por: {result['agent_used']}")
+        return self._formatar_resultado(result, thread_id)
+
+    async def afechar(self):
+        """
+        Fecha a conexão aiosqlite criada pelo caminho assíncrono
+
+        A conexão roda em uma thread própria que impede o processo de terminar;
+        chame antes de encerrar o event loop.
+        """
+        checkpointer_async = self._checkpointer_async_proprio
+        self._checkpointer_async_proprio = None
+        if checkpointer_async is not None and hasattr(checkpointer_async, "conn"):
+            await checkpointer_async.conn.close()
+
+    async def aprocessar_lote(
+        self,
+        queries: List[str],
+        max_concurrency: int = 64,
+        thread_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Versão assíncrona de processar_lote, limitada por um semáforo
+
+        Args:
+            queries: Consultas a processar
+            max_concurrency: Número máximo de consultas em andamento no event loop
+            thread_ids: Thread de cada consulta (padrão: uma thread nova por item)
+        """
+        if thread_ids is None:
+            lote_id = uuid.uuid4().hex[:8]
+            thread_ids = [f"lote_{lote_id}_{i}" for i in range(len(queries))]
+        if len(thread_ids) != len(queries):
+            raise ValueError("thread_ids deve ter o mesmo tamanho de queries")
+
+        semaforo = asyncio.Semaphore(max_concurrency)
+
+        async def processar(query: str, thread_id: str) -> Dict[str, Any]:
+            async with semaforo:
+                try:
+                    return await self.aprocessar_consulta(query, thread_id)
+                except Exception as e:
+                    return {"query": query, "thread_id": thread_id, "erro": str(e)}
+
+        # gather devolve os resultados na ordem de entrada
+        return await asyncio.gather(
+            *(processar(q, t) for q, t in zip(queries, thread_ids))
+        )
+
+    def _config(
+        self, thread_id: str, transmitir_tokens: bool = False, **extra
+    ) -> Dict[str, Any]:
+        """Config de execução: thread da conversa + callback de instrumentação"""
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                TRANSMITIR_TOKENS: transmitir_tokens,
+            },
+            "callbacks": [self.instrumentacao.callback],
+            **extra,
+        }
+
+    def _formatar_resultado(
+        self, result: StateSuporteSimples, thread_id: str
+    ) -> Dict[str, Any]:
+        """Retorna resultado limpo a partir do estado final do grafo"""
         return {
             "query": result["query"],
             "category": result["category"],
             "sentiment": result["sentiment"],
+            "priority": result["priority"],
             "response": result["response"],
             "agent_used": result["agent_used"],
             "escalated": result["escalated"],
+            "cache_hit": result["cache_hit"],
+            "fast_path": result["fast_path"],
+            # Nível, latência e custo da redação (vazio sem roteador de modelos)
+            "roteamento": result.get("roteamento") or {},
             "timestamp": result["timestamp"],
             "thread_id": thread_id,  # Incluir thread_id para referência
         }
@@ -227,26 +1038,89 @@ class WorkflowSuporteMultiAgente:
 # === FUNÇÃO HELPER ===
 
 
-def criar_workflow() -> WorkflowSuporteMultiAgente:
+# Workflows já criados por criar_workflow (um por configuração)
+_workflows: Dict[Tuple[bool, bool], WorkflowSuporteMultiAgente] = {}
+_lock_workflows = threading.Lock()
+
+
+def criar_workflow(
+    usar_cache: bool = True,
+    gerar_diagrama: bool = False,
+    usar_roteador: Optional[bool] = None,
+) -> WorkflowSuporteMultiAgente:
     """
     Função helper para criar e configurar o workflow
     Versão simplificada e estável
+
+    Chamadas repetidas reaproveitam o mesmo workflow (e o grafo já compilado).
+
+    Args:
+        usar_cache: Ativa o cache persistente da triagem (só hits exatos; a
+            busca semântica é opcional, ver CacheTriagem)
+        gerar_diagrama: Gera o PNG do grafo em segundo plano (fora do caminho
+            crítico; o renderizador mermaid pode acessar a rede)
+        usar_roteador: Redige as respostas com o roteador de modelos por custo
+            (None: lê a variável ROTEADOR_MODELOS=1 a cada chamada)
     """
-    print("🔧 Criando workflow multi-agente refatorado...")
-    workflow = WorkflowSuporteMultiAgente()
-    print("✅ Workflow criado com agentes refatorados!")
+    if usar_roteador is None:
+        usar_roteador = os.getenv("ROTEADOR_MODELOS", "") == "1"
+
+    with _lock_workflows:
+        workflow = _workflows.get((usar_cache, usar_roteador))
+        if workflow is None:
+            logger.info("🔧 Criando workflow multi-agente refatorado...")
+            cache = None
+            if usar_cache:
+                from memory.cache_triagem import CacheTriagem
 
-    # Gerar visualização do grafo
-    try:
-        print("📊 Gerando visualização do workflow...")
-        graph_image = workflow.app.get_graph().draw_mermaid_png()
+                cache = CacheTriagem()
+            roteador = None
+            if usar_roteador:
+                from utils.roteador_modelos import RoteadorModelos
 
-        # Salvar na pasta graph
-        with open("src/graph/workflow_diagram.png", "wb") as f:
-            f.write(graph_image)
-        print("✅ Diagrama salvo em: src/graph/workflow_diagram.png")
+                roteador = RoteadorModelos()
+            workflow = WorkflowSuporteMultiAgente(
+                cache_triagem=cache, roteador=roteador
+            )
+            _workflows[(usar_cache, usar_roteador)] = workflow
+            logger.info("✅ Workflow criado com agentes refatorados!")
 
-    except Exception as e:
-        print(f"⚠️ Erro ao gerar diagrama: {e}")
+    if gerar_diagrama:
+        gerar_diagrama_workflow(workflow)
 
     return workflow
+
+
+def gerar_diagrama_workflow(
+    workflow: WorkflowSuporteMultiAgente,
+    caminho: str = "src/graph/workflow_diagram.png",
+    em_segundo_plano: bool = True,
+) -> Optional[threading.Thread]:
+    """
+    Salva a visualização do grafo em PNG
+
+    Args:
+        workflow: Workflow cujo grafo será desenhado
+        caminho: Arquivo de saída
+        em_segundo_plano: Gera em uma thread daemon e retorna sem esperar
+    """
+
+    def gerar():
+        try:
+            logger.info("📊 Gerando visualização do workflow...")
+            graph_image = workflow.app.get_graph().draw_mermaid_png()
+
+            # Salvar na pasta graph
+            with open(caminho, "wb") as f:
+                f.write(graph_image)
+            logger.info(f"✅ Diagrama salvo em: {caminho}")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao gerar diagrama: {e}")
+
+    if not em_segundo_plano:
+        gerar()
+        return None
+    thread = threading.Thread(target=gerar, name="diagrama-workflow", daemon=True)
+    thread.start()
+    return thread
@@ -4,103 +4,203 @@ Execute este arquivo para ver os agentes funcionando no LangSmith
 """
 
 import os
+import argparse
+import logging
+import sys
+import time
 from dotenv import load_dotenv
-from graph.workflow_suporte import criar_workflow
+
+# O grafo (langgraph, agentes, SQLite) é importado só pelos comandos que o
+# usam, para que --help e os benchmarks (src/benchmarks) não paguem essa
+# inicialização ao importar casos_teste
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Configurar OpenAI API Key
-os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
-
-# Verificar se API key está configurada
-if not os.getenv("OPENAI_API_KEY"):
-    print("❌ ERRO: OPENAI_API_KEY não encontrada no arquivo .env")
-    exit(1)
 
-# Configurar LangSmith
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = os.getenv(
-    "LANGSMITH_PROJECT", "demo-sistema-multi-agente"
-)
-os.environ["LANGCHAIN_ENDPOINT"] = os.getenv(
-    "LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"
-)
-os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
+def configurar_ambiente():
+    """Valida a OPENAI_API_KEY e configura o LangSmith"""
+    # Verificar se API key está configurada
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ ERRO: OPENAI_API_KEY não encontrada no arquivo .env")
+        exit(1)
+
+    # Configurar LangSmith
+    os.environ["LANGCHAIN_TRACING_V2"] = "true"
+    os.environ["LANGCHAIN_PROJECT"] = os.getenv(
+        "LANGSMITH_PROJECT", "demo-sistema-multi-agente"
+    )
+    os.environ["LANGCHAIN_ENDPOINT"] = os.getenv(
+        "LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"
+    )
+
+
+# Casos de teste para demonstração educacional
+casos_teste = [
+    {
+        "query": "Não consigo fazer login no sistema",
+        "esperado": {"categoria": "Technical", "agente": "Técnico"},
+    },
+    {
+        "query": "Fui cobrado em duplicata no meu cartão",
+        "esperado": {"categoria": "Billing", "agente": "Financeiro"},
+    },
+    {
+        "query": "Qual o horário de funcionamento da empresa?",
+        "esperado": {"categoria": "General", "agente": "Geral"},
+    },
+    {
+        "query": "O sistema travou e perdi todos os meus dados! Estou muito irritado!",
+        "esperado": {
+            "categoria": "Technical",
+            "agente": "Escalação",
+            "escalado": True,
+        },
+    },
+]
 
 
-def main():
+def main(gerar_diagrama: bool = False):
     """Função principal para demonstração educacional"""
+    from graph.workflow_suporte import criar_workflow
+
+    configurar_ambiente()
+    # Progresso dos nós do grafo (logging) no terminal, junto com os prints
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
 
     print("🎓 DEMO SISTEMA MULTI-AGENTE")
     print("=" * 50)
 
     try:
-        workflow = criar_workflow()
+        workflow = criar_workflow(gerar_diagrama=gerar_diagrama)
     except Exception as e:
         print(f"❌ Erro ao criar workflow: {e}")
         return
 
-    # Casos de teste para demonstração educacional
-    casos_teste = [
-        {
-            "query": "Não consigo fazer login no sistema",
-            "esperado": {"categoria": "Technical", "agente": "Técnico"},
-        },
-        {
-            "query": "Fui cobrado em duplicata no meu cartão",
-            "esperado": {"categoria": "Billing", "agente": "Financeiro"},
-        },
-        {
-            "query": "Qual o horário de funcionamento da empresa?",
-            "esperado": {"categoria": "General", "agente": "Geral"},
-        },
-        {
-            "query": "O sistema travou e perdi todos os meus dados! Estou muito irritado!",
-            "esperado": {
-                "categoria": "Technical",
-                "agente": "Escalação",
-                "escalado": True,
-            },
-        },
-    ]
+    # Processar todos os casos em lote (cada um em sua própria thread/sessão)
+    resultados = workflow.processar_lote(
+        [caso["query"] for caso in casos_teste],
+        max_concurrency=4,
+        thread_ids=[f"demo_caso_{i}" for i in range(1, len(casos_teste) + 1)],
+    )
 
-    # Processar cada caso
     sucessos = 0
-    for i, caso in enumerate(casos_teste, 1):
+    for i, (caso, resultado) in enumerate(zip(casos_teste, resultados), 1):
         print(f"\n📝 CASO {i}: {caso['query']}")
 
-        try:
-            # Criar thread única para cada caso (simula sessões diferentes)
-            thread_id = f"demo_caso_{i}"
-
-            resultado = workflow.processar_consulta(caso["query"], thread_id)
-
-            # Verificar se bateu com o esperado
-            esperado = caso["esperado"]
-            categoria_correta = resultado["category"] == esperado.get("categoria")
-            escalacao_correta = resultado["escalated"] == esperado.get(
-                "escalado", False
+        if "erro" in resultado:
+            print(f"❌ Erro no caso {i}: {resultado['erro']}")
+            continue
+
+        # Verificar se bateu com o esperado
+        esperado = caso["esperado"]
+        categoria_correta = resultado["category"] == esperado.get("categoria")
+        escalacao_correta = resultado["escalated"] == esperado.get("escalado", False)
+
+        if categoria_correta and escalacao_correta:
+            print("✅ Resultado correto!")
+            sucessos += 1
+        else:
+            print(
+                f"⚠️ Esperado: {esperado.get('categoria')}, Obtido: {resultado['category']}"
             )
 
-            if categoria_correta and escalacao_correta:
-                print("✅ Resultado correto!")
-                sucessos += 1
-            else:
-                print(
-                    f"⚠️ Esperado: {esperado.get('categoria')}, Obtido: {resultado['category']}"
-                )
-
-        except Exception as e:
-            print(f"❌ Erro no caso {i}: {e}")
-
     # Resumo final
     print(f"\n🎉 Concluído: {sucessos}/{len(casos_teste)} casos corretos")
+    if workflow.cache_triagem is not None:
+        print(f"🗄️ Cache de triagem: {workflow.cache_triagem.estatisticas()}")
+    atalhos = sum(1 for r in resultados if r.get("fast_path"))
+    print(
+        f"📏 Fast path por regras: {atalhos}/{len(resultados)} tickets "
+        f"({atalhos / len(resultados):.0%}) sem LLM de categorização"
+    )
     if os.getenv("LANGSMITH_API_KEY"):
         print(
             f"🔍 Traces: https://smith.langchain.com (projeto: {os.environ['LANGCHAIN_PROJECT']})"
         )
 
 
+# === DEMO DE STREAMING ===
+
+
+def demo_stream(simulado: bool = False, atraso: float = 0.2):
+    """
+    Mostra os eventos de stream_consulta chegando, com o tempo de cada um
+
+    As respostas são redigidas pelo roteador de modelos, então os tokens
+    mostrados são os que o LLM gera.
+
+    Args:
+        simulado: Usa LLMs simulados (sem API key)
+        atraso: Latência simulada de cada chamada ao LLM (segundos)
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente, criar_workflow
+    from utils import pool_llm
+    from utils.llm_simulado import LLMSimulado, responder_redacao
+    from utils.roteador_modelos import NIVEIS_PADRAO, RoteadorModelos
+
+    # Os nós registram o progresso em INFO: aqui só os eventos (e avisos) aparecem
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", stream=sys.stdout)
+
+    print("📡 DEMO DE STREAMING")
+    print("=" * 50)
+    if simulado:
+        pool_llm.definir_llm_override(LLMSimulado(atraso=atraso))
+        redator = LLMSimulado(atraso=atraso, responder=responder_redacao())
+        workflow = WorkflowSuporteMultiAgente(
+            checkpointer=MemorySaver(),
+            roteador=RoteadorModelos(llms={nivel: redator for nivel in NIVEIS_PADRAO}),
+        )
+    else:
+        configurar_ambiente()
+        workflow = criar_workflow(usar_roteador=True)
+
+    for i, caso in enumerate(casos_teste, 1):
+        print(f"\n📝 CASO {i}: {caso['query']}")
+        inicio = time.perf_counter()
+        primeiro = None
+        for evento in workflow.stream_consulta(caso["query"], f"stream_caso_{i}"):
+            decorrido = (time.perf_counter() - inicio) * 1000
+            primeiro = primeiro or decorrido
+            if evento["evento"] == "token":
+                print(evento["valor"], end="", flush=True)
+            elif evento["evento"] == "descartado":
+                print(f"\n🗑️ Rascunho {evento['valor']} descartado: {evento['motivo']}")
+            elif evento["evento"] == "resposta":
+                print(f"[{decorrido:6.0f}ms] resposta (template):\n{evento['valor']}")
+            elif evento["evento"] == "fim":
+                print(
+                    f"\n⏱️ Primeiro evento: {primeiro:.0f}ms | Total: {decorrido:.0f}ms"
+                )
+            else:
+                print(f"[{decorrido:6.0f}ms] {evento['evento']}: {evento['valor']}")
+
+
 if __name__ == "__main__":
-    main()
+    # Benchmarks e relatórios de desempenho: python src/benchmarks --help
+    parser = argparse.ArgumentParser(description="Demo do sistema multi-agente")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Mostra categoria, rota e resposta chegando em streaming",
+    )
+    parser.add_argument(
+        "--simulado",
+        action="store_true",
+        help="Usa o LLM simulado (sem chamar a API) no --stream",
+    )
+    parser.add_argument(
+        "--atraso", type=float, default=0.2, help="Atraso do LLM simulado (s)"
+    )
+    parser.add_argument(
+        "--diagrama",
+        action="store_true",
+        help="Gera src/graph/workflow_diagram.png em segundo plano",
+    )
+    args = parser.parse_args()
+
+    if args.stream:
+        demo_stream(args.simulado, args.atraso)
+    else:
+        main(gerar_diagrama=args.diagrama)
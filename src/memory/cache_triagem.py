@@ -0,0 +1,343 @@
+"""
+Cache Semântico da Triagem
+Evita chamadas ao LLM para consultas repetidas ou quase idênticas:
+1. Hit exato: hash da consulta normalizada
+2. Hit semântico (opcional, desligado por padrão): vizinho mais próximo entre
+   os embeddings já armazenados; reaproveita só a categoria, porque consultas
+   parecidas podem ter sentimentos opostos ("cobrado em duplicata" vs
+   "cobrado em duplicata e estou furioso")
+Entradas expiram por TTL e são removidas por LRU; tudo persiste em SQLite
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from utils.texto import normalizar_texto
+
+# Arquivo ao lado de conversas.db
+cache_db_path = "src/memory/cache_triagem.db"
+
+# Palavras que não ajudam a distinguir consultas ("não consigo ...", "qual o ...")
+STOPWORDS = set(
+    """
+    a o e as os de da do das dos no na nos nas em um uma uns umas ao aos
+    meu minha meus minhas eu voce voces nao consigo fazer para por com que
+    qual quais como se ja foi esta estou muito mais me
+    """.split()
+)
+
+
+class EmbeddingLocal(Embeddings):
+    """
+    Embedding lexical calculado localmente (sem rede): trigramas de caracteres
+    das palavras relevantes, projetados por hashing em um vetor normalizado
+
+    Só reconhece reformulações com as mesmas palavras: "não consigo logar" e
+    "não consigo fazer login no sistema" ficam abaixo de 0.3. Para sinônimos,
+    use um modelo de embeddings de verdade (ex.: OpenAIEmbeddings).
+    """
+
+    def __init__(self, dimensoes: int = 1024):
+        self.dimensoes = dimensoes
+
+    def _vetor(self, texto: str) -> List[float]:
+        vetor = np.zeros(self.dimensoes, dtype=np.float32)
+        for palavra in normalizar_texto(texto).split():
+            if palavra in STOPWORDS:
+                continue
+            palavra = f" {palavra} "
+            for i in range(len(palavra) - 2):
+                # crc32 é estável entre processos (hash() do Python não é)
+                indice = zlib.crc32(palavra[i : i + 3].encode()) % self.dimensoes
+                vetor[indice] += 1.0
+        norma = np.linalg.norm(vetor)
+        return (vetor / norma if norma else vetor).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vetor(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vetor(text)
+
+
+class CacheTriagem:
+    """Cache de categoria/sentimento/prioridade com TTL, LRU e persistência SQLite"""
+
+    # Campos que um hit semântico pode reaproveitar (sentimento e prioridade
+    # dependem do tom da consulta nova e são recalculados pelo workflow)
+    CAMPOS_SEMANTICOS = ("category",)
+
+    def __init__(
+        self,
+        db_path: str = cache_db_path,
+        embeddings: Optional[Embeddings] = None,
+        busca_semantica: bool = False,
+        limiar_similaridade: float = 0.9,
+        ttl_segundos: float = 24 * 3600,
+        max_itens: int = 10_000,
+        intervalo_gravacao_segundos: float = 5.0,
+    ):
+        """
+        Args:
+            db_path: Arquivo SQLite (":memory:" para não persistir)
+            embeddings: Modelo de embeddings (padrão: EmbeddingLocal, sem rede)
+            busca_semantica: Ativa o hit semântico (desligado: só hits exatos)
+            limiar_similaridade: Similaridade cosseno mínima para hit semântico
+            ttl_segundos: Tempo de vida de cada entrada
+            max_itens: Capacidade máxima antes da remoção LRU
+            intervalo_gravacao_segundos: Intervalo mínimo entre as gravações
+                do último acesso dos hits (a ordem LRU em memória é imediata)
+        """
+        self.embeddings = embeddings or EmbeddingLocal()
+        self.busca_semantica = busca_semantica
+        self.limiar_similaridade = limiar_similaridade
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self.intervalo_gravacao_segundos = intervalo_gravacao_segundos
+
+        self._lock = threading.Lock()
+        # chave -> {"resultado", "criado_em", "slot"}; a ordem é a do LRU
+        self._entradas: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Matriz de embeddings pré-alocada; cada entrada ocupa um slot
+        self._matriz: Optional[np.ndarray] = None
+        self._chave_do_slot: List[Optional[str]] = [None] * max_itens
+        self._slots_livres = list(range(max_itens - 1, -1, -1))
+        # Último acesso dos hits ainda não gravado: chave -> timestamp
+        self._acessos_pendentes: Dict[str, float] = {}
+        self._ultima_gravacao = time.monotonic()
+
+        self.metricas = {
+            "hits_exatos": 0,
+            "hits_semanticos": 0,
+            "misses": 0,
+            "expirados": 0,
+            "removidos_lru": 0,
+        }
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_triagem (
+                chave TEXT PRIMARY KEY,
+                consulta TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                resultado TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._carregar()
+
+    # === PERSISTÊNCIA ===
+
+    def _carregar(self):
+        """Carrega entradas válidas do SQLite, da menos para a mais recente"""
+        limite = time.time() - self.ttl_segundos
+        self._conn.execute("DELETE FROM cache_triagem WHERE criado_em < ?", (limite,))
+        self._conn.commit()
+        linhas = self._conn.execute(
+            """
+            SELECT chave, embedding, resultado, criado_em FROM cache_triagem
+            ORDER BY ultimo_acesso DESC LIMIT ?
+            """,
+            (self.max_itens,),
+        ).fetchall()
+        for chave, embedding, resultado, criado_em in reversed(linhas):
+            vetor = np.frombuffer(embedding, dtype=np.float32)
+            if self._matriz is not None and len(vetor) != self._matriz.shape[1]:
+                continue  # Gerado por outro modelo de embeddings
+            self._inserir_memoria(chave, vetor, json.loads(resultado), criado_em)
+
+    def _gravar_acessos(self):
+        """Grava os acessos pendentes e faz o commit (chamar com o lock)"""
+        if self._acessos_pendentes:
+            self._conn.executemany(
+                "UPDATE cache_triagem SET ultimo_acesso = ? WHERE chave = ?",
+                [(agora, chave) for chave, agora in self._acessos_pendentes.items()],
+            )
+            self._acessos_pendentes.clear()
+        self._conn.commit()
+        self._ultima_gravacao = time.monotonic()
+
+    # === ESTRUTURAS EM MEMÓRIA ===
+
+    def _inserir_memoria(self, chave, vetor, resultado, criado_em):
+        if self._matriz is None:
+            self._matriz = np.zeros((self.max_itens, len(vetor)), dtype=np.float32)
+        slot = self._slots_livres.pop()
+        self._matriz[slot] = vetor
+        self._chave_do_slot[slot] = chave
+        self._entradas[chave] = {
+            "resultado": resultado,
+            "criado_em": criado_em,
+            "slot": slot,
+        }
+
+    def _remover(self, chave: str):
+        entrada = self._entradas.pop(chave)
+        slot = entrada["slot"]
+        self._matriz[slot] = 0.0
+        self._chave_do_slot[slot] = None
+        self._slots_livres.append(slot)
+        self._acessos_pendentes.pop(chave, None)
+        self._conn.execute("DELETE FROM cache_triagem WHERE chave = ?", (chave,))
+
+    def _expirada(self, entrada: Dict[str, Any], agora: float) -> bool:
+        return agora - entrada["criado_em"] > self.ttl_segundos
+
+    def _hit(self, chave: str, agora: float) -> Dict[str, Any]:
+        self._entradas.move_to_end(chave)
+        # O último acesso só serve para a ordem LRU ao recarregar: um commit
+        # por hit custaria mais que a própria busca, então é gravado em lote
+        self._acessos_pendentes[chave] = agora
+        if time.monotonic() - self._ultima_gravacao >= self.intervalo_gravacao_segundos:
+            self._gravar_acessos()
+        return dict(self._entradas[chave]["resultado"])
+
+    # === INTERFACE PÚBLICA ===
+
+    def buscar(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a triagem em cache para a consulta (ou None em caso de miss)
+
+        Returns:
+            Hit exato: dict com category, sentiment e priority
+            Hit semântico: dict só com category (CAMPOS_SEMANTICOS)
+            Miss: None
+        """
+        normalizada = normalizar_texto(query)
+        chave = hashlib.sha256(normalizada.encode()).hexdigest()
+        agora = time.time()
+
+        with self._lock:
+            # 1. Hit exato
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                if not self._expirada(entrada, agora):
+                    self.metricas["hits_exatos"] += 1
+                    return self._hit(chave, agora)
+                self.metricas["expirados"] += 1
+                self._remover(chave)
+                self._gravar_acessos()
+
+            if not self.busca_semantica or not self._entradas:
+                self.metricas["misses"] += 1
+                return None
+
+        # 2. Hit semântico (o embedding é calculado fora do lock)
+        vetor = np.asarray(self.embeddings.embed_query(normalizada), dtype=np.float32)
+        norma = np.linalg.norm(vetor)
+        if not norma:
+            with self._lock:
+                self.metricas["misses"] += 1
+            return None
+        vetor = vetor / norma
+
+        with self._lock:
+            if self._matriz is None or self._matriz.shape[1] != len(vetor):
+                self.metricas["misses"] += 1
+                return None
+            similaridades = self._matriz @ vetor
+            slot = int(np.argmax(similaridades))
+            vizinho = self._chave_do_slot[slot]
+            if vizinho is None or similaridades[slot] < self.limiar_similaridade:
+                self.metricas["misses"] += 1
+                return None
+            if self._expirada(self._entradas[vizinho], agora):
+                self.metricas["expirados"] += 1
+                self.metricas["misses"] += 1
+                self._remover(vizinho)
+                self._gravar_acessos()
+                return None
+            self.metricas["hits_semanticos"] += 1
+            resultado = self._hit(vizinho, agora)
+            return {campo: resultado[campo] for campo in self.CAMPOS_SEMANTICOS}
+
+    def salvar(self, query: str, resultado: Dict[str, Any]):
+        """
+        Armazena a triagem de uma consulta
+
+        Args:
+            query: Consulta original do cliente
+            resultado: Dict com category, sentiment e priority
+        """
+        normalizada = normalizar_texto(query)
+        chave = hashlib.sha256(normalizada.encode()).hexdigest()
+        vetor = np.asarray(self.embeddings.embed_query(normalizada), dtype=np.float32)
+        norma = np.linalg.norm(vetor)
+        if norma:
+            vetor = vetor / norma
+        # Enums viram strings simples para serializar
+        resultado = {k: getattr(v, "value", v) for k, v in resultado.items()}
+        agora = time.time()
+
+        with self._lock:
+            if self._matriz is not None and self._matriz.shape[1] != len(vetor):
+                # Modelo de embeddings mudou: vetores antigos não são comparáveis
+                for antiga in list(self._entradas):
+                    self._remover(antiga)
+                self._matriz = None
+            if chave in self._entradas:
+                self._remover(chave)
+            while len(self._entradas) >= self.max_itens:
+                mais_antiga = next(iter(self._entradas))
+                self._remover(mais_antiga)
+                self.metricas["removidos_lru"] += 1
+
+            self._inserir_memoria(chave, vetor, resultado, agora)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cache_triagem
+                (chave, consulta, embedding, resultado, criado_em, ultimo_acesso)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    chave,
+                    normalizada,
+                    vetor.tobytes(),
+                    json.dumps(resultado),
+                    agora,
+                    agora,
+                ),
+            )
+            self._gravar_acessos()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Métricas de hit/miss e ocupação do cache"""
+        with self._lock:
+            consultas = (
+                self.metricas["hits_exatos"]
+                + self.metricas["hits_semanticos"]
+                + self.metricas["misses"]
+            )
+            hits = self.metricas["hits_exatos"] + self.metricas["hits_semanticos"]
+            return {
+                **self.metricas,
+                "itens": len(self._entradas),
+                "taxa_acerto": hits / consultas if consultas else 0.0,
+            }
+
+    def gravar_acessos(self):
+        """Grava no SQLite o último acesso dos hits ainda pendentes"""
+        with self._lock:
+            self._gravar_acessos()
+
+    def limpar(self):
+        """Remove todas as entradas (memória e SQLite)"""
+        with self._lock:
+            for chave in list(self._entradas):
+                self._remover(chave)
+            self._gravar_acessos()
@@ -0,0 +1,273 @@
+"""
+Checkpointer SQLite com Pool de Conexões
+Em modo WAL o SQLite aceita um escritor e vários leitores ao mesmo tempo:
+1. Leituras (get_tuple/list) usam conexões de um pool, sem disputar o escritor
+2. Escritas (put/put_writes) vão para uma única thread escritora, que agrupa
+   as escritas pendentes de várias threads em um só commit (group commit)
+3. Cada escrita do lote roda em um SAVEPOINT: a que falha é desfeita por
+   inteiro sem afetar as outras
+4. Quem escreve só retorna depois do commit, então nada é perdido
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.checkpoint.base import CheckpointTuple
+from langgraph.checkpoint.sqlite.utils import search_where
+
+from memory.retencao_checkpoints import SqliteSaverComRetencao, compactar
+
+# === CONFIGURAÇÃO PADRÃO ===
+
+MAX_LEITORES = int(os.getenv("CHECKPOINT_POOL_LEITORES", "8"))
+BUSY_TIMEOUT_SEGUNDOS = float(os.getenv("CHECKPOINT_BUSY_TIMEOUT", "30"))
+MAX_ESCRITAS_POR_COMMIT = int(os.getenv("CHECKPOINT_MAX_ESCRITAS_POR_COMMIT", "256"))
+
+
+class _Escrita:
+    """Tarefa entregue à thread escritora; quem pediu espera `concluida`"""
+
+    def __init__(
+        self, executar: Callable[[sqlite3.Connection], Any], em_lote: bool = True
+    ):
+        self.executar = executar
+        # False: faz os próprios commits (compactação), fora da transação do lote
+        self.em_lote = em_lote
+        self.concluida = threading.Event()
+        self.resultado: Any = None
+        self.erro: Optional[BaseException] = None
+
+
+class _CursorEscrita:
+    """Cursor que apenas registra os comandos para a thread escritora"""
+
+    def __init__(self):
+        self.comandos: List[Tuple[str, str, Any]] = []
+
+    def execute(self, sql: str, parametros=()):
+        self.comandos.append(("execute", sql, parametros))
+
+    def executemany(self, sql: str, parametros):
+        self.comandos.append(("executemany", sql, list(parametros)))
+
+    def aplicar(self, conn: sqlite3.Connection):
+        for metodo, sql, parametros in self.comandos:
+            getattr(conn, metodo)(sql, parametros)
+
+
+class SqliteSaverPool(SqliteSaverComRetencao):
+    """
+    SqliteSaver com um escritor dedicado (commits em lote) e pool de leitores
+
+    Mantém a política de retenção do SqliteSaverComRetencao; a compactação
+    também passa pela thread escritora.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_leitores: int = MAX_LEITORES,
+        busy_timeout: float = BUSY_TIMEOUT_SEGUNDOS,
+        max_escritas_por_commit: int = MAX_ESCRITAS_POR_COMMIT,
+        **kwargs,
+    ):
+        """
+        Args:
+            db_path: Arquivo SQLite (precisa ser um arquivo para usar WAL)
+            max_leitores: Conexões de leitura abertas no máximo
+            busy_timeout: Segundos de espera quando o banco está bloqueado
+            max_escritas_por_commit: Limite de escritas agrupadas em um commit
+            **kwargs: Política de retenção (max_checkpoints, ttl_segundos, ...)
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.max_escritas_por_commit = max_escritas_por_commit
+
+        super().__init__(self._conectar(), **kwargs)
+        self.setup()
+
+        # Pool de leitores criado sob demanda
+        self.max_leitores = max_leitores
+        self._leitores: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._vagas_leitura = threading.BoundedSemaphore(max_leitores)
+        self._todos_leitores: List[sqlite3.Connection] = []
+
+        self.metricas = {"escritas": 0, "commits": 0, "leituras": 0}
+
+        self._fila: "queue.Queue[Optional[_Escrita]]" = queue.Queue()
+        self._escritor = threading.Thread(
+            target=self._loop_escritor, name="checkpointer-escritor", daemon=True
+        )
+        self._escritor.start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.busy_timeout, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    # === ESCRITOR ===
+
+    def _loop_escritor(self):
+        """Agrupa as escritas pendentes e faz um commit por lote"""
+        while True:
+            tarefa = self._fila.get()
+            if tarefa is None:
+                return
+            lote = [tarefa]
+            while len(lote) < self.max_escritas_por_commit:
+                try:
+                    proxima = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if proxima is None:
+                    self._fila.put(None)  # Encerra depois deste lote
+                    break
+                lote.append(proxima)
+
+            pendentes = []  # Itens na transação aberta
+            for item in lote:
+                if item.em_lote:
+                    self._executar_em_savepoint(item)
+                    pendentes.append(item)
+                    continue
+                self._commit(pendentes)
+                pendentes = []
+                try:
+                    item.resultado = item.executar(self.conn)
+                except BaseException as e:
+                    item.erro = e
+            self._commit(pendentes)
+            self.metricas["escritas"] += len(lote)
+            for item in lote:
+                item.concluida.set()
+
+    def _executar_em_savepoint(self, item: _Escrita):
+        """Executa o item dentro da transação do lote; se falhar, só ele é desfeito"""
+        if not self.conn.in_transaction:
+            # Sem BEGIN, o RELEASE do primeiro savepoint já faria o commit
+            self.conn.execute("BEGIN")
+        self.conn.execute("SAVEPOINT escrita")
+        try:
+            item.resultado = item.executar(self.conn)
+        except BaseException as e:
+            item.erro = e
+            self.conn.execute("ROLLBACK TO escrita")
+        self.conn.execute("RELEASE escrita")
+
+    def _commit(self, itens: List[_Escrita]):
+        if not itens:
+            return
+        try:
+            self.conn.commit()
+            self.metricas["commits"] += 1
+        except BaseException as e:
+            self.conn.rollback()
+            for item in itens:
+                item.erro = item.erro or e
+
+    def _escrever(
+        self, executar: Callable[[sqlite3.Connection], Any], em_lote: bool = True
+    ) -> Any:
+        """Envia `executar(conn)` ao escritor e espera o commit"""
+        tarefa = _Escrita(executar, em_lote)
+        self._fila.put(tarefa)
+        tarefa.concluida.wait()
+        if tarefa.erro is not None:
+            raise tarefa.erro
+        return tarefa.resultado
+
+    # === LEITORES ===
+
+    @contextmanager
+    def _leitor(self) -> Iterator[sqlite3.Connection]:
+        self._vagas_leitura.acquire()
+        try:
+            conn = self._leitores.get_nowait()
+        except queue.Empty:
+            conn = self._conectar()
+            self._todos_leitores.append(conn)
+        try:
+            yield conn
+        finally:
+            self._leitores.put(conn)
+            self._vagas_leitura.release()
+
+    # === INTEGRAÇÃO COM O SqliteSaver ===
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[Any]:
+        """Leituras usam o pool; escritas são registradas e enviadas ao escritor"""
+        if not transaction:
+            with self._leitor() as conn:
+                cur = conn.cursor()
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+            self.metricas["leituras"] += 1
+            return
+
+        cursor_escrita = _CursorEscrita()
+        yield cursor_escrita
+        if cursor_escrita.comandos:
+            self._escrever(cursor_escrita.aplicar)
+
+    def list(
+        self,
+        config: Optional[Dict[str, Any]],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        Mesmo resultado do SqliteSaver.list, lido pelo pool de leitores
+
+        O list herdado lê os writes pendentes por self.conn, a conexão da
+        thread escritora, a partir da thread de quem chama.
+        """
+        where, parametros = search_where(config, filter, before)
+        sql = f"""
+            SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints
+            {where} ORDER BY checkpoint_id DESC
+        """
+        if limit is not None:
+            sql += " LIMIT ?"
+            parametros = (*parametros, limit)
+        # Lê só as chaves e devolve a conexão: get_tuple pega outra do pool
+        with self.cursor(transaction=False) as cur:
+            chaves = cur.execute(sql, parametros).fetchall()
+        for thread_id, checkpoint_ns, checkpoint_id in chaves:
+            tupla = self.get_tuple(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                }
+            )
+            if tupla is not None:  # Removido pela compactação nesse meio tempo
+                yield tupla
+
+    def compactar_agora(self):
+        return self._escrever(
+            lambda conn: compactar(
+                conn, self.max_checkpoints, self.ttl_segundos, serde=self.serde
+            ),
+            em_lote=False,
+        )
+
+    def fechar(self):
+        """Encerra a thread escritora e fecha todas as conexões"""
+        self._fila.put(None)
+        self._escritor.join()
+        for conn in self._todos_leitores:
+            conn.close()
+        self.conn.close()
@@ -0,0 +1,529 @@
+"""
+Retenção e Compactação dos Checkpoints (conversas.db)
+O SqliteSaver grava um checkpoint a cada passo do grafo e nunca apaga nada.
+Este módulo mantém o arquivo limitado:
+1. Só os últimos N checkpoints de cada thread_id são mantidos
+2. Threads sem atividade há mais que o TTL são removidas por inteiro
+3. WAL + auto_vacuum incremental devolvem as páginas livres ao disco
+4. Compactação periódica a cada K checkpoints gravados
+5. Com o SerializadorCompacto, as mensagens que nenhum checkpoint ou write
+   restante referencia são apagadas do arquivo de mensagens
+
+Uso pela linha de comando (a partir da raiz do projeto):
+    python src/memory/retencao_checkpoints.py relatorio
+    python src/memory/retencao_checkpoints.py compactar --max-checkpoints 20 --vacuum
+    python src/memory/retencao_checkpoints.py simular --escritas 100000
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+if __name__ == "__main__":
+    # Executado como script (ver Uso acima): os imports partem de src/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.serializador_compacto import (
+    SerializadorCompacto,
+    caminho_mensagens,
+    versao_compacta,
+)
+
+# === CONFIGURAÇÃO PADRÃO ===
+
+MAX_CHECKPOINTS_POR_THREAD = int(os.getenv("CHECKPOINT_MAX_POR_THREAD", "20"))
+TTL_THREAD_SEGUNDOS = float(os.getenv("CHECKPOINT_TTL_DIAS", "30")) * 24 * 3600
+INTERVALO_COMPACTACAO = int(os.getenv("CHECKPOINT_INTERVALO_COMPACTACAO", "500"))
+
+# Intervalos de 100ns entre a época UUID (1582-10-15) e a época Unix
+_EPOCA_UUID = 0x01B21DD213814000
+
+
+# === IDS DE CHECKPOINT ===
+
+
+def checkpoint_id_limite(timestamp: float) -> str:
+    """
+    Menor checkpoint_id possível no instante `timestamp`
+
+    Os ids do LangGraph são UUIDv6: o tempo ocupa os bits mais significativos,
+    então comparar os ids como texto equivale a comparar quando foram criados.
+    """
+    intervalos = int(timestamp * 10_000_000) + _EPOCA_UUID
+    valor = ((intervalos >> 12) & 0xFFFFFFFFFFFF) << 80
+    valor |= (0x6000 | (intervalos & 0x0FFF)) << 64
+    texto = f"{valor:032x}"
+    return f"{texto[:8]}-{texto[8:12]}-{texto[12:16]}-{texto[16:20]}-{texto[20:]}"
+
+
+def timestamp_checkpoint(checkpoint_id: str) -> Optional[float]:
+    """Instante (epoch) em que o checkpoint foi criado, ou None se não for UUIDv6"""
+    valor = int(checkpoint_id.replace("-", ""), 16)
+    if (valor >> 76) & 0xF != 6:
+        return None
+    intervalos = ((valor >> 80) << 12) | ((valor >> 64) & 0x0FFF)
+    return (intervalos - _EPOCA_UUID) / 10_000_000
+
+
+# === COMANDOS SQL ===
+
+
+def _comandos_compactacao(
+    max_checkpoints: Optional[int], ttl_segundos: Optional[float]
+) -> List[tuple]:
+    """Lista de (nome, sql, parâmetros) executados em ordem pela compactação"""
+    comandos = []
+    if ttl_segundos is not None:
+        limite = checkpoint_id_limite(time.time() - ttl_segundos)
+        expiradas = """
+            SELECT thread_id FROM checkpoints
+            GROUP BY thread_id HAVING MAX(checkpoint_id) < ?
+        """
+        comandos.append(
+            (
+                "threads_expiradas",
+                f"DELETE FROM checkpoints WHERE thread_id IN ({expiradas})",
+                (limite,),
+            )
+        )
+    if max_checkpoints is not None:
+        comandos.append(
+            (
+                "checkpoints_antigos",
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS posicao
+                        FROM checkpoints
+                    ) WHERE posicao > ?
+                )
+                """,
+                (max_checkpoints,),
+            )
+        )
+    # Writes pendentes de checkpoints que não existem mais
+    comandos.append(
+        (
+            "writes_orfaos",
+            """
+            DELETE FROM writes WHERE NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """,
+            (),
+        )
+    )
+    return comandos
+
+
+# Valores serializados que podem referenciar mensagens (SerializadorCompacto)
+SQL_VALORES_SERIALIZADOS = """
+    SELECT type, checkpoint FROM checkpoints
+    UNION ALL SELECT type, value FROM writes
+"""
+
+
+# === OPERAÇÕES SOBRE A CONEXÃO ===
+
+
+# Executados ao abrir a conexão, antes de o saver criar as tabelas; o
+# auto_vacuum vem primeiro porque o WAL já grava o cabeçalho de um banco novo
+PRAGMAS_CONEXAO = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+
+
+def configurar_conexao(conn: sqlite3.Connection):
+    """
+    Ativa WAL e auto_vacuum incremental na conexão
+
+    Um banco novo já nasce com auto_vacuum incremental. Em um banco existente
+    criado sem ele, o modo só passa a valer após um VACUUM completo, que
+    reescreve o arquivo inteiro: fica para a manutenção explícita
+    (`compactar --vacuum`), nunca na abertura do checkpointer.
+    """
+    for pragma in PRAGMAS_CONEXAO:
+        conn.execute(pragma)
+
+
+async def aconfigurar_conexao(conn):
+    """Versão aiosqlite de configurar_conexao"""
+    for pragma in PRAGMAS_CONEXAO:
+        await conn.execute(pragma)
+
+
+def auto_vacuum_incremental(conn: sqlite3.Connection) -> bool:
+    """Se o auto_vacuum incremental já vale no arquivo (senão, requer VACUUM)"""
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def compactar(
+    conn: sqlite3.Connection,
+    max_checkpoints: Optional[int] = MAX_CHECKPOINTS_POR_THREAD,
+    ttl_segundos: Optional[float] = TTL_THREAD_SEGUNDOS,
+    vacuum: bool = False,
+    serde: Any = None,
+) -> Dict[str, int]:
+    """
+    Aplica a política de retenção e libera o espaço das linhas removidas
+
+    Args:
+        conn: Conexão com o banco de checkpoints
+        max_checkpoints: Checkpoints mantidos por thread (None = sem limite)
+        ttl_segundos: Remove threads sem checkpoint novo nesse período (None = nunca)
+        vacuum: Faz VACUUM completo (reescreve o arquivo) em vez do incremental
+        serde: Serializador do checkpointer; sendo um SerializadorCompacto,
+            as mensagens órfãs também são apagadas
+
+    Returns:
+        Dict com a quantidade de linhas removidas em cada etapa
+    """
+    removidos = {}
+    for nome, sql, parametros in _comandos_compactacao(max_checkpoints, ttl_segundos):
+        removidos[nome] = conn.execute(sql, parametros).rowcount
+    conn.commit()
+    if isinstance(serde, SerializadorCompacto):
+        removidos["mensagens_orfas"] = serde.remover_mensagens_orfas(
+            conn.execute(SQL_VALORES_SERIALIZADOS)
+        )
+
+    if vacuum:
+        conn.execute("VACUUM")
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.commit()
+    # Trunca o WAL para que o arquivo -wal não cresça indefinidamente
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return removidos
+
+
+def relatorio_threads(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Tamanho ocupado por thread_id, do maior para o menor
+
+    Returns:
+        Lista de dicts com thread_id, checkpoints, writes, bytes e ultima_atividade
+    """
+    linhas = conn.execute(
+        """
+        SELECT c.thread_id, c.checkpoints, COALESCE(w.writes, 0),
+               c.bytes + COALESCE(w.bytes, 0), c.ultimo_id
+        FROM (
+            SELECT thread_id, COUNT(*) AS checkpoints, MAX(checkpoint_id) AS ultimo_id,
+                   SUM(LENGTH(checkpoint) + LENGTH(metadata)) AS bytes
+            FROM checkpoints GROUP BY thread_id
+        ) c
+        LEFT JOIN (
+            SELECT thread_id, COUNT(*) AS writes, SUM(LENGTH(value)) AS bytes
+            FROM writes GROUP BY thread_id
+        ) w ON w.thread_id = c.thread_id
+        ORDER BY 4 DESC
+        """
+    ).fetchall()
+    return [
+        {
+            "thread_id": thread_id,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "bytes": tamanho or 0,
+            "ultima_atividade": timestamp_checkpoint(ultimo_id),
+        }
+        for thread_id, checkpoints, writes, tamanho, ultimo_id in linhas
+    ]
+
+
+def tamanho_arquivo(db_path: str) -> int:
+    """Bytes do banco somados aos do WAL"""
+    return sum(
+        os.path.getsize(caminho)
+        for caminho in (db_path, f"{db_path}-wal")
+        if os.path.exists(caminho)
+    )
+
+
+# === CHECKPOINTERS COM RETENÇÃO ===
+
+
+class SqliteSaverComRetencao(SqliteSaver):
+    """SqliteSaver que compacta o banco a cada `intervalo_compactacao` checkpoints"""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        max_checkpoints: Optional[int] = MAX_CHECKPOINTS_POR_THREAD,
+        ttl_segundos: Optional[float] = TTL_THREAD_SEGUNDOS,
+        intervalo_compactacao: int = INTERVALO_COMPACTACAO,
+        **kwargs,
+    ):
+        """
+        Args:
+            conn: Conexão SQLite (check_same_thread=False)
+            max_checkpoints: Checkpoints mantidos por thread
+            ttl_segundos: Tempo sem atividade até a thread ser removida
+            intervalo_compactacao: Checkpoints gravados entre duas compactações
+        """
+        super().__init__(conn, **kwargs)
+        configurar_conexao(conn)
+        self.max_checkpoints = max_checkpoints
+        self.ttl_segundos = ttl_segundos
+        self.intervalo_compactacao = intervalo_compactacao
+        self._escritas = 0
+
+    def get_next_version(self, current, channel):
+        # Versões curtas: os canais de cada checkpoint ocupam ~3x menos
+        return versao_compacta(current)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        resultado = super().put(config, checkpoint, metadata, new_versions)
+        with self.lock:
+            self._escritas += 1
+            devido = self._escritas % self.intervalo_compactacao == 0
+        if devido:
+            self.compactar_agora()
+        return resultado
+
+    def compactar_agora(self) -> Dict[str, int]:
+        """Aplica a política de retenção imediatamente"""
+        with self.lock:
+            self.setup()
+            return compactar(
+                self.conn, self.max_checkpoints, self.ttl_segundos, serde=self.serde
+            )
+
+
+class AsyncSqliteSaverComRetencao(AsyncSqliteSaver):
+    """Versão aiosqlite do SqliteSaverComRetencao (mesma política e SQL)"""
+
+    def __init__(
+        self,
+        conn,
+        max_checkpoints: Optional[int] = MAX_CHECKPOINTS_POR_THREAD,
+        ttl_segundos: Optional[float] = TTL_THREAD_SEGUNDOS,
+        intervalo_compactacao: int = INTERVALO_COMPACTACAO,
+        **kwargs,
+    ):
+        super().__init__(conn, **kwargs)
+        self.max_checkpoints = max_checkpoints
+        self.ttl_segundos = ttl_segundos
+        self.intervalo_compactacao = intervalo_compactacao
+        self._escritas = 0
+
+    async def setup(self) -> None:
+        # A conexão aiosqlite só pode ser usada dentro do event loop: os
+        # PRAGMAs de configurar_conexao rodam aqui, antes das tabelas
+        if not self.is_setup:
+            await aconfigurar_conexao(self.conn)
+        await super().setup()
+
+    def get_next_version(self, current, channel):
+        return versao_compacta(current)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        resultado = await super().aput(config, checkpoint, metadata, new_versions)
+        self._escritas += 1
+        if self._escritas % self.intervalo_compactacao == 0:
+            await self.acompactar()
+        return resultado
+
+    async def acompactar(self) -> Dict[str, int]:
+        """Aplica a política de retenção pela conexão aiosqlite"""
+        removidos = {}
+        comandos = _comandos_compactacao(self.max_checkpoints, self.ttl_segundos)
+        async with self.lock:
+            for nome, sql, parametros in comandos:
+                cursor = await self.conn.execute(sql, parametros)
+                removidos[nome] = cursor.rowcount
+            await self.conn.commit()
+            if isinstance(self.serde, SerializadorCompacto):
+                async with self.conn.execute(SQL_VALORES_SERIALIZADOS) as cursor:
+                    valores = await cursor.fetchall()
+                # O arquivo de mensagens usa sqlite3 síncrono: fora do event loop
+                removidos["mensagens_orfas"] = await asyncio.to_thread(
+                    self.serde.remover_mensagens_orfas, valores
+                )
+            await self.conn.execute("PRAGMA incremental_vacuum")
+            await self.conn.commit()
+            await self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removidos
+
+
+# === SIMULAÇÃO DE CRESCIMENTO ===
+
+
+def simular_crescimento(
+    escritas: int = 100_000,
+    threads: int = 200,
+    max_checkpoints: Optional[int] = MAX_CHECKPOINTS_POR_THREAD,
+    intervalo_compactacao: int = INTERVALO_COMPACTACAO,
+    amostras: int = 10,
+    ttl_segundos: Optional[float] = None,
+) -> List[Dict[str, int]]:
+    """
+    Grava checkpoints sintéticos em um banco temporário e acompanha o tamanho
+
+    Com retenção, linhas e bytes param de crescer após threads × max_checkpoints.
+
+    Returns:
+        Uma amostra por intervalo: escritas, checkpoints, writes e bytes
+    """
+    from langgraph.checkpoint.base import empty_checkpoint
+
+    print("🧪 SIMULAÇÃO DE CRESCIMENTO DO BANCO DE CHECKPOINTS")
+    print(
+        f"Escritas: {escritas} | Threads: {threads} | "
+        f"Máx. por thread: {max_checkpoints or 'sem limite'}"
+    )
+    print("=" * 50)
+
+    resultado = []
+    with tempfile.TemporaryDirectory() as pasta:
+        db_path = os.path.join(pasta, "simulacao.db")
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        saver = SqliteSaverComRetencao(
+            conn,
+            max_checkpoints=max_checkpoints,
+            ttl_segundos=ttl_segundos,
+            intervalo_compactacao=intervalo_compactacao,
+        )
+        payload = "mensagem do cliente " * 20
+        passo = max(1, escritas // amostras)
+        inicio = time.perf_counter()
+
+        for i in range(1, escritas + 1):
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"query": payload, "passo": i}
+            config = {
+                "configurable": {"thread_id": f"sim_{i % threads}", "checkpoint_ns": ""}
+            }
+            config = saver.put(config, checkpoint, {"step": i}, {})
+            saver.put_writes(config, [("response", payload)], task_id=f"t{i}")
+
+            if i % passo == 0:
+                amostra = {
+                    "escritas": i,
+                    "checkpoints": conn.execute(
+                        "SELECT COUNT(*) FROM checkpoints"
+                    ).fetchone()[0],
+                    "writes": conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0],
+                    "bytes": tamanho_arquivo(db_path),
+                }
+                resultado.append(amostra)
+                print(
+                    f"  {i:>7} escritas | {amostra['checkpoints']:>6} checkpoints | "
+                    f"{amostra['bytes'] / 1024:>9.0f} KB"
+                )
+
+        duracao = time.perf_counter() - inicio
+        print(f"⏱️ {escritas / duracao:.0f} escritas/s")
+        conn.close()
+    return resultado
+
+
+# === LINHA DE COMANDO ===
+
+
+def main():
+    # Mesmo arquivo de workflow_memory.db_path, independente do diretório atual
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversas.db")
+
+    parser = argparse.ArgumentParser(description="Retenção do banco de checkpoints")
+    parser.add_argument("--db", default=db_path, help="Arquivo SQLite dos checkpoints")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    relatorio = subcomandos.add_parser("relatorio", help="Tamanho por thread_id")
+    relatorio.add_argument("--top", type=int, default=20)
+
+    compactacao = subcomandos.add_parser("compactar", help="Aplica a retenção")
+    compactacao.add_argument(
+        "--max-checkpoints", type=int, default=MAX_CHECKPOINTS_POR_THREAD
+    )
+    compactacao.add_argument(
+        "--ttl-dias", type=float, default=TTL_THREAD_SEGUNDOS / (24 * 3600)
+    )
+    compactacao.add_argument(
+        "--vacuum", action="store_true", help="VACUUM completo após remover"
+    )
+
+    simulacao = subcomandos.add_parser("simular", help="Crescimento com retenção")
+    simulacao.add_argument("--escritas", type=int, default=100_000)
+    simulacao.add_argument("--threads", type=int, default=200)
+    simulacao.add_argument(
+        "--max-checkpoints", type=int, default=MAX_CHECKPOINTS_POR_THREAD
+    )
+    simulacao.add_argument(
+        "--sem-retencao", action="store_true", help="Não remove checkpoints"
+    )
+
+    args = parser.parse_args()
+
+    if args.comando == "simular":
+        simular_crescimento(
+            args.escritas,
+            args.threads,
+            None if args.sem_retencao else args.max_checkpoints,
+        )
+        return
+
+    if not os.path.exists(args.db):
+        print(f"❌ Banco não encontrado: {args.db}")
+        return
+
+    conn = sqlite3.connect(args.db)
+    SqliteSaver(conn).setup()
+
+    if args.comando == "relatorio":
+        threads = relatorio_threads(conn)
+        print(
+            f"📁 {os.path.abspath(args.db)}: {tamanho_arquivo(args.db) / 1024:.0f} KB"
+        )
+        print(f"🧵 {len(threads)} threads")
+        for thread in threads[: args.top]:
+            ultima = thread["ultima_atividade"]
+            quando = (
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(ultima))
+                if ultima
+                else "-"
+            )
+            print(
+                f"  {thread['thread_id']:<30} {thread['checkpoints']:>5} checkpoints "
+                f"{thread['writes']:>6} writes {thread['bytes'] / 1024:>8.1f} KB  {quando}"
+            )
+    else:
+        mensagens = caminho_mensagens(args.db)
+        serde = SerializadorCompacto(mensagens) if os.path.exists(mensagens) else None
+        antes = tamanho_arquivo(args.db) + tamanho_arquivo(mensagens)
+        configurar_conexao(conn)
+        if not args.vacuum and not auto_vacuum_incremental(conn):
+            print("ℹ️ Banco sem auto_vacuum incremental: rode uma vez com --vacuum")
+        removidos = compactar(
+            conn,
+            args.max_checkpoints,
+            args.ttl_dias * 24 * 3600,
+            vacuum=args.vacuum,
+            serde=serde,
+        )
+        depois = tamanho_arquivo(args.db) + tamanho_arquivo(mensagens)
+        print(f"🧹 Removidos: {removidos}")
+        print(f"📉 {antes / 1024:.0f} KB -> {depois / 1024:.0f} KB")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Serializador Compacto dos Checkpoints
+Variante do JsonPlusSerializer (msgpack) usada pelos checkpointers SQLite:
+1. Enums do estado (categoria, sentimento, prioridade, agente) viram 2 bytes
+   (classe + posição) em vez de módulo, nome da classe e valor
+2. Mensagens são gravadas uma única vez em um arquivo SQLite próprio
+   (caminho_mensagens), endereçadas pelo hash do conteúdo; o checkpoint
+   guarda só a referência (16 bytes), então o histórico não é regravado a
+   cada passo do grafo; a compactação dos checkpoints apaga as mensagens que
+   nenhum checkpoint ou write referencia mais (remover_mensagens_orfas)
+3. Versões de canal com 10 dígitos + 6 aleatórios (versao_compacta) em vez
+   de 32 + 16: são a maior parte de cada checkpoint
+
+Checkpoints gravados pelo serializador padrão continuam legíveis.
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Iterable, Optional, Set, Tuple, Union
+
+import ormsgpack
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from utils.state import AgentType, CategoryType, PriorityType, SentimentType
+
+# Códigos de extensão msgpack (os do LangGraph vão de 0 a 7)
+EXT_ENUM = 100
+EXT_MENSAGEM = 101
+
+# Só acrescente no final: a posição de cada classe e membro vai para o disco
+ENUMS_COMPACTOS = (CategoryType, SentimentType, PriorityType, AgentType)
+
+_MEMBROS = tuple(tuple(classe) for classe in ENUMS_COMPACTOS)
+_CODIGOS = {
+    classe: {membro: bytes([i, j]) for j, membro in enumerate(membros)}
+    for i, (classe, membros) in enumerate(zip(ENUMS_COMPACTOS, _MEMBROS))
+}
+
+
+def caminho_mensagens(caminho_checkpoints: str) -> str:
+    """
+    Arquivo das mensagens de um banco de checkpoints (conversas.db ->
+    conversas_mensagens.db)
+
+    Fica separado para não disputar o lock de escrita com o checkpointer, que
+    serializa alguns valores já dentro da própria transação.
+    """
+    raiz, extensao = os.path.splitext(caminho_checkpoints)
+    return f"{raiz}_mensagens{extensao or '.db'}"
+
+
+def versao_compacta(atual: Optional[Union[str, int]]) -> str:
+    """
+    Próxima versão de um canal (substitui SqliteSaver.get_next_version)
+
+    Continua comparável como texto com as versões antigas de 32 dígitos:
+    enquanto o contador cabe em 10 dígitos, toda versão nova é maior.
+    """
+    if atual is None:
+        proxima = 1
+    elif isinstance(atual, int):
+        proxima = atual + 1
+    else:
+        proxima = int(atual.split(".")[0]) + 1
+    return f"{proxima:010}.{random.randrange(1_000_000):06}"
+
+
+_ESCALARES = {str, int, float, bool, bytes, type(None)}
+
+
+class RepositorioMensagens:
+    """Mensagens serializadas endereçadas pelo hash do conteúdo (SQLite)"""
+
+    def __init__(self, caminho: str, busy_timeout: float = 30.0, max_cache=10_000):
+        """
+        Args:
+            caminho: Arquivo SQLite das mensagens (ver caminho_mensagens)
+            busy_timeout: Segundos de espera quando o banco está bloqueado
+            max_cache: Mensagens mantidas em memória (LRU)
+        """
+        self.conn = sqlite3.connect(
+            caminho, timeout=busy_timeout, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS mensagens_checkpoint (
+                hash BLOB PRIMARY KEY,
+                dados BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        # Órfãs encontradas na última limpeza (apagadas se continuarem órfãs)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS mensagens_orfas (
+                hash BLOB PRIMARY KEY
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+        self.max_cache = max_cache
+        self._cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Mensagens inseridas desde o último commit (ver confirmar)
+        self._pendentes = 0
+
+    def _lembrar(self, chave: bytes, dados: bytes):
+        self._cache[chave] = dados
+        self._cache.move_to_end(chave)
+        if len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+
+    def salvar(self, dados: bytes) -> bytes:
+        """
+        Grava a mensagem (se ainda não existir) e retorna sua chave
+
+        O commit fica para confirmar(), uma vez por checkpoint serializado.
+        """
+        chave = hashlib.blake2b(dados, digest_size=16).digest()
+        with self._lock:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                return chave
+            self.conn.execute(
+                "INSERT OR IGNORE INTO mensagens_checkpoint (hash, dados) VALUES (?, ?)",
+                (chave, dados),
+            )
+            # Usada de novo: o checkpoint que a referencia ainda não foi gravado
+            self.conn.execute("DELETE FROM mensagens_orfas WHERE hash = ?", (chave,))
+            self._pendentes += 1
+            self._lembrar(chave, dados)
+        return chave
+
+    def confirmar(self):
+        """Faz o commit das mensagens salvas desde a última confirmação"""
+        with self._lock:
+            if self._pendentes:
+                self.conn.commit()
+                self._pendentes = 0
+
+    def carregar(self, chave: bytes) -> bytes:
+        with self._lock:
+            dados = self._cache.get(chave)
+            if dados is None:
+                linha = self.conn.execute(
+                    "SELECT dados FROM mensagens_checkpoint WHERE hash = ?", (chave,)
+                ).fetchone()
+                if linha is None:
+                    raise KeyError(f"mensagem {chave.hex()} não encontrada")
+                dados = linha[0]
+            self._lembrar(chave, dados)
+            return dados
+
+    def geracao(self) -> int:
+        """Número de limpezas já feitas no arquivo (por qualquer processo)"""
+        with self._lock:
+            return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def esquecer(self):
+        """Descarta o cache em memória (chaves podem ter sido apagadas)"""
+        with self._lock:
+            self._cache.clear()
+
+    def remover_orfas(self, referenciadas: Set[bytes]) -> int:
+        """
+        Apaga as mensagens fora de `referenciadas` em duas etapas
+
+        Uma mensagem órfã só é apagada se já estava órfã na limpeza anterior:
+        a chave pode ter sido entregue a um checkpoint que ainda não terminou
+        de ser gravado (a serialização acontece antes da transação).
+
+        Returns:
+            Quantidade de mensagens apagadas
+        """
+        with self._lock:
+            self._pendentes = 0  # O commit abaixo também grava as pendentes
+            orfas = [
+                (chave,)
+                for (chave,) in self.conn.execute(
+                    "SELECT hash FROM mensagens_checkpoint"
+                )
+                if chave not in referenciadas
+            ]
+            apagadas = self.conn.executemany(
+                """
+                DELETE FROM mensagens_checkpoint WHERE hash = ?
+                AND hash IN (SELECT hash FROM mensagens_orfas)
+                """,
+                orfas,
+            ).rowcount
+            self.conn.execute("DELETE FROM mensagens_orfas")
+            self.conn.executemany(
+                """
+                INSERT INTO mensagens_orfas (hash)
+                SELECT ? WHERE EXISTS (SELECT 1 FROM mensagens_checkpoint WHERE hash = ?)
+                """,
+                [(chave, chave) for (chave,) in orfas],
+            )
+            # Outros serializadores veem a geração nova e descartam seus caches
+            geracao = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            self.conn.execute(f"PRAGMA user_version = {geracao + 1}")
+            self.conn.commit()
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._cache.clear()
+        return apagadas
+
+    def fechar(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SerializadorCompacto(JsonPlusSerializer):
+    """JsonPlusSerializer com enums compactos e mensagens por referência"""
+
+    def __init__(self, caminho: str, **kwargs):
+        """
+        Args:
+            caminho: Arquivo SQLite das mensagens (ver caminho_mensagens)
+            **kwargs: Opções do JsonPlusSerializer
+        """
+        super().__init__(**kwargs)
+        self.mensagens = RepositorioMensagens(caminho)
+        # id(mensagem) -> (mensagem, chave): o mesmo objeto aparece em todos
+        # os checkpoints da thread e não precisa ser serializado de novo
+        self._chaves: "OrderedDict[int, Tuple[BaseMessage, bytes]]" = OrderedDict()
+        # chave -> mensagem já desserializada (mensagens são imutáveis)
+        self._lidas: "OrderedDict[bytes, BaseMessage]" = OrderedDict()
+        self._lock_chaves = threading.Lock()
+        self._geracao = self.mensagens.geracao()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        if type(obj) is dict and "channel_values" in obj:
+            # Uma consulta da geração por checkpoint (não por valor serializado)
+            self._validar_caches()
+            # Checkpoint: versões e ids não têm enums nem mensagens
+            obj = {**obj, "channel_values": self._compactar(obj["channel_values"])}
+        else:
+            obj = self._compactar(obj)
+        # As mensagens novas precisam estar no disco antes da referência
+        self.mensagens.confirmar()
+        return super().dumps_typed(obj)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        tipo, dados = data
+        if tipo != "msgpack":
+            return super().loads_typed(data)
+        return ormsgpack.unpackb(
+            dados, ext_hook=self._ext_hook, option=ormsgpack.OPT_NON_STR_KEYS
+        )
+
+    def _compactar(self, obj: Any) -> Any:
+        """Troca enums e mensagens por extensões msgpack (só em dict/list/tuple)"""
+        tipo = type(obj)
+        if tipo in _ESCALARES:
+            return obj
+        if tipo is dict:
+            return {chave: self._compactar(valor) for chave, valor in obj.items()}
+        if tipo is list:
+            return [self._compactar(valor) for valor in obj]
+        if tipo is tuple:
+            return tuple(self._compactar(valor) for valor in obj)
+        if isinstance(obj, BaseMessage):
+            return ormsgpack.Ext(EXT_MENSAGEM, self._chave_mensagem(obj))
+        if isinstance(obj, Enum) and tipo in _CODIGOS:
+            return ormsgpack.Ext(EXT_ENUM, _CODIGOS[tipo][obj])
+        return obj
+
+    def _chave_mensagem(self, mensagem: BaseMessage) -> bytes:
+        with self._lock_chaves:
+            conhecida = self._chaves.get(id(mensagem))
+            if conhecida is not None and conhecida[0] is mensagem:
+                self._chaves.move_to_end(id(mensagem))
+                return conhecida[1]
+
+        _, dados = super().dumps_typed(mensagem)
+        chave = self.mensagens.salvar(dados)
+        self._lembrar(mensagem, chave)
+        return chave
+
+    def _lembrar(self, mensagem: BaseMessage, chave: bytes):
+        with self._lock_chaves:
+            # Guardar a mensagem impede que o id seja reutilizado
+            self._chaves[id(mensagem)] = (mensagem, chave)
+            self._lidas[chave] = mensagem
+            for cache in (self._chaves, self._lidas):
+                if len(cache) > self.mensagens.max_cache:
+                    cache.popitem(last=False)
+
+    def _carregar_mensagem(self, chave: bytes) -> BaseMessage:
+        with self._lock_chaves:
+            mensagem = self._lidas.get(chave)
+        if mensagem is None:
+            dados = self.mensagens.carregar(chave)
+            mensagem = super().loads_typed(("msgpack", dados))
+            # Regravar um checkpoint lido não serializa a mensagem de novo
+            self._lembrar(mensagem, chave)
+        return mensagem
+
+    # === LIMPEZA DAS MENSAGENS ===
+
+    def _validar_caches(self):
+        """
+        Descarta as chaves em memória se outra limpeza apagou mensagens
+
+        A geração só muda em remover_orfas: a deste processo já atualiza
+        self._geracao, e a de outros é vista na próxima gravação de checkpoint.
+        """
+        geracao = self.mensagens.geracao()
+        if geracao != self._geracao:
+            self._esquecer(geracao)
+
+    def _esquecer(self, geracao: int):
+        with self._lock_chaves:
+            self._chaves.clear()
+            self._lidas.clear()
+            self._geracao = geracao
+        self.mensagens.esquecer()
+
+    @staticmethod
+    def referencias(tipo: str, dados: bytes) -> Set[bytes]:
+        """Chaves das mensagens referenciadas por um valor serializado"""
+        chaves = set()
+        if tipo != "msgpack" or not dados:
+            return chaves
+
+        def coletar(codigo: int, conteudo: bytes) -> None:
+            if codigo == EXT_MENSAGEM:
+                chaves.add(conteudo)
+
+        ormsgpack.unpackb(dados, ext_hook=coletar, option=ormsgpack.OPT_NON_STR_KEYS)
+        return chaves
+
+    def remover_mensagens_orfas(self, valores: Iterable[Tuple[str, bytes]]) -> int:
+        """
+        Apaga as mensagens que nenhum dos `valores` referencia
+
+        Args:
+            valores: (type, blob) de todos os checkpoints e writes restantes
+
+        Returns:
+            Quantidade de mensagens apagadas
+        """
+        referenciadas: Set[bytes] = set()
+        for tipo, dados in valores:
+            referenciadas |= self.referencias(tipo, dados)
+        apagadas = self.mensagens.remover_orfas(referenciadas)
+        self._esquecer(self.mensagens.geracao())
+        return apagadas
+
+    def _ext_hook(self, codigo: int, dados: bytes) -> Any:
+        if codigo == EXT_ENUM:
+            return _MEMBROS[dados[0]][dados[1]]
+        if codigo == EXT_MENSAGEM:
+            return self._carregar_mensagem(dados)
+        return self._unpack_ext_hook(codigo, dados)
@@ -0,0 +1,452 @@
+"""
+Store de Longo Prazo em SQLite
+Implementa a interface BaseStore do LangGraph (get/put/search/list_namespaces)
+sobre um arquivo SQLite, substituindo o InMemoryStore que se perdia a cada
+reinício e fazia busca linear:
+1. Itens ficam em uma tabela ordenada por (namespace, chave): buscar um
+   namespace ou prefixo de namespace é uma varredura de intervalo no índice
+2. Operações em lote (put/get de muitos itens) usam uma única transação
+3. Índice vetorial local opcional (embeddings + NumPy) para `search(query=...)`
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langgraph.store.base import (
+    BaseStore,
+    GetOp,
+    IndexConfig,
+    Item,
+    ListNamespacesOp,
+    MatchCondition,
+    Op,
+    PutOp,
+    Result,
+    SearchItem,
+    SearchOp,
+    ensure_embeddings,
+    get_text_at_path,
+    tokenize_path,
+)
+
+# Labels de namespace não podem conter "." (regra do LangGraph), então o
+# namespace é gravado como texto "a.b.c" e "/" (sucessor de ".") fecha o intervalo
+_SEPARADOR = "."
+_FIM_PREFIXO = "/"
+
+
+def _namespace_texto(namespace: Tuple[str, ...]) -> str:
+    return _SEPARADOR.join(namespace)
+
+
+def _namespace_tupla(texto: str) -> Tuple[str, ...]:
+    return tuple(texto.split(_SEPARADOR)) if texto else ()
+
+
+def _condicao_prefixo(prefixo: Tuple[str, ...], coluna: str = "namespace"):
+    """Cláusula WHERE que seleciona o namespace `prefixo` e todos abaixo dele"""
+    if not prefixo:
+        return "1 = 1", []
+    texto = _namespace_texto(prefixo)
+    # Um único intervalo (sem OR) mantém a varredura e a ordem do índice; o
+    # intervalo também cobre "texto-x", descartado pela checagem do separador
+    return (
+        f"({coluna} >= ? AND {coluna} < ? "
+        f"AND ({coluna} = ? OR substr({coluna}, ?, 1) = ?))",
+        [texto, texto + _FIM_PREFIXO, texto, len(texto) + 1, _SEPARADOR],
+    )
+
+
+def _caminho(campo: str):
+    # "$" (o documento inteiro) só é reconhecido sem tokenizar, como no InMemoryStore
+    return campo if campo == "$" else tokenize_path(campo)
+
+
+def _data(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+# === FILTROS (mesma semântica do InMemoryStore) ===
+
+
+def _aplicar_operador(valor: Any, operador: str, esperado: Any) -> bool:
+    if operador == "$eq":
+        return valor == esperado
+    if operador == "$ne":
+        return valor != esperado
+    if valor is None:
+        return False
+    if operador == "$gt":
+        return float(valor) > float(esperado)
+    if operador == "$gte":
+        return float(valor) >= float(esperado)
+    if operador == "$lt":
+        return float(valor) < float(esperado)
+    if operador == "$lte":
+        return float(valor) <= float(esperado)
+    raise ValueError(f"Operador não suportado: {operador}")
+
+
+def _compara(valor: Any, esperado: Any) -> bool:
+    if isinstance(esperado, dict):
+        if any(chave.startswith("$") for chave in esperado):
+            return all(_aplicar_operador(valor, op, v) for op, v in esperado.items())
+        return isinstance(valor, dict) and all(
+            _compara(valor.get(k), v) for k, v in esperado.items()
+        )
+    return valor == esperado
+
+
+def _filtro_confere(valor: Dict[str, Any], filtro: Optional[Dict[str, Any]]) -> bool:
+    return not filtro or all(_compara(valor.get(k), v) for k, v in filtro.items())
+
+
+def _namespace_confere(condicao: MatchCondition, namespace: Tuple[str, ...]) -> bool:
+    caminho = tuple(condicao.path)
+    if len(namespace) < len(caminho):
+        return False
+    if condicao.match_type == "prefix":
+        pares = zip(namespace, caminho)
+    elif condicao.match_type == "suffix":
+        pares = zip(reversed(namespace), reversed(caminho))
+    else:
+        raise ValueError(f"Tipo de condição não suportado: {condicao.match_type}")
+    return all(esperado == "*" or atual == esperado for atual, esperado in pares)
+
+
+class StoreSQLite(BaseStore):
+    """BaseStore persistente em SQLite com índice vetorial local opcional"""
+
+    def __init__(self, db_path: str, index: Optional[IndexConfig] = None):
+        """
+        Args:
+            db_path: Arquivo SQLite (":memory:" para não persistir)
+            index: Configuração do índice vetorial ({"dims", "embed", "fields"});
+                sem ela, `search(query=...)` ignora a query
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        self.index_config = index
+        self.embeddings = ensure_embeddings(index["embed"]) if index else None
+        campos = (index or {}).get("fields") or ["$"]
+        self._campos = [(campo, _caminho(campo)) for campo in campos]
+
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS itens (
+                namespace TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                atualizado_em REAL NOT NULL,
+                PRIMARY KEY (namespace, chave)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS vetores (
+                namespace TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                campo TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (namespace, chave, campo)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+
+    # === INTERFACE DO BaseStore ===
+
+    def batch(self, ops: Iterable[Op]) -> List[Result]:
+        """Executa as operações em ordem; puts consecutivos viram uma transação"""
+        ops = list(ops)
+        resultados: List[Result] = [None] * len(ops)
+        puts: List[PutOp] = []
+        gets: List[Tuple[int, GetOp]] = []
+
+        for i, op in enumerate(ops):
+            if isinstance(op, PutOp):
+                self._executar_gets(gets, resultados)
+                puts.append(op)
+                continue
+            self._executar_puts(puts)
+            if isinstance(op, GetOp):
+                gets.append((i, op))
+                continue
+            self._executar_gets(gets, resultados)
+            if isinstance(op, SearchOp):
+                resultados[i] = self._buscar(op)
+            elif isinstance(op, ListNamespacesOp):
+                resultados[i] = self._listar_namespaces(op)
+            else:
+                raise ValueError(f"Operação desconhecida: {type(op)}")
+
+        self._executar_puts(puts)
+        self._executar_gets(gets, resultados)
+        return resultados
+
+    async def abatch(self, ops: Iterable[Op]) -> List[Result]:
+        return await asyncio.to_thread(self.batch, list(ops))
+
+    # === OPERAÇÕES EM LOTE ===
+
+    def salvar_em_lote(
+        self, namespace: Tuple[str, ...], itens: Dict[str, Dict[str, Any]]
+    ):
+        """Grava vários itens de um namespace em uma única transação"""
+        self.batch(PutOp(namespace, chave, valor) for chave, valor in itens.items())
+
+    def buscar_em_lote(
+        self, namespace: Tuple[str, ...], chaves: Iterable[str]
+    ) -> Dict[str, Optional[Item]]:
+        """Lê vários itens de um namespace com uma consulta por bloco de chaves"""
+        chaves = list(chaves)
+        itens = self.batch(GetOp(namespace, chave) for chave in chaves)
+        return dict(zip(chaves, itens))
+
+    # === IMPLEMENTAÇÃO ===
+
+    def _executar_puts(self, puts: List[PutOp]):
+        if not puts:
+            return
+        # Último put vence quando a mesma chave aparece mais de uma vez
+        finais: Dict[Tuple[str, str], PutOp] = {}
+        for op in puts:
+            finais[(_namespace_texto(op.namespace), op.key)] = op
+        puts.clear()
+
+        agora = time.time()
+        remover = [chave for chave, op in finais.items() if op.value is None]
+        gravar = [(chave, op) for chave, op in finais.items() if op.value is not None]
+        vetores = self._vetores_para(gravar)
+
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM itens WHERE namespace = ? AND chave = ?", remover
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO itens (namespace, chave, valor, criado_em, atualizado_em)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, chave)
+                DO UPDATE SET valor = excluded.valor, atualizado_em = excluded.atualizado_em
+                """,
+                [
+                    (ns, chave, json.dumps(op.value, ensure_ascii=False), agora, agora)
+                    for (ns, chave), op in gravar
+                ],
+            )
+            if self.embeddings is not None:
+                self._conn.executemany(
+                    "DELETE FROM vetores WHERE namespace = ? AND chave = ?",
+                    remover + [chave for chave, _ in gravar],
+                )
+                self._conn.executemany(
+                    "INSERT INTO vetores (namespace, chave, campo, embedding) "
+                    "VALUES (?, ?, ?, ?)",
+                    vetores,
+                )
+            self._conn.commit()
+
+    def _vetores_para(self, gravar) -> List[tuple]:
+        """Calcula (fora do lock) os embeddings dos campos indexados"""
+        if self.embeddings is None:
+            return []
+        linhas, textos = [], []
+        for (ns, chave), op in gravar:
+            if op.index is False:
+                continue
+            campos = (
+                [(campo, _caminho(campo)) for campo in op.index]
+                if op.index
+                else self._campos
+            )
+            for campo, caminho in campos:
+                for texto in get_text_at_path(op.value, caminho):
+                    linhas.append((ns, chave, campo))
+                    textos.append(texto)
+        if not textos:
+            return []
+        embeddings = np.asarray(
+            self.embeddings.embed_documents(textos), dtype=np.float32
+        )
+        normas = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(normas == 0, 1, normas)
+        # Campos com vários textos (listas) ganham um sufixo por posição
+        vistos: Dict[tuple, int] = {}
+        resultado = []
+        for (ns, chave, campo), vetor in zip(linhas, embeddings):
+            n = vistos.get((ns, chave, campo), 0)
+            vistos[(ns, chave, campo)] = n + 1
+            nome = campo if n == 0 else f"{campo}#{n}"
+            resultado.append((ns, chave, nome, vetor.tobytes()))
+        return resultado
+
+    def _executar_gets(self, gets: List[Tuple[int, GetOp]], resultados: List[Result]):
+        if not gets:
+            return
+        por_namespace: Dict[str, List[Tuple[int, str]]] = {}
+        for i, op in gets:
+            por_namespace.setdefault(_namespace_texto(op.namespace), []).append(
+                (i, op.key)
+            )
+        gets.clear()
+
+        with self._lock:
+            for ns, pedidos in por_namespace.items():
+                encontrados = {}
+                chaves = list({chave for _, chave in pedidos})
+                # Blocos abaixo do limite de parâmetros do SQLite
+                for inicio in range(0, len(chaves), 900):
+                    bloco = chaves[inicio : inicio + 900]
+                    marcadores = ",".join("?" * len(bloco))
+                    for linha in self._conn.execute(
+                        f"""
+                        SELECT chave, valor, criado_em, atualizado_em FROM itens
+                        WHERE namespace = ? AND chave IN ({marcadores})
+                        """,
+                        [ns, *bloco],
+                    ):
+                        encontrados[linha[0]] = linha
+                for i, chave in pedidos:
+                    linha = encontrados.get(chave)
+                    resultados[i] = (
+                        Item(
+                            value=json.loads(linha[1]),
+                            key=chave,
+                            namespace=_namespace_tupla(ns),
+                            created_at=_data(linha[2]),
+                            updated_at=_data(linha[3]),
+                        )
+                        if linha
+                        else None
+                    )
+
+    def _buscar(self, op: SearchOp) -> List[SearchItem]:
+        if op.query and self.embeddings is not None:
+            return self._buscar_semantico(op)
+
+        condicao, parametros = _condicao_prefixo(op.namespace_prefix)
+        resultados = []
+        pular = op.offset
+        with self._lock:
+            cursor = self._conn.execute(
+                f"""
+                SELECT namespace, chave, valor, criado_em, atualizado_em FROM itens
+                WHERE {condicao} ORDER BY namespace, chave
+                """,
+                parametros,
+            )
+            # Segue a ordem do índice e para assim que a página estiver completa
+            for ns, chave, valor, criado_em, atualizado_em in cursor:
+                valor = json.loads(valor)
+                if not _filtro_confere(valor, op.filter):
+                    continue
+                if pular:
+                    pular -= 1
+                    continue
+                resultados.append(
+                    SearchItem(
+                        _namespace_tupla(ns),
+                        chave,
+                        valor,
+                        _data(criado_em),
+                        _data(atualizado_em),
+                    )
+                )
+                if len(resultados) >= op.limit:
+                    break
+            cursor.close()
+        return resultados
+
+    def _buscar_semantico(self, op: SearchOp) -> List[SearchItem]:
+        consulta = np.asarray(self.embeddings.embed_query(op.query), dtype=np.float32)
+        norma = np.linalg.norm(consulta)
+        if norma:
+            consulta = consulta / norma
+
+        condicao, parametros = _condicao_prefixo(op.namespace_prefix)
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT namespace, chave, embedding FROM vetores WHERE {condicao}",
+                parametros,
+            ).fetchall()
+        if not linhas:
+            return []
+
+        matriz = np.frombuffer(b"".join(linha[2] for linha in linhas), np.float32)
+        pontuacoes = matriz.reshape(len(linhas), -1) @ consulta
+        # Um item com vários campos indexados fica com a melhor pontuação
+        melhores: Dict[Tuple[str, str], float] = {}
+        for (ns, chave, _), pontuacao in zip(linhas, pontuacoes.tolist()):
+            if pontuacao > melhores.get((ns, chave), -np.inf):
+                melhores[(ns, chave)] = pontuacao
+
+        resultados = []
+        pular = op.offset
+        for (ns, chave), pontuacao in sorted(
+            melhores.items(), key=lambda item: item[1], reverse=True
+        ):
+            item = self._executar_get_unico(ns, chave)
+            if item is None or not _filtro_confere(item.value, op.filter):
+                continue
+            if pular:
+                pular -= 1
+                continue
+            resultados.append(
+                SearchItem(
+                    item.namespace,
+                    item.key,
+                    item.value,
+                    item.created_at,
+                    item.updated_at,
+                    score=pontuacao,
+                )
+            )
+            if len(resultados) >= op.limit:
+                break
+        return resultados
+
+    def _executar_get_unico(self, ns: str, chave: str) -> Optional[Item]:
+        resultado: List[Result] = [None]
+        self._executar_gets([(0, GetOp(_namespace_tupla(ns), chave))], resultado)
+        return resultado[0]
+
+    def _listar_namespaces(self, op: ListNamespacesOp) -> List[Tuple[str, ...]]:
+        # Uma condição de prefixo sem curingas restringe a varredura do índice
+        prefixo: Tuple[str, ...] = ()
+        for condicao in op.match_conditions or ():
+            if condicao.match_type == "prefix":
+                caminho = tuple(condicao.path)
+                fixo = caminho[: caminho.index("*")] if "*" in caminho else caminho
+                if len(fixo) > len(prefixo):
+                    prefixo = fixo
+        clausula, parametros = _condicao_prefixo(prefixo)
+
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT DISTINCT namespace FROM itens WHERE {clausula}", parametros
+            ).fetchall()
+
+        namespaces = set()
+        for (texto,) in linhas:
+            namespace = _namespace_tupla(texto)
+            if all(_namespace_confere(c, namespace) for c in op.match_conditions or ()):
+                if op.max_depth is not None:
+                    namespace = namespace[: op.max_depth]
+                namespaces.add(namespace)
+        return sorted(namespaces)[op.offset : op.offset + op.limit]
+
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
@@ -3,30 +3,94 @@ Sistema de Memória Simples usando LangGraph Checkpointer
 Implementação minimalista seguindo padrão oficial
 """
 
-from langgraph.checkpoint.sqlite import SqliteSaver
-from langgraph.store.memory import InMemoryStore
+from typing import Optional
 from langchain_core.messages import HumanMessage
 import sqlite3
+import threading
 import os
 
 # === CONFIGURAÇÃO GLOBAL DE MEMÓRIA ===
-
-# Memória de longo prazo - persiste entre conversas
-in_memory_store = InMemoryStore()
+# Nada é aberto no import: checkpointer e store são criados no primeiro uso
+# (obter_checkpointer / obter_store), e os backends SQLite só são importados aí
 
 # Criar diretório se não existir
 db_path = "src/memory/conversas.db"
+store_db_path = "src/memory/memoria_longo_prazo.db"
 os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
 
+_lock = threading.Lock()
+_checkpointer = None
+_store = None
+
+
+# Memória de longo prazo - persiste entre conversas (e entre reinícios)
+def criar_store(caminho: str = store_db_path, indexar_vetores: bool = False):
+    """
+    Cria o store de longo prazo em SQLite
+
+    Args:
+        caminho: Arquivo SQLite do store
+        indexar_vetores: Ativa a busca semântica com embeddings locais (sem rede)
+    """
+    from memory.store_sqlite import StoreSQLite
+
+    index = None
+    if indexar_vetores:
+        from memory.cache_triagem import EmbeddingLocal
+
+        embeddings = EmbeddingLocal()
+        index = {"dims": embeddings.dimensoes, "embed": embeddings}
+    return StoreSQLite(caminho, index=index)
+
 
 # Memória de curto prazo - persiste dentro de uma thread/conversa
 # Criar conexão SQLite explicitamente
-def criar_checkpointer():
-    """Cria checkpointer SQLite de forma segura"""
+def criar_checkpointer(
+    pool: bool = True,
+    max_leitores: Optional[int] = None,
+    busy_timeout: Optional[float] = None,
+    caminho: str = db_path,
+    compacto: bool = True,
+):
+    """
+    Cria checkpointer SQLite de forma segura
+
+    Args:
+        pool: Usa o SqliteSaverPool (escritor único com commits em lote e pool
+            de leitores); False usa uma conexão única protegida por lock
+        max_leitores: Conexões de leitura do pool (padrão: CHECKPOINT_POOL_LEITORES)
+        busy_timeout: Segundos de espera quando o banco está bloqueado
+            (padrão: CHECKPOINT_BUSY_TIMEOUT)
+        caminho: Arquivo SQLite dos checkpoints
+        compacto: Usa o SerializadorCompacto (enums em 2 bytes e mensagens
+            gravadas uma vez, por referência)
+    """
     try:
-        # Método mais seguro para criar SqliteSaver
-        conn = sqlite3.connect(db_path, check_same_thread=False)
-        checkpointer = SqliteSaver(conn)
+        from memory.checkpointer_pool import (
+            BUSY_TIMEOUT_SEGUNDOS,
+            MAX_LEITORES,
+            SqliteSaverPool,
+        )
+        from memory.retencao_checkpoints import SqliteSaverComRetencao
+        from memory.serializador_compacto import (
+            SerializadorCompacto,
+            caminho_mensagens,
+        )
+
+        serde = SerializadorCompacto(caminho_mensagens(caminho)) if compacto else None
+        max_leitores = max_leitores or MAX_LEITORES
+        busy_timeout = busy_timeout or BUSY_TIMEOUT_SEGUNDOS
+
+        # WAL + retenção: últimos N checkpoints por thread e TTL por thread
+        if pool:
+            return SqliteSaverPool(
+                caminho,
+                max_leitores=max_leitores,
+                busy_timeout=busy_timeout,
+                serde=serde,
+            )
+        conn = sqlite3.connect(caminho, timeout=busy_timeout, check_same_thread=False)
+        checkpointer = SqliteSaverComRetencao(conn, serde=serde)
         return checkpointer
     except Exception as e:
         print(f"⚠️ Erro ao criar SqliteSaver: {e}")
@@ -36,7 +100,58 @@ def criar_checkpointer():
         return MemorySaver()
 
 
-checkpointer = criar_checkpointer()
+def obter_checkpointer():
+    """Checkpointer global, criado na primeira chamada"""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            _checkpointer = criar_checkpointer()
+        return _checkpointer
+
+
+def obter_store():
+    """Store de longo prazo global, criado na primeira chamada"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = criar_store()
+        return _store
+
+
+def __getattr__(nome: str):
+    # Compatibilidade: `workflow_memory.checkpointer` e
+    # `workflow_memory.store_longo_prazo` continuam funcionando, sob demanda
+    if nome == "checkpointer":
+        return obter_checkpointer()
+    if nome == "store_longo_prazo":
+        return obter_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+async def criar_checkpointer_async():
+    """
+    Cria checkpointer SQLite assíncrono (aiosqlite) sobre o mesmo arquivo
+
+    Deve ser chamado dentro do event loop que vai usá-lo.
+    """
+    try:
+        import aiosqlite
+        from memory.retencao_checkpoints import AsyncSqliteSaverComRetencao
+        from memory.serializador_compacto import (
+            SerializadorCompacto,
+            caminho_mensagens,
+        )
+
+        conn = await aiosqlite.connect(db_path)
+        serde = SerializadorCompacto(caminho_mensagens(db_path))
+        return AsyncSqliteSaverComRetencao(conn, serde=serde)
+    except Exception as e:
+        print(f"⚠️ Erro ao criar AsyncSqliteSaver: {e}")
+        print("🔄 Usando MemorySaver como fallback")
+        from langgraph.checkpoint.memory import MemorySaver
+
+        return MemorySaver()
+
 
 # === FUNÇÃO PARA CONFIGURAR MEMÓRIA ===
 
@@ -45,15 +160,19 @@ def configurar_memoria_sistema():
     """
     Configura sistema de memória global para todos os agentes
     """
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
     print("🧠 Configurando sistema de memória...")
+    checkpointer = obter_checkpointer()
     if isinstance(checkpointer, SqliteSaver):
         print("✅ SqliteSaver (persistente) configurado")
         print(f"📁 Arquivo: {os.path.abspath(db_path)}")
     else:
         print("✅ MemorySaver (temporário) configurado")
-    print("✅ InMemoryStore (longo prazo) configurado")
+    print("✅ StoreSQLite (longo prazo, persistente) configurado")
+    print(f"📁 Arquivo: {os.path.abspath(store_db_path)}")
 
-    return checkpointer, in_memory_store
+    return checkpointer, obter_store()
 
 
 # === FUNÇÃO PARA PROCESSAR COM MEMÓRIA ===
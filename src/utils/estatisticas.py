@@ -0,0 +1,24 @@
+"""
+Utilitários estatísticos simples para os benchmarks do sistema
+"""
+
+import math
+from typing import Dict, List
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil pelo método nearest-rank (p entre 0 e 100)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = max(1, math.ceil(p / 100 * len(ordenados)))
+    return ordenados[posicao - 1]
+
+
+def resumo_latencias(valores: List[float]) -> Dict[str, float]:
+    """Resumo p50/p95/média de uma lista de latências (em segundos)"""
+    return {
+        "p50": percentil(valores, 50),
+        "p95": percentil(valores, 95),
+        "media": sum(valores) / len(valores) if valores else 0.0,
+    }
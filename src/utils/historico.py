@@ -0,0 +1,229 @@
+"""
+Redução do Histórico de Mensagens dos Agentes
+Pre-model hook para create_react_agent que limita o histórico enviado ao LLM
+por um orçamento de tokens (tiktoken):
+1. Mensagens de sistema do início são sempre mantidas
+2. Os últimos K turnos (um turno começa em cada HumanMessage) entram enquanto
+   couberem no orçamento; o turno mais recente entra sempre
+3. Os turnos descartados são incorporados a um resumo acumulado, guardado no
+   estado e enviado como mensagem de sistema
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+logger = logging.getLogger(__name__)
+
+# === CONFIGURAÇÃO PADRÃO ===
+
+MAX_TOKENS_HISTORICO = int(os.getenv("HISTORICO_MAX_TOKENS", "2000"))
+MAX_TURNOS_HISTORICO = int(os.getenv("HISTORICO_MAX_TURNOS", "6"))
+MAX_TOKENS_RESUMO = int(os.getenv("HISTORICO_MAX_TOKENS_RESUMO", "300"))
+MODELO_TOKENIZADOR = os.getenv("HISTORICO_MODELO", "gpt-4o-mini")
+
+# Tokens extras de formatação por mensagem no formato de chat da OpenAI
+TOKENS_POR_MENSAGEM = 4
+
+PREFIXO_RESUMO = "Resumo da conversa anterior:\n"
+
+_lock = threading.Lock()
+_tokenizadores: Dict[str, Any] = {}
+
+
+# === CONTAGEM DE TOKENS ===
+
+
+def _tokenizador(modelo: str):
+    """Encoding do tiktoken para o modelo (None se indisponível, ex.: offline)"""
+    with _lock:
+        if modelo not in _tokenizadores:
+            try:
+                import tiktoken
+
+                try:
+                    encoding = tiktoken.encoding_for_model(modelo)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # Sem tiktoken ou sem o arquivo BPE: usa ~4 caracteres por token
+                logger.warning(f"⚠️ tiktoken indisponível ({e}) - contagem aproximada")
+                encoding = None
+            _tokenizadores[modelo] = encoding
+        return _tokenizadores[modelo]
+
+
+def contar_tokens_texto(texto: str, modelo: str = MODELO_TOKENIZADOR) -> int:
+    encoding = _tokenizador(modelo)
+    if encoding is None:
+        return len(texto) // 4 + 1
+    return len(encoding.encode(texto, disallowed_special=()))
+
+
+def contar_tokens(
+    mensagens: Sequence[BaseMessage], modelo: str = MODELO_TOKENIZADOR
+) -> int:
+    """Tokens que as mensagens ocupam no prompt (conteúdo + tool calls)"""
+    total = 0
+    for mensagem in mensagens:
+        total += TOKENS_POR_MENSAGEM + contar_tokens_texto(_texto(mensagem), modelo)
+        for chamada in getattr(mensagem, "tool_calls", None) or []:
+            total += contar_tokens_texto(
+                f"{chamada['name']}{chamada.get('args')}", modelo
+            )
+    return total
+
+
+def _texto(mensagem: BaseMessage) -> str:
+    if isinstance(mensagem.content, str):
+        return mensagem.content
+    # Conteúdo multimodal: só os blocos de texto contam
+    return " ".join(
+        bloco.get("text", "") if isinstance(bloco, dict) else str(bloco)
+        for bloco in mensagem.content
+    )
+
+
+# === RESUMO ===
+
+
+def resumo_extrativo(
+    resumo: str, mensagens: Sequence[BaseMessage], max_tokens: int = MAX_TOKENS_RESUMO
+) -> str:
+    """
+    Acrescenta ao resumo uma linha por mensagem do cliente e resposta final do
+    agente (sem LLM); quando passa de `max_tokens`, as linhas mais antigas saem
+    """
+    linhas = resumo.splitlines() if resumo else []
+    for mensagem in mensagens:
+        if isinstance(mensagem, HumanMessage):
+            autor = "Cliente"
+        elif isinstance(mensagem, AIMessage) and not mensagem.tool_calls:
+            autor = "Agente"
+        else:
+            continue  # Chamadas e resultados de tools ficam de fora
+        texto = " ".join(_texto(mensagem).split())
+        if texto:
+            linhas.append(f"- {autor}: {texto[:200]}")
+
+    while len(linhas) > 1 and contar_tokens_texto("\n".join(linhas)) > max_tokens:
+        linhas.pop(0)
+    return "\n".join(linhas)
+
+
+def resumo_com_llm(llm, max_tokens: int = MAX_TOKENS_RESUMO) -> Callable:
+    """
+    Cria uma função de resumo que usa o LLM para atualizar o resumo acumulado
+
+    Args:
+        llm: Chat model (ex.: obter_llm("gpt-4o-mini"))
+        max_tokens: Tamanho aproximado pedido para o resumo
+    """
+
+    def resumir(resumo: str, mensagens: Sequence[BaseMessage]) -> str:
+        trecho = "\n".join(
+            f"{m.type}: {_texto(m)}"
+            for m in mensagens
+            if not isinstance(m, ToolMessage)
+        )
+        prompt = (
+            f"Atualize o resumo de um atendimento em até {max_tokens} tokens, "
+            "mantendo fatos, pedidos do cliente e decisões tomadas.\n\n"
+            f"Resumo atual:\n{resumo or '(vazio)'}\n\nNovas mensagens:\n{trecho}"
+        )
+        return llm.invoke(prompt).content.strip()
+
+    return resumir
+
+
+# === PRE-MODEL HOOK ===
+
+
+class RedutorHistorico:
+    """
+    Pre-model hook que entrega ao LLM só o histórico que cabe no orçamento
+
+    Usa `llm_input_messages`: o histórico completo continua no estado (e no
+    checkpointer); o resumo acumulado fica em `resumo_historico`.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = MAX_TOKENS_HISTORICO,
+        max_turnos: int = MAX_TURNOS_HISTORICO,
+        resumir: Optional[Callable] = None,
+        modelo: str = MODELO_TOKENIZADOR,
+    ):
+        """
+        Args:
+            max_tokens: Orçamento de tokens do histórico (resumo incluído)
+            max_turnos: Número máximo de turnos recentes mantidos
+            resumir: f(resumo, mensagens_descartadas) -> novo resumo
+                (padrão: resumo_extrativo, sem chamada ao LLM)
+            modelo: Modelo cujo tokenizador é usado na contagem
+        """
+        self.max_tokens = max_tokens
+        self.max_turnos = max_turnos
+        self.resumir = resumir or resumo_extrativo
+        self.modelo = modelo
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        mensagens = list(state["messages"])
+        inicio = 0
+        while inicio < len(mensagens) and isinstance(mensagens[inicio], SystemMessage):
+            inicio += 1
+        sistema, conversa = mensagens[:inicio], mensagens[inicio:]
+
+        corte = self._corte(conversa, state.get("resumo_historico") or "")
+
+        # Incorpora ao resumo só o que foi descartado desde a última chamada
+        resumo = state.get("resumo_historico") or ""
+        resumidas = state.get("mensagens_resumidas") or 0
+        if resumidas > corte:
+            # Histórico foi substituído: o resumo antigo não vale mais
+            resumo, resumidas = "", 0
+        if corte > resumidas:
+            resumo = self.resumir(resumo, conversa[resumidas:corte])
+            resumidas = corte
+
+        entrada = list(sistema)
+        if resumo:
+            entrada.append(SystemMessage(content=PREFIXO_RESUMO + resumo))
+        entrada.extend(conversa[corte:])
+        return {
+            "llm_input_messages": entrada,
+            "resumo_historico": resumo,
+            "mensagens_resumidas": resumidas,
+        }
+
+    def _corte(self, conversa: List[BaseMessage], resumo: str) -> int:
+        """Índice da primeira mensagem mantida (contagem só dos turnos mantidos)"""
+        inicios = [
+            i for i, m in enumerate(conversa) if isinstance(m, HumanMessage)
+        ] or [0]
+        if inicios[0] != 0:
+            inicios.insert(0, 0)  # Mensagens antes do primeiro HumanMessage
+
+        orcamento = self.max_tokens
+        if resumo:
+            orcamento -= contar_tokens_texto(PREFIXO_RESUMO + resumo, self.modelo)
+
+        corte = len(conversa)
+        turnos = 0
+        for inicio in reversed(inicios):
+            custo = contar_tokens(conversa[inicio:corte], self.modelo)
+            if turnos and (turnos >= self.max_turnos or custo > orcamento):
+                break
+            orcamento -= custo
+            corte = inicio
+            turnos += 1
+        return corte
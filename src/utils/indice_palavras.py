@@ -0,0 +1,127 @@
+"""
+Índice de Palavras-Chave (Aho–Corasick)
+Localiza em uma única passada pelo texto todas as palavras-chave (e sinônimos)
+de uma base de conhecimento, em vez de testar entrada por entrada
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+from utils.texto import normalizar_texto
+
+
+class IndicePalavrasChave:
+    """
+    Autômato Aho–Corasick sobre palavras-chave normalizadas (sem acentos)
+
+    Construído uma vez; cada busca custa O(tamanho do texto + ocorrências),
+    independente do número de entradas da base.
+    """
+
+    def __init__(self, entradas: Dict[str, Iterable[str]]):
+        """
+        Args:
+            entradas: Chave da base -> palavras-chave e sinônimos que a ativam
+        """
+        # Trie: transições, link de falha e saídas (chave, tamanho) de cada estado
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falha: List[int] = [0]
+        self._saidas: List[List[Tuple[str, int]]] = [[]]
+        self.total_palavras = 0
+
+        for chave, palavras in entradas.items():
+            for palavra in palavras:
+                palavra = normalizar_texto(palavra)
+                if palavra:
+                    self._adicionar(palavra, chave)
+
+        self._construir_falhas()
+
+    def _adicionar(self, palavra: str, chave: str):
+        estado = 0
+        for caractere in palavra:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][caractere] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append((chave, len(palavra)))
+        self.total_palavras += 1
+
+    def _construir_falhas(self):
+        """BFS pela trie ligando cada estado ao maior sufixo que também é prefixo"""
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                # Herda as saídas do estado de falha (palavras que são sufixos)
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[destino]
+
+    def buscar(self, texto: str) -> List[Tuple[str, int]]:
+        """
+        Retorna todas as chaves com ocorrência no texto, da mais à menos relevante
+
+        A pontuação de uma chave é a soma dos caracteres casados por suas
+        palavras-chave distintas; empates favorecem a que aparece primeiro.
+        Ocorrências só contam como palavras inteiras: "rede" não casa com
+        "redefinir" nem "troca" com "trocar".
+
+        Returns:
+            Lista de (chave, pontuação)
+        """
+        return [
+            (chave, pontuacao) for chave, pontuacao, _ in self.buscar_detalhado(texto)
+        ]
+
+    def buscar_detalhado(self, texto: str) -> List[Tuple[str, int, int]]:
+        """
+        Igual a buscar, com o número de palavras-chave distintas de cada chave
+
+        Returns:
+            Lista de (chave, pontuação, palavras distintas)
+        """
+        texto = normalizar_texto(texto)
+        pontuacao: Dict[str, int] = {}
+        palavras: Dict[str, int] = {}
+        primeira_posicao: Dict[str, int] = {}
+        vistas = set()
+
+        ultima = len(texto) - 1
+        estado = 0
+        for posicao, caractere in enumerate(texto):
+            while estado and caractere not in self._transicoes[estado]:
+                estado = self._falha[estado]
+            estado = self._transicoes[estado].get(caractere, 0)
+
+            for chave, tamanho in self._saidas[estado]:
+                inicio = posicao - tamanho + 1
+                if inicio > 0 and texto[inicio - 1] != " ":
+                    continue
+                if posicao < ultima and texto[posicao + 1] != " ":
+                    continue
+                palavra = texto[inicio : posicao + 1]
+                if (chave, palavra) in vistas:
+                    continue
+                vistas.add((chave, palavra))
+                pontuacao[chave] = pontuacao.get(chave, 0) + tamanho
+                palavras[chave] = palavras.get(chave, 0) + 1
+                primeira_posicao.setdefault(chave, inicio)
+
+        ordenadas = sorted(
+            pontuacao,
+            key=lambda chave: (-pontuacao[chave], primeira_posicao[chave]),
+        )
+        return [(chave, pontuacao[chave], palavras[chave]) for chave in ordenadas]
+
+    def contem(self, texto: str) -> bool:
+        """True se alguma palavra-chave ocorre no texto"""
+        return bool(self.buscar(texto))
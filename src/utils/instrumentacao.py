@@ -0,0 +1,427 @@
+"""
+Instrumentação do Workflow de Suporte
+Registro de métricas em processo (contadores e histogramas por rótulo), um
+exportador no formato texto do Prometheus e um sink JSONL de eventos de trace:
+- Tempo de parede de cada nó do grafo
+- Tokens e latência de cada chamada ao LLM (por nó)
+- Duração de cada tool
+- Hits e misses do cache de triagem e do fast path por regras
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils.estatisticas import percentil
+
+# Limites (segundos) dos buckets de latência, de 1ms a 30s
+BUCKETS_LATENCIA = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Amostras recentes guardadas por série para percentis exatos
+AMOSTRAS_POR_SERIE = 10_000
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+def _rotulos(rotulos: Dict[str, Any]) -> Rotulos:
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+
+def _formatar_rotulos(rotulos: Rotulos, extra: Optional[Tuple[str, str]] = None):
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# === MÉTRICAS ===
+
+
+class Contador:
+    """Contador monotônico por combinação de rótulos"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str):
+        self.nome = nome
+        self.ajuda = ajuda
+        self._valores: Dict[Rotulos, float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor: float = 1.0, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valores(self) -> Dict[Rotulos, float]:
+        with self._lock:
+            return dict(self._valores)
+
+    def exportar(self) -> List[str]:
+        return [
+            f"{self.nome}{_formatar_rotulos(rotulos)} {valor:g}"
+            for rotulos, valor in sorted(self.valores().items())
+        ]
+
+
+class Histograma:
+    """Histograma cumulativo (estilo Prometheus) por combinação de rótulos"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: Iterable[float]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = tuple(sorted(buckets))
+        # rótulos -> [contagem por bucket..., soma, total]
+        self._series: Dict[Rotulos, List[float]] = {}
+        self._amostras: Dict[Rotulos, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [0.0] * (len(self.buckets) + 2)
+                self._amostras[chave] = deque(maxlen=AMOSTRAS_POR_SERIE)
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+            self._amostras[chave].append(valor)
+
+    def resumo(self) -> Dict[Rotulos, Dict[str, float]]:
+        """p50/p95/p99, soma e contagem de cada série (amostras recentes)"""
+        with self._lock:
+            copia = {
+                k: (list(v), list(self._amostras[k])) for k, v in self._series.items()
+            }
+        return {
+            rotulos: {
+                "p50": percentil(amostras, 50),
+                "p95": percentil(amostras, 95),
+                "p99": percentil(amostras, 99),
+                "soma": serie[-2],
+                "contagem": serie[-1],
+            }
+            for rotulos, (serie, amostras) in copia.items()
+        }
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        linhas = []
+        for rotulos, serie in sorted(series.items()):
+            for limite, contagem in zip(self.buckets, serie):
+                linhas.append(
+                    f"{self.nome}_bucket{_formatar_rotulos(rotulos, ('le', f'{limite:g}'))} "
+                    f"{contagem:g}"
+                )
+            linhas.append(
+                f"{self.nome}_bucket{_formatar_rotulos(rotulos, ('le', '+Inf'))} "
+                f"{serie[-1]:g}"
+            )
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(rotulos)} {serie[-2]:g}")
+            linhas.append(
+                f"{self.nome}_count{_formatar_rotulos(rotulos)} {serie[-1]:g}"
+            )
+        return linhas
+
+
+class RegistroMetricas:
+    """Registro em processo de contadores e histogramas"""
+
+    def __init__(self):
+        self._metricas: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def contador(self, nome: str, ajuda: str = "") -> Contador:
+        with self._lock:
+            if nome not in self._metricas:
+                self._metricas[nome] = Contador(nome, ajuda)
+            return self._metricas[nome]
+
+    def histograma(
+        self, nome: str, ajuda: str = "", buckets: Iterable[float] = BUCKETS_LATENCIA
+    ) -> Histograma:
+        with self._lock:
+            if nome not in self._metricas:
+                self._metricas[nome] = Histograma(nome, ajuda, buckets)
+            return self._metricas[nome]
+
+    def obter(self, nome: str):
+        return self._metricas.get(nome)
+
+    def exportar_prometheus(self) -> str:
+        """Todas as métricas no formato texto de exposição do Prometheus"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in sorted(metricas, key=lambda m: m.nome):
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+    def limpar(self):
+        with self._lock:
+            self._metricas.clear()
+
+
+# === TRACE JSONL ===
+
+
+class SinkJSONL:
+    """Grava um evento de trace por linha em um arquivo JSONL"""
+
+    def __init__(self, caminho: str):
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho = caminho
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def emitir(self, evento: Dict[str, Any]):
+        linha = json.dumps(evento, ensure_ascii=False, default=str)
+        with self._lock:
+            self._arquivo.write(linha + "\n")
+            self._arquivo.flush()
+
+    def fechar(self):
+        with self._lock:
+            self._arquivo.close()
+
+
+# === INSTRUMENTAÇÃO ===
+
+
+class Instrumentacao:
+    """Ponto único usado pelo workflow para registrar métricas e traces"""
+
+    def __init__(
+        self,
+        registro: Optional[RegistroMetricas] = None,
+        sink: Optional[SinkJSONL] = None,
+    ):
+        """
+        Args:
+            registro: Registro de métricas (padrão: um registro novo)
+            sink: Destino dos eventos de trace (None não grava traces)
+        """
+        self.registro = registro or RegistroMetricas()
+        self.sink = sink
+        self.nos = self.registro.histograma(
+            "suporte_no_duracao_segundos", "Tempo de parede de cada nó do grafo"
+        )
+        self.llm = self.registro.histograma(
+            "suporte_llm_duracao_segundos", "Latência de cada chamada ao LLM"
+        )
+        self.tokens = self.registro.contador(
+            "suporte_llm_tokens_total", "Tokens consumidos por nó e tipo"
+        )
+        self.tools = self.registro.histograma(
+            "suporte_tool_duracao_segundos", "Duração de cada chamada de tool"
+        )
+        self.triagem = self.registro.contador(
+            "suporte_triagem_total", "Triagens por origem (regras, cache ou LLM)"
+        )
+        self.rotas = self.registro.histograma(
+            "suporte_rota_duracao_segundos", "Redação da resposta por rota e nível"
+        )
+        self.custo = self.registro.contador(
+            "suporte_rota_custo_usd_total", "Custo estimado da redação por rota"
+        )
+        self.fallbacks = self.registro.contador(
+            "suporte_rota_fallback_total", "Redações que subiram de nível de modelo"
+        )
+        self.callback = CallbackInstrumentacao(self)
+
+    def evento(self, tipo: str, **dados):
+        """Emite um evento de trace (se houver sink configurado)"""
+        if self.sink is not None:
+            self.sink.emitir({"ts": time.time(), "tipo": tipo, **dados})
+
+    @contextmanager
+    def medir_no(self, no: str, config: Optional[Dict[str, Any]] = None):
+        """Mede o tempo de parede de um nó do grafo (inclusive quando falha)"""
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            yield
+        except BaseException as e:
+            erro = e
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.nos.observar(duracao, no=no)
+            self.evento(
+                "no",
+                no=no,
+                thread_id=thread_id,
+                duracao_ms=duracao * 1000,
+                erro=repr(erro) if erro else None,
+            )
+
+    def registrar_triagem(self, origem: str, **dados):
+        """Conta de onde veio a triagem: regras, cache, cache_miss ou llm"""
+        self.triagem.incrementar(origem=origem)
+        self.evento("triagem", origem=origem, **dados)
+
+    def registrar_rota(self, registro: Dict[str, Any]):
+        """Registra uma redação do roteador de modelos (latência, custo, fallback)"""
+        rota = registro["rota"]
+        nivel = registro["nivel"] or "template"
+        self.rotas.observar(registro["latencia_ms"] / 1000, rota=rota, nivel=nivel)
+        self.custo.incrementar(registro["custo_usd"], rota=rota)
+        if len(registro["niveis_tentados"]) > 1:
+            self.fallbacks.incrementar(rota=rota)
+        self.evento("rota", **registro)
+
+    def relatorio_rotas(self) -> Dict[str, Dict[str, Any]]:
+        """Por rota: redações, fallbacks, p50/p95 da redação e custo total"""
+        relatorio: Dict[str, Dict[str, Any]] = {}
+        for rotulos, r in self.rotas.resumo().items():
+            rotulos = dict(rotulos)
+            linha = relatorio.setdefault(
+                rotulos["rota"],
+                {"redacoes": 0, "fallbacks": 0, "custo_usd": 0.0, "por_nivel": {}},
+            )
+            linha["redacoes"] += int(r["contagem"])
+            linha["por_nivel"][rotulos["nivel"]] = r
+        for rotulos, valor in self.fallbacks.valores().items():
+            relatorio[dict(rotulos)["rota"]]["fallbacks"] = int(valor)
+        for rotulos, valor in self.custo.valores().items():
+            relatorio[dict(rotulos)["rota"]]["custo_usd"] = valor
+        return relatorio
+
+    def relatorio_nos(self) -> List[Tuple[str, Dict[str, float]]]:
+        """Nós ordenados pelo p95 (o mais lento primeiro)"""
+        linhas = [(dict(rotulos)["no"], r) for rotulos, r in self.nos.resumo().items()]
+        return sorted(linhas, key=lambda item: item[1]["p95"], reverse=True)
+
+
+class CallbackInstrumentacao(BaseCallbackHandler):
+    """Callback do LangChain que mede LLMs (tokens e latência) e tools"""
+
+    def __init__(self, instrumentacao: Instrumentacao):
+        self.instrumentacao = instrumentacao
+        # run_id -> (início, nome, nó do grafo, thread_id)
+        self._execucoes: Dict[Any, Tuple[float, str, str, Optional[str]]] = {}
+
+    def _iniciar(self, run_id, nome: str, metadata: Optional[Dict[str, Any]]):
+        metadata = metadata or {}
+        self._execucoes[run_id] = (
+            time.perf_counter(),
+            nome,
+            metadata.get("langgraph_node", "-"),
+            metadata.get("thread_id"),
+        )
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, metadata=None, **kwargs
+    ):
+        self._iniciar(run_id, self._modelo(serialized, metadata), metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._iniciar(run_id, self._modelo(serialized, metadata), metadata)
+
+    def _modelo(self, serialized, metadata) -> str:
+        return (
+            (metadata or {}).get("ls_model_name")
+            or (serialized or {}).get("name")
+            or "llm"
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        execucao = self._execucoes.pop(run_id, None)
+        if execucao is None:
+            return
+        inicio, modelo, no, thread_id = execucao
+        duracao = time.perf_counter() - inicio
+
+        entrada = saida = 0
+        for geracoes in response.generations:
+            for geracao in geracoes:
+                uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+                if uso:
+                    entrada += uso.get("input_tokens", 0)
+                    saida += uso.get("output_tokens", 0)
+        if not entrada and not saida:
+            uso = (response.llm_output or {}).get("token_usage") or {}
+            entrada = uso.get("prompt_tokens", 0)
+            saida = uso.get("completion_tokens", 0)
+
+        inst = self.instrumentacao
+        inst.llm.observar(duracao, no=no, modelo=modelo)
+        inst.tokens.incrementar(entrada, no=no, tipo="entrada")
+        inst.tokens.incrementar(saida, no=no, tipo="saida")
+        inst.evento(
+            "llm",
+            no=no,
+            modelo=modelo,
+            thread_id=thread_id,
+            duracao_ms=duracao * 1000,
+            tokens_entrada=entrada,
+            tokens_saida=saida,
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._execucoes.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        self._iniciar(run_id, (serialized or {}).get("name") or "tool", metadata)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finalizar_tool(run_id, erro=None)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finalizar_tool(run_id, erro=error)
+
+    def _finalizar_tool(self, run_id, erro):
+        execucao = self._execucoes.pop(run_id, None)
+        if execucao is None:
+            return
+        inicio, tool, no, thread_id = execucao
+        duracao = time.perf_counter() - inicio
+        self.instrumentacao.tools.observar(duracao, tool=tool)
+        self.instrumentacao.evento(
+            "tool",
+            tool=tool,
+            no=no,
+            thread_id=thread_id,
+            duracao_ms=duracao * 1000,
+            erro=repr(erro) if erro else None,
+        )
+
+
+# Instância padrão; TRACE_JSONL=caminho ativa a gravação de traces
+instrumentacao_padrao = Instrumentacao(
+    sink=SinkJSONL(os.environ["TRACE_JSONL"]) if os.getenv("TRACE_JSONL") else None
+)
@@ -0,0 +1,215 @@
+"""
+LLM Simulado para benchmarks e execuções offline
+Responde de forma determinística, com atraso (e jitter) configurável, sem
+chamar a API; as respostas podem seguir um roteiro por consulta
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+# === VOCABULÁRIO USADO PELA RESPOSTA PADRÃO ===
+
+PALAVRAS_TECNICAS = ["login", "logar", "senha", "sistema", "erro", "travou", "bug"]
+PALAVRAS_FINANCEIRAS = ["cobrado", "cobrança", "pagamento", "reembolso", "cartão"]
+PALAVRAS_NEGATIVAS = ["irritado", "péssimo", "absurdo", "perdi", "raiva"]
+
+
+def _categoria(consulta: str) -> str:
+    if any(palavra in consulta for palavra in PALAVRAS_TECNICAS):
+        return "Technical"
+    if any(palavra in consulta for palavra in PALAVRAS_FINANCEIRAS):
+        return "Billing"
+    return "General"
+
+
+def _sentimento(consulta: str) -> str:
+    if any(palavra in consulta for palavra in PALAVRAS_NEGATIVAS):
+        return "Negative"
+    return "Neutral"
+
+
+def _extrair_consulta(texto: str) -> str:
+    # A consulta é a linha que segue o último "Consulta:" do prompt
+    return texto.rsplit("consulta:", 1)[-1].split("\n", 1)[0].strip()
+
+
+def resposta_padrao(prompt: str) -> str:
+    """Imita as respostas das tools de triagem a partir do texto do prompt"""
+    texto = prompt.lower()
+    consulta = _extrair_consulta(texto)
+    return _resposta_triagem(texto, _categoria(consulta), _sentimento(consulta))
+
+
+def responder_por_roteiro(roteiro: Dict[str, Dict[str, str]]) -> Callable[[str], str]:
+    """
+    Cria um `responder` que devolve a triagem roteirizada de cada consulta
+
+    Args:
+        roteiro: Consulta -> {"category": ..., "sentiment": ...}; campos ou
+            consultas ausentes caem na resposta padrão
+    """
+    roteiro = {consulta.lower().strip(): saida for consulta, saida in roteiro.items()}
+
+    def responder(prompt: str) -> str:
+        texto = prompt.lower()
+        consulta = _extrair_consulta(texto)
+        saida = roteiro.get(consulta, {})
+        return _resposta_triagem(
+            texto,
+            saida.get("category") or _categoria(consulta),
+            saida.get("sentiment") or _sentimento(consulta),
+        )
+
+    return responder
+
+
+def responder_redacao(taxa_incerteza: float = 0.0) -> Callable[[str], str]:
+    """
+    Cria um `responder` que redige a resposta final repetindo as informações
+    do prompt (ver utils/roteador_modelos.py)
+
+    Args:
+        taxa_incerteza: Fração das consultas (estável por consulta) em que o
+            modelo responde sem certeza, como um modelo local fraco
+    """
+
+    def responder(prompt: str) -> str:
+        consulta = _extrair_consulta(prompt.lower())
+        if zlib.crc32(consulta.encode()) % 1000 < taxa_incerteza * 1000:
+            return "Não sei responder com certeza."
+        informacoes = prompt.split("Informações:\n", 1)[-1]
+        informacoes = informacoes.split("\n\nConsulta:", 1)[0].strip()
+        return f"Olá! Obrigado pelo contato. {informacoes}"
+
+    return responder
+
+
+def _resposta_triagem(texto: str, categoria: str, sentimento: str) -> str:
+    # Triagem conjunta: categoria, sentimento e prioridade em JSON
+    if "json" in texto:
+        if sentimento == "Negative":
+            prioridade = "High"
+        elif categoria == "Billing" or categoria == "Technical":
+            prioridade = "Medium"
+        else:
+            prioridade = "Low"
+        return json.dumps(
+            {"category": categoria, "sentiment": sentimento, "priority": prioridade}
+        )
+
+    if "sentimento" in texto:
+        return sentimento
+    return categoria
+
+
+class LLMSimulado(BaseChatModel):
+    """
+    Chat model determinístico que espera `atraso` segundos antes de responder
+
+    Com `jitter`, cada chamada espera atraso ± jitter (uniforme); `semente`
+    torna a sequência de atrasos reproduzível. Em stream, a resposta chega
+    palavra a palavra depois da espera, com o uso de tokens no último pedaço.
+    """
+
+    atraso: float = 0.0
+    jitter: float = 0.0
+    semente: Optional[int] = None
+    responder: Callable[[str], str] = resposta_padrao
+
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.semente)
+
+    def _espera(self) -> float:
+        if not self.jitter:
+            return self.atraso
+        return max(0.0, self.atraso + self._rng.uniform(-self.jitter, self.jitter))
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-simulado"
+
+    def _resultado(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        resposta = self.responder(prompt)
+        # Uso aproximado (uma palavra = um token) para a instrumentação
+        entrada, saida = len(prompt.split()), len(resposta.split())
+        mensagem = AIMessage(
+            content=resposta,
+            usage_metadata={
+                "input_tokens": entrada,
+                "output_tokens": saida,
+                "total_tokens": entrada + saida,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=mensagem)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        espera = self._espera()
+        if espera:
+            time.sleep(espera)
+        return self._resultado(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        espera = self._espera()
+        if espera:
+            await asyncio.sleep(espera)
+        return self._resultado(messages)
+
+    def _pedacos(self, messages: List[BaseMessage]) -> Iterator[ChatGenerationChunk]:
+        mensagem = self._resultado(messages).generations[0].message
+        palavras = re.findall(r"\s*\S+\s*", str(mensagem.content)) or [""]
+        for i, palavra in enumerate(palavras, 1):
+            uso = mensagem.usage_metadata if i == len(palavras) else None
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=palavra, usage_metadata=uso)
+            )
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        espera = self._espera()
+        if espera:
+            time.sleep(espera)
+        yield from self._pedacos(messages)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        espera = self._espera()
+        if espera:
+            await asyncio.sleep(espera)
+        for pedaco in self._pedacos(messages):
+            yield pedaco
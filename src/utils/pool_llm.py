@@ -0,0 +1,161 @@
+"""
+Pool de Clientes LLM compartilhado pelos agentes
+Cria cada ChatOpenAI uma única vez (por modelo/temperatura) sobre um pool HTTP
+limitado, reaproveitando conexões keep-alive entre tickets
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+# === CONFIGURAÇÃO DO POOL HTTP ===
+
+MAX_CONEXOES = int(os.getenv("LLM_POOL_MAX_CONEXOES", "20"))
+MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+TIMEOUT_SEGUNDOS = float(os.getenv("LLM_POOL_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+# Registro de clientes e chains já criados
+_clientes: Dict[Tuple[str, Optional[float], Optional[str]], Any] = {}
+_chains: Dict[Tuple[str, str, Optional[float]], Any] = {}
+
+# Quando definido, substitui todos os modelos (ex.: LLMSimulado em benchmarks)
+_llm_override: Optional[Any] = None
+
+_contadores = {
+    "clientes_criados": 0,
+    "clientes_reutilizados": 0,
+    "chains_criadas": 0,
+    "chains_reutilizadas": 0,
+}
+
+
+def _limites() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONEXOES, max_keepalive_connections=MAX_KEEPALIVE
+    )
+
+
+def _obter_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """Cria (uma vez) os clientes HTTP compartilhados por todos os modelos"""
+    global _http_client, _http_async_client
+    if _http_client is None:
+        _http_client = httpx.Client(limits=_limites(), timeout=TIMEOUT_SEGUNDOS)
+        _http_async_client = httpx.AsyncClient(
+            limits=_limites(), timeout=TIMEOUT_SEGUNDOS
+        )
+    return _http_client, _http_async_client
+
+
+# === INTERFACE PÚBLICA ===
+
+
+def obter_llm(
+    model: str = "gpt-4o-mini",
+    temperature: Optional[float] = 0.0,
+    base_url: Optional[str] = None,
+):
+    """
+    Retorna o cliente LLM para (model, temperature, base_url), criando-o na
+    primeira vez
+
+    Args:
+        model: Nome do modelo OpenAI
+        temperature: Temperatura de amostragem (None usa o padrão do modelo)
+        base_url: Endpoint compatível com a API da OpenAI (ex.: Ollama em
+            http://localhost:11434/v1); None usa a OpenAI
+    """
+    if _llm_override is not None:
+        return _llm_override
+
+    chave = (model, temperature, base_url)
+    with _lock:
+        llm = _clientes.get(chave)
+        if llm is not None:
+            _contadores["clientes_reutilizados"] += 1
+            return llm
+
+        # Import tardio: langchain_openai só é carregado quando um modelo é usado
+        from langchain_openai import ChatOpenAI
+
+        http_client, http_async_client = _obter_http_clients()
+        extras = {}
+        if base_url is not None:
+            # Endpoints locais (Ollama, vLLM) não validam a chave
+            extras = {
+                "base_url": base_url,
+                "api_key": os.getenv("LLM_LOCAL_API_KEY", "local"),
+            }
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            # Com http_client próprio o ChatOpenAI não pede o uso no stream;
+            # sem ele as respostas transmitidas registrariam 0 tokens e custo
+            stream_usage=True,
+            **extras,
+        )
+        _clientes[chave] = llm
+        _contadores["clientes_criados"] += 1
+        return llm
+
+
+def obter_chain(
+    nome: str,
+    prompt,
+    model: str = "gpt-4o-mini",
+    temperature: Optional[float] = 0.0,
+    parser=None,
+    **bind_kwargs,
+):
+    """
+    Retorna a chain `prompt | llm [| parser]` pré-compilada para `nome`
+
+    Args:
+        nome: Identificador da chain (ex.: "categorizar")
+        prompt: ChatPromptTemplate já construído
+        model: Nome do modelo OpenAI
+        temperature: Temperatura de amostragem
+        parser: Output parser opcional aplicado ao final
+        **bind_kwargs: Parâmetros fixos passados ao modelo (ex.: response_format)
+    """
+    chave = (nome, model, temperature)
+    with _lock:
+        chain = _chains.get(chave)
+        if chain is not None:
+            _contadores["chains_reutilizadas"] += 1
+            return chain
+
+    llm = obter_llm(model, temperature)
+    if bind_kwargs:
+        llm = llm.bind(**bind_kwargs)
+    chain = prompt | llm
+    if parser is not None:
+        chain = chain | parser
+
+    with _lock:
+        # Outra thread pode ter criado a mesma chain enquanto montávamos esta
+        chain = _chains.setdefault(chave, chain)
+        _contadores["chains_criadas"] += 1
+    return chain
+
+
+def definir_llm_override(llm=None):
+    """Substitui todos os modelos por `llm` (None restaura os clientes reais)"""
+    global _llm_override
+    with _lock:
+        _llm_override = llm
+        # Chains compiladas apontam para o modelo antigo
+        _chains.clear()
+
+
+def estatisticas_pool() -> Dict[str, int]:
+    """Contadores de criação vs reutilização de clientes e chains"""
+    with _lock:
+        return {**_contadores, "clientes_ativos": len(_clientes)}
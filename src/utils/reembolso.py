@@ -0,0 +1,234 @@
+"""
+Cálculo de Reembolso em Lote
+Mesmas faixas da tool calcular_reembolso (agents/agente_financeiro.py),
+vetorizadas com NumPy para rodar a elegibilidade de milhões de pedidos:
+1. calcular_reembolsos: arrays de valor e dias -> percentuais e valores
+2. processar_csv: CSV de entrada -> CSV de saída, em blocos de linhas, sem
+   carregar o arquivo inteiro na memória
+
+Uso pela linha de comando (a partir da raiz do projeto):
+    python src/utils/reembolso.py pedidos.csv reembolsos.csv
+    python src/utils/reembolso.py pedidos.csv - --delimitador ";" --decimal ","
+"""
+
+import argparse
+import csv
+import sys
+import time
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# NumPy só é importado no cálculo em lote: a tool calcular_reembolso usa as
+# mesmas faixas e é importada na partida do workflow
+if TYPE_CHECKING:
+    import numpy as np
+
+# === POLÍTICA DE REEMBOLSO ===
+
+# (dias desde a compra, inclusive) -> percentual reembolsado; depois da
+# última faixa não há reembolso
+FAIXAS_REEMBOLSO: Tuple[Tuple[int, int], ...] = ((30, 100), (60, 50))
+
+TAMANHO_BLOCO = 100_000
+COLUNAS_SAIDA = ["percentual_reembolso", "valor_reembolso", "elegivel"]
+
+
+def percentual_reembolso(dias_desde_compra: int) -> int:
+    """Percentual de reembolso de um pedido (0 quando não é elegível)"""
+    for limite, percentual in FAIXAS_REEMBOLSO:
+        if dias_desde_compra <= limite:
+            return percentual
+    return 0
+
+
+def calcular_reembolsos(
+    valores: Sequence[float], dias: Sequence[int]
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Percentual e valor do reembolso de cada pedido (vetorizado)
+
+    Args:
+        valores: Valor original de cada compra
+        dias: Dias desde cada compra (NaN conta como não elegível)
+
+    Returns:
+        (percentuais int, valores reembolsados sem arredondar; formate com
+        :.2f, como a tool e o CSV)
+    """
+    import numpy as np
+
+    valores = np.asarray(valores, dtype=np.float64)
+    dias = np.asarray(dias, dtype=np.float64)
+    if valores.shape != dias.shape:
+        raise ValueError(
+            f"valores e dias com tamanhos diferentes: {valores.shape} e {dias.shape}"
+        )
+
+    percentuais = np.select(
+        [dias <= limite for limite, _ in FAIXAS_REEMBOLSO],
+        [percentual for _, percentual in FAIXAS_REEMBOLSO],
+        default=0,
+    ).astype(np.int64)
+    # Mesma conta da tool, para que o valor formatado com :.2f seja idêntico
+    montantes = valores * (percentuais / 100)
+    return percentuais, montantes
+
+
+# === CSV EM BLOCOS ===
+
+
+def _blocos(
+    leitor: "csv._reader", tamanho: int, colunas: int
+) -> Iterator[Tuple[List[List[str]], List[int]]]:
+    """Blocos de até `tamanho` linhas, com o número de cada linha no arquivo"""
+    bloco, numeros = [], []
+    for linha in leitor:
+        if not linha or (len(linha) == 1 and not linha[0].strip()):
+            continue  # Linha em branco (comum no fim de arquivos exportados)
+        if len(linha) < colunas:
+            raise ValueError(
+                f"linha {leitor.line_num}: {len(linha)} colunas, "
+                f"esperadas pelo menos {colunas}"
+            )
+        bloco.append(linha)
+        numeros.append(leitor.line_num)
+        if len(bloco) >= tamanho:
+            yield bloco, numeros
+            bloco, numeros = [], []
+    if bloco:
+        yield bloco, numeros
+
+
+def _coluna(
+    bloco: List[List[str]], indice: int, decimal: str, nome: str, numeros: List[int]
+) -> "np.ndarray":
+    import numpy as np
+
+    textos = [linha[indice] for linha in bloco]
+    if decimal != ".":
+        textos = [texto.replace(decimal, ".") for texto in textos]
+    try:
+        return np.array(textos, dtype=np.float64)
+    except ValueError:
+        # Localiza a linha inválida só no caminho de erro
+        for numero, texto in zip(numeros, textos):
+            try:
+                float(texto)
+            except ValueError:
+                raise ValueError(
+                    f"linha {numero}: {nome} inválido ({texto!r})"
+                ) from None
+        raise
+
+
+def processar_csv(
+    entrada: TextIO,
+    saida: TextIO,
+    coluna_valor: str = "valor_original",
+    coluna_dias: str = "dias_desde_compra",
+    tamanho_bloco: int = TAMANHO_BLOCO,
+    delimitador: str = ",",
+    decimal: str = ".",
+) -> int:
+    """
+    Lê pedidos de um CSV e grava as mesmas linhas com o reembolso calculado
+
+    Args:
+        entrada: CSV com cabeçalho contendo coluna_valor e coluna_dias;
+            linhas em branco são ignoradas
+        saida: Destino; recebe as colunas da entrada + COLUNAS_SAIDA
+        coluna_valor: Coluna com o valor original da compra
+        coluna_dias: Coluna com os dias desde a compra
+        tamanho_bloco: Linhas vetorizadas por vez (limita a memória usada)
+        delimitador: Separador de colunas (entrada e saída)
+        decimal: Separador decimal dos números (entrada e saída)
+
+    Returns:
+        Número de pedidos processados
+    """
+    leitor = csv.reader(entrada, delimiter=delimitador)
+    escritor = csv.writer(saida, delimiter=delimitador, lineterminator="\n")
+
+    cabecalho = next(leitor, None)
+    if cabecalho is None:
+        return 0
+    faltando = [c for c in (coluna_valor, coluna_dias) if c not in cabecalho]
+    if faltando:
+        raise ValueError(f"colunas ausentes no CSV: {', '.join(faltando)}")
+    indice_valor = cabecalho.index(coluna_valor)
+    indice_dias = cabecalho.index(coluna_dias)
+    escritor.writerow(cabecalho + COLUNAS_SAIDA)
+
+    total = 0
+    colunas = max(indice_valor, indice_dias) + 1
+    for bloco, numeros in _blocos(leitor, tamanho_bloco, colunas):
+        valores = _coluna(bloco, indice_valor, decimal, coluna_valor, numeros)
+        dias = _coluna(bloco, indice_dias, decimal, coluna_dias, numeros)
+        percentuais, montantes = calcular_reembolsos(valores, dias)
+
+        formatados = [f"{montante:.2f}" for montante in montantes.tolist()]
+        if decimal != ".":
+            formatados = [texto.replace(".", decimal) for texto in formatados]
+        escritor.writerows(
+            linha + [percentual, montante, int(percentual > 0)]
+            for linha, percentual, montante in zip(
+                bloco, percentuais.tolist(), formatados
+            )
+        )
+        total += len(bloco)
+    return total
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Calcula reembolsos de um CSV de pedidos em blocos"
+    )
+    parser.add_argument("entrada", help="CSV de pedidos ('-' para stdin)")
+    parser.add_argument("saida", help="CSV de saída ('-' para stdout)")
+    parser.add_argument("--coluna-valor", default="valor_original")
+    parser.add_argument("--coluna-dias", default="dias_desde_compra")
+    parser.add_argument(
+        "--bloco", type=int, default=TAMANHO_BLOCO, help="Linhas por bloco"
+    )
+    parser.add_argument("--delimitador", default=",")
+    parser.add_argument("--decimal", default=".", help="Separador decimal")
+    args = parser.parse_args(argv)
+
+    entrada = (
+        sys.stdin
+        if args.entrada == "-"
+        else open(args.entrada, newline="", encoding="utf-8")
+    )
+    saida = (
+        sys.stdout
+        if args.saida == "-"
+        else open(args.saida, "w", newline="", encoding="utf-8")
+    )
+    inicio = time.perf_counter()
+    try:
+        total = processar_csv(
+            entrada,
+            saida,
+            args.coluna_valor,
+            args.coluna_dias,
+            args.bloco,
+            args.delimitador,
+            args.decimal,
+        )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        for arquivo in (entrada, saida):
+            if arquivo not in (sys.stdin, sys.stdout):
+                arquivo.close()
+    duracao = time.perf_counter() - inicio
+    # Resumo no stderr para não misturar com o CSV quando a saída é stdout
+    print(
+        f"✅ {total} pedidos em {duracao:.2f}s "
+        f"({total / duracao if duracao else 0:,.0f} pedidos/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Replay Offline de Tickets
+Reexecuta um corpus JSONL de tickets contra o workflow com o LLM simulado
+(sem rede) e mede vazão, percentis de latência e acurácia do roteamento em
+relação aos rótulos esperados, para detectar regressões de desempenho
+
+Formato de cada linha do corpus:
+    {"query": "...", "esperado": {"categoria": "Technical", "sentimento":
+     "Neutral", "agente": "Técnico", "escalado": false}, "llm": {"category":
+     "Technical", "sentiment": "Neutral"}}
+Só "query" e "esperado.categoria" são obrigatórios; "llm" roteiriza a resposta
+do LLM simulado para aquele ticket (ex.: para simular erros de triagem).
+"""
+
+import contextlib
+import io
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from utils.estatisticas import percentil
+from utils.state import AgentType
+
+# Agente esperado para cada categoria quando o corpus não informa
+AGENTE_POR_CATEGORIA = {
+    "Technical": AgentType.TECNICO.value,
+    "Billing": AgentType.FINANCEIRO.value,
+    "General": AgentType.GERAL.value,
+}
+
+# === CORPUS SINTÉTICO ===
+
+MODELOS_TICKETS = {
+    "Technical": [
+        "Não consigo fazer login no sistema",
+        "O aplicativo trava quando abro o relatório",
+        "Esqueci minha senha e o link de recuperação não chega",
+        "Recebo um erro 500 ao salvar o cadastro",
+        "O sistema está muito lento desde ontem",
+    ],
+    "Billing": [
+        "Fui cobrado em duplicata no meu cartão",
+        "Quero pedir o reembolso da última fatura",
+        "Como altero a forma de pagamento?",
+        "A cobrança deste mês veio com valor errado",
+        "Preciso da segunda via do boleto",
+    ],
+    "General": [
+        "Qual o horário de funcionamento da empresa?",
+        "Onde fica o escritório de vocês?",
+        "Vocês têm vagas de emprego abertas?",
+        "Como entro em contato com o comercial?",
+        "Quais produtos a empresa oferece?",
+    ],
+}
+
+SUFIXOS_NEGATIVOS = [
+    "Estou muito irritado!",
+    "Isso é um absurdo!",
+    "Péssimo atendimento!",
+]
+
+
+def gerar_corpus(
+    caminho: str, tickets: int = 1000, taxa_negativa: float = 0.2, semente: int = 42
+) -> int:
+    """
+    Gera um corpus JSONL sintético com rótulos esperados
+
+    Args:
+        caminho: Arquivo de saída
+        tickets: Número de tickets
+        taxa_negativa: Fração de tickets com sentimento negativo
+        semente: Semente do gerador (corpus reproduzível)
+
+    Returns:
+        Número de tickets gravados
+    """
+    rng = random.Random(semente)
+    categorias = list(MODELOS_TICKETS)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        for i in range(tickets):
+            categoria = rng.choice(categorias)
+            query = rng.choice(MODELOS_TICKETS[categoria])
+            negativo = rng.random() < taxa_negativa
+            if negativo:
+                query = f"{query} {rng.choice(SUFIXOS_NEGATIVOS)}"
+            ticket = {
+                "id": i,
+                "query": f"{query} (ticket {i})",
+                "esperado": {
+                    "categoria": categoria,
+                    "sentimento": "Negative" if negativo else "Neutral",
+                    "agente": AGENTE_POR_CATEGORIA[categoria],
+                },
+            }
+            arquivo.write(json.dumps(ticket, ensure_ascii=False) + "\n")
+    return tickets
+
+
+def carregar_corpus(caminho: str, limite: Optional[int] = None) -> List[Dict]:
+    """Lê os tickets de um arquivo JSONL (linhas vazias são ignoradas)"""
+    tickets = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            ticket = json.loads(linha)
+            if "query" not in ticket or "categoria" not in ticket.get("esperado", {}):
+                raise ValueError(
+                    f"{caminho}:{numero}: ticket sem query ou esperado.categoria"
+                )
+            tickets.append(ticket)
+            if limite and len(tickets) >= limite:
+                break
+    return tickets
+
+
+# === REPLAY ===
+
+
+def executar_replay(
+    tickets: List[Dict],
+    atraso: float = 0.05,
+    jitter: float = 0.0,
+    semente: int = 42,
+    concorrencia: int = 8,
+    usar_regras: bool = True,
+    modo_triagem: str = "paralela",
+) -> Dict[str, Any]:
+    """
+    Processa os tickets pelo workflow com LLM simulado e consolida as métricas
+
+    Args:
+        tickets: Tickets de carregar_corpus
+        atraso: Latência média de cada chamada ao LLM simulado (segundos)
+        jitter: Variação uniforme (±) da latência do LLM simulado
+        semente: Semente do jitter (execuções reproduzíveis)
+        concorrencia: Tickets processados ao mesmo tempo
+        usar_regras: Ativa o fast path por regras
+        modo_triagem: sequencial, paralela ou conjunta
+
+    Returns:
+        Vazão, latências (p50/p95/p99), acurácia por campo, confusão de
+        categorias e os nós mais lentos
+    """
+    from langgraph.checkpoint.memory import MemorySaver
+    from graph.workflow_suporte import WorkflowSuporteMultiAgente
+    from utils import pool_llm
+    from utils.instrumentacao import Instrumentacao
+    from utils.llm_simulado import LLMSimulado, responder_por_roteiro
+
+    roteiro = {t["query"]: t["llm"] for t in tickets if t.get("llm")}
+    llm = LLMSimulado(
+        atraso=atraso,
+        jitter=jitter,
+        semente=semente,
+        responder=responder_por_roteiro(roteiro),
+    )
+    instrumentacao = Instrumentacao()
+    workflow = WorkflowSuporteMultiAgente(
+        modo_triagem=modo_triagem,
+        checkpointer=MemorySaver(),
+        usar_regras=usar_regras,
+        instrumentacao=instrumentacao,
+    )
+
+    def processar(indice: int):
+        ticket = tickets[indice]
+        inicio = time.perf_counter()
+        try:
+            resultado = workflow.processar_consulta(
+                ticket["query"], f"replay_{ticket.get('id', indice)}"
+            )
+        except Exception as e:
+            resultado = {"erro": str(e)}
+        return resultado, time.perf_counter() - inicio
+
+    pool_llm.definir_llm_override(llm)
+    try:
+        # Compila o grafo antes de medir
+        workflow.app
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+                saidas = list(executor.map(processar, range(len(tickets))))
+        duracao = time.perf_counter() - inicio
+    finally:
+        pool_llm.definir_llm_override(None)
+
+    return _consolidar(tickets, saidas, duracao, instrumentacao)
+
+
+def _consolidar(tickets, saidas, duracao, instrumentacao) -> Dict[str, Any]:
+    latencias = [latencia for _, latencia in saidas]
+    acertos = {"categoria": 0, "sentimento": 0, "agente": 0, "escalado": 0}
+    avaliados = dict.fromkeys(acertos, 0)
+    confusao: Dict[str, Dict[str, int]] = {}
+    erros = atalhos = 0
+
+    for ticket, (resultado, _) in zip(tickets, saidas):
+        if "erro" in resultado:
+            erros += 1
+            continue
+        atalhos += bool(resultado.get("fast_path"))
+
+        esperado = dict(ticket["esperado"])
+        esperado.setdefault("agente", AGENTE_POR_CATEGORIA.get(esperado["categoria"]))
+        obtido = {
+            "categoria": resultado["category"],
+            "sentimento": resultado["sentiment"],
+            "agente": getattr(
+                resultado["agent_used"], "value", resultado["agent_used"]
+            ),
+            "escalado": resultado["escalated"],
+        }
+        for campo in acertos:
+            if esperado.get(campo) is None:
+                continue
+            avaliados[campo] += 1
+            acertos[campo] += esperado[campo] == obtido[campo]
+
+        linha = confusao.setdefault(esperado["categoria"], {})
+        linha[obtido["categoria"]] = linha.get(obtido["categoria"], 0) + 1
+
+    processados = len(tickets) - erros
+    return {
+        "tickets": len(tickets),
+        "erros": erros,
+        "duracao_s": duracao,
+        "vazao_tickets_s": len(tickets) / duracao if duracao else 0.0,
+        "latencia_ms": {
+            p: percentil(latencias, valor) * 1000
+            for p, valor in (("p50", 50), ("p95", 95), ("p99", 99))
+        },
+        "acuracia": {
+            campo: acertos[campo] / avaliados[campo]
+            for campo in acertos
+            if avaliados[campo]
+        },
+        "fast_path": atalhos / processados if processados else 0.0,
+        "confusao_categorias": confusao,
+        "nos_p95_ms": {no: r["p95"] * 1000 for no, r in instrumentacao.relatorio_nos()},
+    }
+
+
+# === REGRESSÕES ===
+
+
+def comparar_com_baseline(
+    resultado: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerancia: float = 0.10,
+    tolerancia_acuracia: float = 0.01,
+) -> List[str]:
+    """
+    Lista as regressões do resultado atual em relação a um replay anterior
+
+    Args:
+        resultado: Saída de executar_replay
+        baseline: Saída de um executar_replay anterior (ex.: lida de JSON)
+        tolerancia: Piora relativa aceita em vazão e latência (0.10 = 10%)
+        tolerancia_acuracia: Queda absoluta aceita em cada acurácia
+
+    Returns:
+        Descrição de cada regressão (vazia quando não há nenhuma)
+    """
+    regressoes = []
+    vazao, vazao_base = resultado["vazao_tickets_s"], baseline["vazao_tickets_s"]
+    if vazao < vazao_base * (1 - tolerancia):
+        regressoes.append(f"vazão caiu de {vazao_base:.1f} para {vazao:.1f} tickets/s")
+
+    for p, valor_base in baseline["latencia_ms"].items():
+        valor = resultado["latencia_ms"].get(p, 0.0)
+        if valor > valor_base * (1 + tolerancia):
+            regressoes.append(
+                f"latência {p} subiu de {valor_base:.1f} para {valor:.1f}ms"
+            )
+
+    for campo, valor_base in baseline["acuracia"].items():
+        valor = resultado["acuracia"].get(campo, 0.0)
+        if valor < valor_base - tolerancia_acuracia:
+            regressoes.append(
+                f"acurácia de {campo} caiu de {valor_base:.1%} para {valor:.1%}"
+            )
+    return regressoes
@@ -0,0 +1,302 @@
+"""
+Roteamento de Modelos por Custo
+Escolhe, para cada rota do grafo, o modelo que redige a resposta final ao
+cliente a partir do resultado das tools:
+1. Rotas simples (ex.: agent_geral) tentam primeiro um modelo local barato
+   (endpoint compatível com a OpenAI, como o Ollama)
+2. A resposta passa por uma validação (vazia, incerta ou sem os fatos
+   numéricos das informações); se falhar, o próximo nível é tentado
+3. Cada redação gera um registro com nível usado, latência, tokens e custo
+4. Com `transmitir`, os tokens de cada nível são repassados enquanto o modelo
+   gera; um rascunho reprovado é seguido de um aviso de descarte
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessageChunk, HumanMessage, SystemMessage
+
+from utils.pool_llm import obter_llm
+
+logger = logging.getLogger(__name__)
+
+# === CONFIGURAÇÃO PADRÃO ===
+
+# Nível -> modelo, endpoint e custo em US$ por 1M de tokens (entrada/saída)
+NIVEIS_PADRAO = {
+    "local": {
+        "modelo": os.getenv("ROTEADOR_MODELO_LOCAL", "llama3.2"),
+        "base_url": os.getenv("ROTEADOR_URL_LOCAL", "http://localhost:11434/v1"),
+        "custo_entrada": 0.0,
+        "custo_saida": 0.0,
+    },
+    "grande": {
+        "modelo": os.getenv("ROTEADOR_MODELO_GRANDE", "gpt-4o-mini"),
+        "base_url": None,
+        "custo_entrada": float(os.getenv("ROTEADOR_CUSTO_ENTRADA", "0.15")),
+        "custo_saida": float(os.getenv("ROTEADOR_CUSTO_SAIDA", "0.60")),
+    },
+}
+
+# Rota -> níveis tentados, do mais barato para o mais caro
+ROTAS_PADRAO = {
+    "agent_geral": ["local", "grande"],
+    "agent_financeiro": ["grande"],
+    "agent_tecnico": ["grande"],
+}
+
+AREAS = {
+    "agent_geral": "atendimento geral",
+    "agent_financeiro": "atendimento financeiro",
+    "agent_tecnico": "suporte técnico",
+}
+
+MIN_CARACTERES = 20
+MARCADORES_INCERTEZA = ["incerto", "não sei", "não tenho certeza", "não consigo"]
+
+INSTRUCOES_REDACAO = """
+Você é o atendente de {area} da empresa. Reescreva as informações abaixo como
+uma resposta cordial e direta ao cliente, em português, sem inventar nada e
+mantendo todos os números, prazos e valores. Se as informações não responderem
+à consulta, responda apenas INCERTO.
+"""
+
+
+# === VALIDAÇÃO ===
+
+
+def validar_resposta(resposta: str, contexto: str) -> Optional[str]:
+    """
+    Confere a resposta de um modelo antes de entregá-la ao cliente
+
+    Returns:
+        Motivo da reprovação, ou None quando a resposta é aceita
+    """
+    texto = resposta.strip()
+    if len(texto) < MIN_CARACTERES:
+        return "resposta curta"
+    minusculo = texto.lower()
+    if any(marcador in minusculo for marcador in MARCADORES_INCERTEZA):
+        return "resposta incerta"
+    ausentes = set(re.findall(r"\d+", contexto)) - set(re.findall(r"\d+", texto))
+    if ausentes:
+        return f"fatos ausentes: {', '.join(sorted(ausentes)[:3])}"
+    return None
+
+
+# === ROTEADOR ===
+
+
+class RoteadorModelos:
+    """
+    Redige a resposta de cada rota com o nível de modelo mais barato que passa
+    na validação
+
+    Exemplo:
+        roteador = RoteadorModelos()
+        texto, registro = roteador.redigir("agent_geral", query, informacao)
+        # texto None: nenhum nível passou (use a resposta do template)
+
+    Eventos de `transmitir` (o writer do stream "custom" do LangGraph serve):
+        {"token": pedaço, "nivel": nível} enquanto o modelo gera
+        {"descartado": nível, "motivo": ...} quando o rascunho reprova
+    """
+
+    def __init__(
+        self,
+        niveis: Optional[Dict[str, Dict[str, Any]]] = None,
+        rotas: Optional[Dict[str, List[str]]] = None,
+        validar: Optional[Callable[[str, str], Optional[str]]] = None,
+        llms: Optional[Dict[str, Any]] = None,
+        temperatura: Optional[float] = 0.3,
+    ):
+        """
+        Args:
+            niveis: Nível -> {"modelo", "base_url", "custo_entrada",
+                "custo_saida"} (padrão: NIVEIS_PADRAO)
+            rotas: Rota -> níveis em ordem de tentativa (padrão: ROTAS_PADRAO);
+                rotas desconhecidas usam só o último nível
+            validar: f(resposta, contexto) -> motivo da reprovação ou None
+                (padrão: validar_resposta)
+            llms: Nível -> chat model já criado (ex.: LLMSimulado), no lugar
+                do cliente do pool
+            temperatura: Temperatura de amostragem dos clientes do pool
+        """
+        self.niveis = niveis or NIVEIS_PADRAO
+        self.rotas = rotas or ROTAS_PADRAO
+        self.validar = validar or validar_resposta
+        self.llms = llms or {}
+        self.temperatura = temperatura
+
+    def _llm(self, nivel: str):
+        if nivel in self.llms:
+            return self.llms[nivel]
+        config = self.niveis[nivel]
+        return obter_llm(config["modelo"], self.temperatura, config.get("base_url"))
+
+    def _niveis_rota(self, rota: str) -> List[str]:
+        return self.rotas.get(rota) or [list(self.niveis)[-1]]
+
+    def _mensagens(self, rota: str, query: str, contexto: str):
+        return [
+            SystemMessage(
+                content=INSTRUCOES_REDACAO.format(area=AREAS.get(rota, rota))
+            ),
+            HumanMessage(content=f"Informações:\n{contexto}\n\nConsulta: {query}"),
+        ]
+
+    def _novo_registro(self, rota: str) -> Dict[str, Any]:
+        return {
+            "rota": rota,
+            "nivel": None,
+            "modelo": None,
+            "niveis_tentados": [],
+            "motivos_fallback": [],
+            "latencia_ms": 0.0,
+            "tokens_entrada": 0,
+            "tokens_saida": 0,
+            "custo_usd": 0.0,
+        }
+
+    def _avaliar(
+        self,
+        registro: Dict[str, Any],
+        nivel: str,
+        mensagem: Any,
+        erro: Optional[Exception],
+        contexto: str,
+        inicio: float,
+    ) -> Optional[str]:
+        """Contabiliza a tentativa; retorna o texto se ele passou na validação"""
+        config = self.niveis.get(nivel, {})
+        registro["niveis_tentados"].append(nivel)
+        registro["latencia_ms"] += (time.perf_counter() - inicio) * 1000
+
+        if erro is not None:
+            logger.warning(
+                f"⚠️ Modelo {nivel} falhou na rota {registro['rota']}: {erro}"
+            )
+            registro["motivos_fallback"].append(f"erro: {type(erro).__name__}")
+            return None
+
+        uso = getattr(mensagem, "usage_metadata", None) or {}
+        entrada, saida = uso.get("input_tokens", 0), uso.get("output_tokens", 0)
+        registro["tokens_entrada"] += entrada
+        registro["tokens_saida"] += saida
+        registro["custo_usd"] += (
+            entrada * config.get("custo_entrada", 0.0)
+            + saida * config.get("custo_saida", 0.0)
+        ) / 1_000_000
+
+        texto = str(mensagem.content)
+        motivo = self.validar(texto, contexto)
+        if motivo is not None:
+            registro["motivos_fallback"].append(f"{nivel}: {motivo}")
+            return None
+        registro["nivel"] = nivel
+        registro["modelo"] = config.get("modelo", nivel)
+        return texto
+
+    def _descartar(
+        self,
+        registro: Dict[str, Any],
+        nivel: str,
+        transmitir: Optional[Callable[[Dict[str, Any]], None]],
+    ):
+        # Os tokens do rascunho reprovado já foram transmitidos
+        if transmitir is not None:
+            transmitir(
+                {"descartado": nivel, "motivo": registro["motivos_fallback"][-1]}
+            )
+
+    def _gerar(
+        self,
+        nivel: str,
+        mensagens: List[Any],
+        transmitir: Optional[Callable[[Dict[str, Any]], None]],
+    ):
+        llm = self._llm(nivel)
+        if transmitir is None:
+            return llm.invoke(mensagens)
+        mensagem = AIMessageChunk(content="")
+        for pedaco in llm.stream(mensagens):
+            if pedaco.content:
+                transmitir({"token": pedaco.content, "nivel": nivel})
+            mensagem += pedaco
+        return mensagem
+
+    async def _agerar(
+        self,
+        nivel: str,
+        mensagens: List[Any],
+        transmitir: Optional[Callable[[Dict[str, Any]], None]],
+    ):
+        llm = self._llm(nivel)
+        if transmitir is None:
+            return await llm.ainvoke(mensagens)
+        mensagem = AIMessageChunk(content="")
+        async for pedaco in llm.astream(mensagens):
+            if pedaco.content:
+                transmitir({"token": pedaco.content, "nivel": nivel})
+            mensagem += pedaco
+        return mensagem
+
+    def redigir(
+        self,
+        rota: str,
+        query: str,
+        contexto: str,
+        transmitir: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Redige a resposta da rota, subindo de nível quando a validação falha
+
+        Args:
+            rota: Nó do grafo (ex.: "agent_geral")
+            query: Consulta do cliente
+            contexto: Informações das tools (a resposta não pode contradizê-las)
+            transmitir: Recebe os tokens gerados (None usa invoke, sem stream)
+
+        Returns:
+            (texto ou None se nenhum nível passou, registro de custo e latência)
+        """
+        registro = self._novo_registro(rota)
+        mensagens = self._mensagens(rota, query, contexto)
+        for nivel in self._niveis_rota(rota):
+            inicio = time.perf_counter()
+            mensagem = erro = None
+            try:
+                mensagem = self._gerar(nivel, mensagens, transmitir)
+            except Exception as e:
+                erro = e
+            texto = self._avaliar(registro, nivel, mensagem, erro, contexto, inicio)
+            if texto is not None:
+                return texto, registro
+            self._descartar(registro, nivel, transmitir)
+        return None, registro
+
+    async def aredigir(
+        self,
+        rota: str,
+        query: str,
+        contexto: str,
+        transmitir: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Versão assíncrona de redigir"""
+        registro = self._novo_registro(rota)
+        mensagens = self._mensagens(rota, query, contexto)
+        for nivel in self._niveis_rota(rota):
+            inicio = time.perf_counter()
+            mensagem = erro = None
+            try:
+                mensagem = await self._agerar(nivel, mensagens, transmitir)
+            except Exception as e:
+                erro = e
+            texto = self._avaliar(registro, nivel, mensagem, erro, contexto, inicio)
+            if texto is not None:
+                return texto, registro
+            self._descartar(registro, nivel, transmitir)
+        return None, registro
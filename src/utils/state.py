@@ -3,10 +3,11 @@ Estado Corrigido para o Sistema de Suporte Multi-Agente
 Compatível com create_react_agent
 """
 
-from typing import Dict, Any, TypedDict, List
+from typing import Annotated, Dict, Any, TypedDict, List
 from datetime import datetime
 from enum import Enum
 from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
 from langgraph.graph.message import add_messages
 
 
@@ -29,6 +30,14 @@ class SentimentType(str, Enum):
     NEGATIVE = "Negative"
 
 
+class PriorityType(str, Enum):
+    """Tipos de prioridade"""
+
+    HIGH = "High"
+    MEDIUM = "Medium"
+    LOW = "Low"
+
+
 class AgentType(str, Enum):
     """Tipos de agente"""
 
@@ -39,6 +48,17 @@ class AgentType(str, Enum):
     ESCALACAO = "Escalação"
 
 
+# === RESULTADO DA TRIAGEM CONJUNTA ===
+
+
+class ResultadoTriagem(BaseModel):
+    """Categoria, sentimento e prioridade retornados em uma única chamada ao LLM"""
+
+    category: CategoryType
+    sentiment: SentimentType
+    priority: PriorityType
+
+
 # === ESTADO PRINCIPAL COMPATÍVEL COM create_react_agent ===
 
 
@@ -46,7 +66,9 @@ class StateSuporteSimples(TypedDict):
     """Estado compatível com create_react_agent e MessagesState"""
 
     # Campos obrigatórios para create_react_agent
-    messages: List[BaseMessage]
+    # add_messages acumula o histórico da thread entre consultas (o
+    # RedutorHistorico limita o que vai ao LLM)
+    messages: Annotated[List[BaseMessage], add_messages]
     remaining_steps: int
 
     # Campos customizados para nosso sistema
@@ -54,9 +76,21 @@ class StateSuporteSimples(TypedDict):
     timestamp: str
     category: CategoryType
     sentiment: SentimentType
+    priority: PriorityType
     response: str
     agent_used: AgentType
     escalated: bool
+    cache_hit: bool
+    fast_path: bool
+    # Só a categoria veio de fora do LLM; sentimento e prioridade são recalculados
+    triagem_parcial: bool
+
+    # Histórico resumido pelo pre-model hook dos agentes (utils/historico.py)
+    resumo_historico: str
+    mensagens_resumidas: int
+
+    # Nível, latência e custo da redação da resposta (utils/roteador_modelos.py)
+    roteamento: Dict[str, Any]
 
 
 # === UTILITÁRIOS ===
@@ -75,9 +109,14 @@ def criar_estado_inicial(query: str) -> StateSuporteSimples:
         timestamp=datetime.now().isoformat(),
         category=CategoryType.GENERAL,
         sentiment=SentimentType.NEUTRAL,
+        priority=PriorityType.MEDIUM,
         response="",
         agent_used=AgentType.COORDENADOR,
         escalated=False,
+        cache_hit=False,
+        fast_path=False,
+        triagem_parcial=False,
+        roteamento={},
     )
 
 
@@ -89,6 +128,7 @@ def get_resumo_estado(state: StateSuporteSimples) -> Dict[str, Any]:
         else state["query"],
         "category": state["category"],
         "sentiment": state["sentiment"],
+        "priority": state["priority"],
         "agent_used": state["agent_used"],
         "escalated": state["escalated"],
     }
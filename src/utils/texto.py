@@ -0,0 +1,14 @@
+"""
+Normalização de texto compartilhada (cache de triagem, índices de palavras-chave)
+"""
+
+import re
+import unicodedata
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos, sem pontuação e com espaços simples"""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^\w\s]", " ", texto)
+    return " ".join(texto.split())
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# The workshop code is run as scripts from the repository root: src/ and
+# 04-RAG/ are import roots, not packages
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for pasta in ("src", "04-RAG"):
+    caminho = os.path.join(RAIZ, pasta)
+    if caminho not in sys.path:
+        sys.path.insert(0, caminho)
+
+
+@pytest.fixture
+def llm_simulado():
+    """Replace every pooled model with LLMSimulado (no network)"""
+    from utils import pool_llm
+    from utils.llm_simulado import LLMSimulado
+
+    pool_llm.definir_llm_override(LLMSimulado())
+    yield
+    pool_llm.definir_llm_override(None)
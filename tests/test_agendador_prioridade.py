@@ -0,0 +1,47 @@
+import threading
+
+from graph.agendador_prioridade import AgendadorTickets
+
+PRIORIDADES = {"baixa": "Low", "media": "Medium", "alta": "High"}
+
+
+def _agendador(priorizar_admissao):
+    bloqueado, liberar = threading.Event(), threading.Event()
+    triados = []
+
+    def triar(query, thread_id):
+        if query == "primeira":
+            bloqueado.set()
+            liberar.wait()
+        triados.append(query)
+        return {"priority": PRIORIDADES.get(query, "Low")}
+
+    agendador = AgendadorTickets(
+        trabalhadores_triagem=1,
+        trabalhadores_especialistas=1,
+        triar=triar,
+        processar=lambda thread_id: {"thread_id": thread_id},
+        estimar=lambda query: PRIORIDADES.get(query, "Low"),
+        priorizar_admissao=priorizar_admissao,
+    )
+    # Segura o único trabalhador da triagem enquanto os outros chegam
+    agendador.submeter("primeira")
+    bloqueado.wait()
+    futuros = [agendador.submeter(query) for query in ("baixa", "media", "alta")]
+    liberar.set()
+    agendador.fechar()
+    return triados, [futuro.result() for futuro in futuros]
+
+
+def test_triage_admits_the_most_urgent_ticket_first():
+    triados, resultados = _agendador(priorizar_admissao=True)
+
+    assert triados == ["primeira", "alta", "media", "baixa"]
+    assert [r["prioridade_estimada"] for r in resultados] == ["Low", "Medium", "High"]
+    assert [r["prioridade"] for r in resultados] == ["Low", "Medium", "High"]
+
+
+def test_triage_in_arrival_order_without_admission_priority():
+    triados, _ = _agendador(priorizar_admissao=False)
+
+    assert triados == ["primeira", "baixa", "media", "alta"]
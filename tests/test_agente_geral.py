@@ -0,0 +1,30 @@
+import pytest
+
+from agents.agente_geral import INFO_EMPRESA, buscar_informacao_empresa
+
+
+@pytest.mark.parametrize("chave", list(INFO_EMPRESA))
+def test_each_knowledge_base_key_still_finds_its_information(chave):
+    assert buscar_informacao_empresa.invoke({"tipo_info": chave}) == INFO_EMPRESA[chave]
+
+
+@pytest.mark.parametrize(
+    "consulta, chave",
+    [
+        ("Qual o horário de funcionamento?", "horario_funcionamento"),
+        ("Que horas vocês abrem?", "horario_funcionamento"),
+        ("Qual o telefone de vocês?", "contato"),
+        ("Onde fica o escritório?", "endereco"),
+        ("Quanto tempo demora o frete?", "entrega"),
+    ],
+)
+def test_free_text_queries_match_by_keyword(consulta, chave):
+    assert (
+        buscar_informacao_empresa.invoke({"tipo_info": consulta}) == INFO_EMPRESA[chave]
+    )
+
+
+def test_unknown_topic_returns_the_fallback_message():
+    resposta = buscar_informacao_empresa.invoke({"tipo_info": "cardápio"})
+
+    assert resposta.startswith("Desculpe, não encontrei")
@@ -0,0 +1,125 @@
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from answer_cache import AnswerCache
+
+CONTEXT = [
+    Document(page_content="CO2 traps heat", metadata={"source": "a.pdf"}),
+    Document(page_content="Oceans absorb CO2", metadata={"source": "a.pdf"}),
+]
+OTHER_CONTEXT = [Document(page_content="Ice sheets melt", metadata={"source": "b.pdf"})]
+
+
+QUESTION_VECTORS = {
+    "what causes global warming?": [1.0, 0.0],
+    "why is the earth getting warmer?": [0.99, 0.1],
+    "how do glaciers form?": [0.0, 1.0],
+}
+
+
+class TableEmbeddings(Embeddings):
+    """Fixed vector per question; counts the embedding requests"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return QUESTION_VECTORS[text.lower()]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def _manifest(tmp_path, content):
+    path = tmp_path / "index_manifest.json"
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_exact_hit_ignores_case_spacing_and_trailing_punctuation():
+    cache = AnswerCache()
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+
+    answer, level = cache.get("  what causes   GLOBAL warming ", CONTEXT[::-1])
+
+    assert (answer, level) == ("Greenhouse gases", "exact")
+    assert cache.stats["exact"] == 1
+
+
+def test_same_question_with_other_chunks_misses():
+    cache = AnswerCache()
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+
+    assert cache.get("What causes global warming?", OTHER_CONTEXT) == (None, None)
+    assert cache.stats["misses"] == 1
+
+
+def test_reworded_question_with_the_same_chunks_is_a_semantic_hit():
+    embeddings = TableEmbeddings()
+    cache = AnswerCache(embeddings=embeddings)
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+
+    hit = cache.get("Why is the Earth getting warmer?", CONTEXT)
+    unrelated = cache.get("How do glaciers form?", CONTEXT)
+    other_context = cache.get("Why is the Earth getting warmer?", OTHER_CONTEXT)
+
+    assert hit == ("Greenhouse gases", "semantic")
+    assert unrelated == (None, None)
+    assert other_context == (None, None)
+
+
+def test_missed_question_is_embedded_once():
+    embeddings = TableEmbeddings()
+    cache = AnswerCache(embeddings=embeddings)
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+    embeddings.calls = 0
+
+    cache.get("How do glaciers form?", CONTEXT)
+    cache.put("How do glaciers form?", CONTEXT, "Snow compacts")
+
+    # put() reuses the vector computed by the missed get()
+    assert embeddings.calls == 1
+
+
+def test_rewritten_manifest_clears_answers_and_retrievals(tmp_path):
+    manifest = _manifest(tmp_path, '{"sources": {}}')
+    cache = AnswerCache(manifest_path=manifest)
+    cache.put_retrieval("What causes global warming?", CONTEXT)
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+    assert cache.get_retrieval("What causes global warming?") == CONTEXT
+
+    _manifest(tmp_path, '{"sources": {"a.pdf": {}}}')
+
+    assert cache.get_retrieval("What causes global warming?") is None
+    assert cache.get("What causes global warming?", CONTEXT) == (None, None)
+
+
+def test_unchanged_manifest_keeps_the_cache(tmp_path):
+    manifest = _manifest(tmp_path, '{"sources": {}}')
+    cache = AnswerCache(manifest_path=manifest)
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+
+    assert cache.get("What causes global warming?", CONTEXT)[1] == "exact"
+
+
+def test_expired_answers_are_not_served():
+    cache = AnswerCache(ttl_s=0)
+    cache.put("What causes global warming?", CONTEXT, "Greenhouse gases")
+    cache.put_retrieval("What causes global warming?", CONTEXT)
+
+    assert cache.get("What causes global warming?", CONTEXT) == (None, None)
+    assert cache.get_retrieval("What causes global warming?") is None
+
+
+def test_least_recently_used_answer_is_dropped():
+    cache = AnswerCache(max_entries=2)
+    cache.put("first", CONTEXT, "1")
+    cache.put("second", CONTEXT, "2")
+    cache.get("first", CONTEXT)
+
+    cache.put("third", CONTEXT, "3")
+
+    assert cache.get("second", CONTEXT) == (None, None)
+    assert cache.get("first", CONTEXT) == ("1", "exact")
+    assert cache.get("third", CONTEXT) == ("3", "exact")
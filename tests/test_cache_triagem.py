@@ -0,0 +1,102 @@
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow_suporte import ModoTriagem, WorkflowSuporteMultiAgente
+from memory.cache_triagem import CacheTriagem
+from utils.instrumentacao import Instrumentacao
+from utils.texto import normalizar_texto
+
+NEUTRA = "Fui cobrado em duplicata no meu cartão"
+FURIOSA = "Fui cobrado em duplicata no meu cartão e estou furioso, absurdo!"
+LOGIN = "Não consigo fazer login no sistema"
+TRIAGEM_NEUTRA = {"category": "Billing", "sentiment": "Neutral", "priority": "Medium"}
+TRIAGEM_LOGIN = {"category": "Technical", "sentiment": "Neutral", "priority": "Medium"}
+
+# Consulta nova -> consulta em cache e se um hit seria correto (mesma triagem)
+PARES_ROTULADOS = [
+    ("Nao consigo fazer o login no sistema!", LOGIN, True),
+    ("não consigo fazer login no sistema, estou furioso", LOGIN, False),
+    ("não consigo logar", LOGIN, True),
+    (FURIOSA, NEUTRA, False),
+    ("Fui cobrado duas vezes no meu cartão", NEUTRA, True),
+]
+
+
+def test_semantic_lookup_is_off_by_default():
+    cache = CacheTriagem(":memory:")
+    cache.salvar(LOGIN, TRIAGEM_LOGIN)
+
+    assert cache.buscar("Não consigo fazer login no sistema!") == TRIAGEM_LOGIN
+    assert cache.buscar("Nao consigo fazer o login no sistema") is None
+    assert cache.estatisticas()["hits_semanticos"] == 0
+
+
+def test_semantic_hit_reuses_only_the_category():
+    cache = CacheTriagem(":memory:", busca_semantica=True)
+    cache.salvar(LOGIN, TRIAGEM_LOGIN)
+
+    assert cache.buscar("Nao consigo fazer o login no sistema") == {
+        "category": "Technical"
+    }
+
+
+@pytest.mark.parametrize("consulta, em_cache, hit_correto", PARES_ROTULADOS)
+def test_default_threshold_never_returns_a_wrong_triage(
+    consulta, em_cache, hit_correto
+):
+    cache = CacheTriagem(":memory:", busca_semantica=True)
+    triagem = TRIAGEM_NEUTRA if em_cache == NEUTRA else TRIAGEM_LOGIN
+    cache.salvar(em_cache, triagem)
+
+    resultado = cache.buscar(consulta)
+
+    # Sinônimos ("logar" vs "fazer login") ficam fora do alcance do embedding
+    # lexical: o esperado é um miss, nunca uma triagem de outra consulta
+    if resultado is not None:
+        assert hit_correto
+        assert "sentiment" not in resultado and "priority" not in resultado
+
+
+@pytest.mark.parametrize("modo", list(ModoTriagem))
+def test_angry_query_near_a_neutral_entry_gets_its_own_sentiment(modo, llm_simulado):
+    # Limiar frouxo de propósito: força o hit semântico no vizinho neutro
+    cache = CacheTriagem(":memory:", busca_semantica=True, limiar_similaridade=0.5)
+    cache.salvar(NEUTRA, TRIAGEM_NEUTRA)
+    workflow = WorkflowSuporteMultiAgente(
+        modo_triagem=modo,
+        checkpointer=MemorySaver(),
+        cache_triagem=cache,
+        usar_regras=False,
+        instrumentacao=Instrumentacao(),
+    )
+
+    resultado = workflow.processar_consulta(FURIOSA, thread_id="furioso")
+
+    assert resultado["cache_hit"]
+    assert cache.estatisticas()["hits_semanticos"] == 1
+    assert resultado["category"] == "Billing"
+    assert resultado["sentiment"] == "Negative"
+    assert resultado["priority"] == "High"
+    # A triagem recalculada fica em cache como hit exato da consulta nova
+    assert cache.buscar(FURIOSA)["sentiment"] == "Negative"
+
+
+def _ultimo_acesso(cache):
+    return dict(
+        cache._conn.execute("SELECT consulta, ultimo_acesso FROM cache_triagem")
+    )
+
+
+def test_hits_batch_the_last_access_writes(tmp_path):
+    cache = CacheTriagem(str(tmp_path / "cache.db"), intervalo_gravacao_segundos=3600)
+    cache.salvar(LOGIN, TRIAGEM_LOGIN)
+    cache.salvar(NEUTRA, TRIAGEM_NEUTRA)
+    gravado = _ultimo_acesso(cache)
+
+    for _ in range(3):
+        assert cache.buscar(LOGIN) == TRIAGEM_LOGIN
+    assert _ultimo_acesso(cache) == gravado
+
+    cache.gravar_acessos()
+    acessos = _ultimo_acesso(cache)
+    assert acessos[normalizar_texto(LOGIN)] > acessos[normalizar_texto(NEUTRA)]
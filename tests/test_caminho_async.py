@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow_suporte import WorkflowSuporteMultiAgente
+from utils import pool_llm
+from utils.instrumentacao import Instrumentacao
+from utils.llm_simulado import LLMSimulado
+
+CONSULTAS = [
+    "Não consigo fazer login no sistema",
+    "Fui cobrado em duplicata no meu cartão",
+    "Qual o horário de funcionamento da empresa?",
+]
+
+
+class LLMSoAssincrono(LLMSimulado):
+    """Falha se alguém chamar o caminho síncrono (ex.: em uma thread do pool)"""
+
+    def _generate(self, *args, **kwargs):
+        raise AssertionError(f"chamada síncrona em {threading.current_thread().name}")
+
+
+def _workflow():
+    return WorkflowSuporteMultiAgente(
+        checkpointer=MemorySaver(),
+        checkpointer_async=MemorySaver(),
+        usar_regras=False,
+        instrumentacao=Instrumentacao(),
+    )
+
+
+def test_async_path_only_awaits_the_model(llm_simulado):
+    pool_llm.definir_llm_override(LLMSoAssincrono())
+    workflow = _workflow()
+
+    resultado = asyncio.run(workflow.aprocessar_consulta(CONSULTAS[1], "t"))
+
+    assert (resultado["category"], resultado["agent_used"]) == ("Billing", "Financeiro")
+
+
+def test_async_and_sync_paths_give_the_same_result(llm_simulado):
+    workflow = _workflow()
+
+    sincrono = workflow.processar_consulta(CONSULTAS[0], "sync")
+    assincrono = asyncio.run(workflow.aprocessar_consulta(CONSULTAS[0], "async"))
+
+    for campo in ("category", "sentiment", "priority", "agent_used", "response"):
+        assert assincrono[campo] == sincrono[campo]
+
+
+def test_async_batch_keeps_the_order_and_reports_failures(llm_simulado):
+    def responder(prompt):
+        if "explode" in prompt:
+            raise RuntimeError("endpoint fora do ar")
+        return LLMSimulado().responder(prompt)
+
+    pool_llm.definir_llm_override(LLMSoAssincrono(atraso=0.01, responder=responder))
+    consultas = CONSULTAS * 4 + ["explode"]
+
+    resultados = asyncio.run(_workflow().aprocessar_lote(consultas, max_concurrency=3))
+
+    assert [r["query"] for r in resultados] == consultas
+    assert [r["category"] for r in resultados[:3]] == [
+        "Technical",
+        "Billing",
+        "General",
+    ]
+    assert "endpoint fora do ar" in resultados[-1]["erro"]
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from memory.checkpointer_pool import SqliteSaverPool
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SqliteSaverPool(str(tmp_path / "conversas.db"), max_leitores=2)
+    yield saver
+    saver.fechar()
+
+
+def _gravar(saver, thread_id, passo=0):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"passo": passo}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    config = saver.put(config, checkpoint, {"step": passo}, {})
+    saver.put_writes(config, [("response", f"resposta {passo}")], task_id="t")
+    return config
+
+
+def _escrita_invalida(saver):
+    with saver.cursor() as cur:
+        cur.execute(
+            "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id)"
+            " VALUES ('parcial', '', '1')"
+        )
+        cur.execute("INSERT INTO tabela_inexistente VALUES (1)")
+
+
+def test_failed_write_is_rolled_back_without_losing_the_batch(saver):
+    configs = [_gravar(saver, "a"), _gravar(saver, "b")]
+    # Segura o escritor para que as três escritas seguintes formem um lote
+    bloqueado, liberar = threading.Event(), threading.Event()
+
+    def segurar(conn):
+        bloqueado.set()
+        liberar.wait()
+
+    bloqueio = threading.Thread(target=saver._escrever, args=(segurar,))
+    bloqueio.start()
+    bloqueado.wait()
+
+    erros = []
+
+    def invalida():
+        try:
+            _escrita_invalida(saver)
+        except sqlite3.OperationalError as e:
+            erros.append(e)
+
+    tarefas = [
+        threading.Thread(target=saver.put_writes, args=(cfg, [("c", i)], "t2"))
+        for i, cfg in enumerate(configs)
+    ]
+    tarefas.insert(1, threading.Thread(target=invalida))
+    for tarefa in tarefas:
+        tarefa.start()
+        while saver._fila.qsize() < tarefas.index(tarefa) + 1:
+            time.sleep(0.01)
+    commits = saver.metricas["commits"]
+    liberar.set()
+    for tarefa in [bloqueio, *tarefas]:
+        tarefa.join()
+
+    assert len(erros) == 1
+    # Um commit do bloqueio e um só para as três escritas
+    assert saver.metricas["commits"] == commits + 2
+    with saver._leitor() as conn:
+        parcial = conn.execute(
+            "SELECT COUNT(*) FROM checkpoints WHERE thread_id = 'parcial'"
+        ).fetchone()[0]
+        canais = conn.execute(
+            "SELECT COUNT(*) FROM writes WHERE channel = 'c'"
+        ).fetchone()[0]
+    assert parcial == 0
+    assert canais == 2
+
+
+def test_compaction_runs_outside_the_batch_transaction(saver):
+    saver.max_checkpoints = 1
+    for passo in range(3):
+        _gravar(saver, "conversa", passo)
+
+    assert saver.compactar_agora()["checkpoints_antigos"] == 2
+    _gravar(saver, "conversa", 3)
+    assert len(list(saver.list(None))) == 2
+
+
+class _ConexaoVigiada:
+    """Registra em quais threads a conexão de escrita foi usada"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.threads = set()
+
+    def __getattr__(self, nome):
+        self.threads.add(threading.current_thread().name)
+        return getattr(self._conn, nome)
+
+
+def test_list_reads_through_the_reader_pool(saver, tmp_path):
+    for passo in range(3):
+        _gravar(saver, "conversa", passo)
+    _gravar(saver, "outra")
+    vigiada = _ConexaoVigiada(saver.conn)
+    saver.conn = vigiada
+
+    tuplas = list(saver.list({"configurable": {"thread_id": "conversa"}}))
+    limitadas = list(saver.list(None, limit=2))
+
+    assert vigiada.threads <= {"checkpointer-escritor"}
+    esperadas = list(
+        SqliteSaver(sqlite3.connect(tmp_path / "conversas.db")).list(
+            {"configurable": {"thread_id": "conversa"}}
+        )
+    )
+    assert [t.config for t in tuplas] == [t.config for t in esperadas]
+    assert [t.checkpoint for t in tuplas] == [t.checkpoint for t in esperadas]
+    assert [t.pending_writes for t in tuplas] == [t.pending_writes for t in esperadas]
+    assert len(limitadas) == 2
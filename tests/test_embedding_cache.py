@@ -0,0 +1,87 @@
+import subprocess
+import sys
+
+import pytest
+
+from embedding_cache import EmbeddingStore
+from conftest import RAIZ
+
+WORKERS = 4
+BATCHES = 10
+PER_BATCH = 50
+
+# Each process writes its own keys and reads everyone's; the vector encodes
+# the key, so any slot shared by two keys shows up as a wrong vector
+WRITER = r"""
+import sys
+sys.path.insert(0, sys.argv[4])
+from embedding_cache import EmbeddingStore
+
+store = EmbeddingStore(sys.argv[1], max_entries=int(sys.argv[3]))
+worker = int(sys.argv[2])
+for batch in range({batches}):
+    store.put_many(
+        {{f"w{{worker}}-{{batch}}-{{i}}": [worker, batch, i, 0.0] for i in range({per_batch})}}
+    )
+    keys = [f"w{{w}}-{{batch}}-{{i}}" for w in range({workers}) for i in range({per_batch})]
+    for key, vector in store.get_many(keys).items():
+        expected = [float(part) for part in key[1:].split("-")]
+        assert vector[:3] == expected, (key, vector)
+""".format(batches=BATCHES, per_batch=PER_BATCH, workers=WORKERS)
+
+
+def _expected(key):
+    return [float(part) for part in key[1:].split("-")] + [0.0]
+
+
+def _all_keys():
+    return [
+        f"w{w}-{b}-{i}"
+        for w in range(WORKERS)
+        for b in range(BATCHES)
+        for i in range(PER_BATCH)
+    ]
+
+
+def test_roundtrip_and_lru(tmp_path):
+    store = EmbeddingStore(str(tmp_path), max_entries=3)
+    assert store.put_many({"a": [1, 2], "b": [3, 4], "c": [5, 6]}) == 0
+    store.get_many(["a"])  # "b" becomes the least recently used
+    assert store.put_many({"d": [7, 8]}) == 1
+    found = store.get_many(["a", "b", "c", "d"])
+    assert found == {"a": [1, 2], "c": [5, 6], "d": [7, 8]}
+    # The slot freed by "b" is reused instead of growing the file
+    store.put_many({"e": [9, 10]})
+    slot = store._db.execute("SELECT slot FROM entries WHERE key = 'e'").fetchone()
+    assert slot[0] == 1
+    assert store.get_many(["e"]) == {"e": [9, 10]}
+
+
+@pytest.mark.parametrize("max_entries", [100_000, 1_000])
+def test_processes_sharing_a_cache_never_mix_vectors(tmp_path, max_entries):
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                WRITER,
+                str(tmp_path),
+                str(worker),
+                str(max_entries),
+                f"{RAIZ}/04-RAG",
+            ],
+            stderr=subprocess.PIPE,
+        )
+        for worker in range(WORKERS)
+    ]
+    for process in processes:
+        _, erro = process.communicate(timeout=120)
+        assert process.returncode == 0, erro.decode()
+
+    store = EmbeddingStore(str(tmp_path), max_entries=max_entries)
+    found = store.get_many(_all_keys())
+    assert len(found) == min(max_entries, len(_all_keys()))
+    for key, vector in found.items():
+        assert vector == _expected(key), key
+    slots = store._db.execute("SELECT COUNT(DISTINCT slot) FROM entries").fetchone()
+    assert slots[0] == len(found)
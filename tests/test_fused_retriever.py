@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
+from langchain_core.vectorstores import InMemoryVectorStore
+
+pytest.importorskip("langchain.retrievers.multi_query")
+
+from fused_retriever import FusedMultiQueryRetriever, reciprocal_rank_fusion
+
+VOCABULARY = ["carbon", "ocean", "ice", "solar", "forest"]
+CHUNKS = [
+    "carbon emissions warm the planet",
+    "the ocean absorbs carbon",
+    "the ocean is rising",
+    "solar output varies slowly",
+    "forest loss changes rainfall",
+]
+
+
+class KeywordEmbeddings(Embeddings):
+    """Bag of words over a tiny vocabulary; records every embedding request"""
+
+    def __init__(self):
+        self.document_batches = []
+        self.queries = []
+
+    @staticmethod
+    def _vector(text):
+        words = text.lower().split()
+        return [float(words.count(word)) + 0.01 for word in VOCABULARY]
+
+    def embed_documents(self, texts):
+        self.document_batches.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vector(text)
+
+
+def _retriever(variants, **kwargs):
+    embeddings = KeywordEmbeddings()
+    vectorstore = InMemoryVectorStore(embeddings)
+    vectorstore.add_texts(CHUNKS)
+    embeddings.document_batches.clear()
+    llm_chain = RunnableLambda(lambda inputs: list(variants))
+    retriever = FusedMultiQueryRetriever(
+        vectorstore=vectorstore, llm_chain=llm_chain, k=2, **kwargs
+    )
+    return retriever, embeddings
+
+
+def _texts(documents):
+    return [document.page_content for document in documents]
+
+
+def test_rrf_ranks_documents_found_by_several_lists_first():
+    a, b, c = (Document(page_content=text) for text in "abc")
+
+    fused = reciprocal_rank_fusion([[a, b], [c, b], [b]], rrf_k=60)
+
+    assert _texts(fused) == ["b", "a", "c"]
+    assert _texts(reciprocal_rank_fusion([[a, b], [c, b]], top_n=1)) == ["b"]
+
+
+def test_variants_are_embedded_in_one_batch():
+    retriever, embeddings = _retriever(["ocean", "ice", " ocean "])
+
+    retriever.invoke("How do oceans change?")
+
+    # Duplicate variants are searched once, and no per-query embedding call
+    assert embeddings.document_batches == [["ocean", "ice"]]
+    assert embeddings.queries == []
+    assert set(retriever.last_timings) == {
+        "generate_ms",
+        "embed_ms",
+        "search_ms",
+        "fuse_ms",
+        "total_ms",
+    }
+
+
+def test_results_of_all_variants_are_fused():
+    retriever, _ = _retriever(["ocean", "carbon"])
+
+    documents = retriever.invoke("question")
+
+    # Second for each variant, but the only chunk both of them found
+    assert _texts(documents) == [
+        "the ocean absorbs carbon",
+        "the ocean is rising",
+        "carbon emissions warm the planet",
+    ]
+
+
+def test_original_question_is_searched_when_requested():
+    retriever, embeddings = _retriever(["ocean"], include_original=True, top_n=1)
+
+    documents = retriever.invoke("solar")
+
+    assert embeddings.document_batches == [["solar", "ocean"]]
+    assert len(documents) == 1
+
+
+def test_no_variants_falls_back_to_the_question():
+    retriever, embeddings = _retriever([])
+
+    documents = retriever.invoke("forest")
+
+    assert embeddings.document_batches == [["forest"]]
+    assert _texts(documents)[0] == "forest loss changes rainfall"
+
+
+def test_async_retrieval_matches_the_sync_one():
+    retriever, embeddings = _retriever(["ocean", "carbon"])
+
+    sync = retriever.invoke("question")
+    embeddings.document_batches.clear()
+    documents = asyncio.run(retriever.ainvoke("question"))
+
+    assert _texts(documents) == _texts(sync)
+    assert embeddings.document_batches == [["ocean", "carbon"]]
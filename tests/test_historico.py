@@ -0,0 +1,96 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from utils.historico import PREFIXO_RESUMO, RedutorHistorico, contar_tokens
+from utils.state import StateSuporteSimples, criar_estado_inicial
+
+SISTEMA = SystemMessage(content="Você é um atendente de suporte.")
+
+
+def _conversa(turnos):
+    mensagens = []
+    for i in range(1, turnos + 1):
+        mensagens.append(HumanMessage(content=f"Pergunta {i} sobre o pedido {i}"))
+        mensagens.append(AIMessage(content=f"Resposta {i} com os detalhes do pedido"))
+    return mensagens
+
+
+def _conversa_enviada(saida):
+    return [m for m in saida["llm_input_messages"] if not isinstance(m, SystemMessage)]
+
+
+def test_keeps_only_the_last_k_turns_and_summarizes_the_rest():
+    conversa = _conversa(5)
+
+    saida = RedutorHistorico(max_tokens=10_000, max_turnos=2)(
+        {"messages": [SISTEMA, *conversa]}
+    )
+
+    entrada = saida["llm_input_messages"]
+    assert entrada[0] is SISTEMA
+    assert entrada[1].content.startswith(PREFIXO_RESUMO)
+    assert _conversa_enviada(saida) == conversa[-4:]
+    assert saida["mensagens_resumidas"] == 6
+    assert saida["resumo_historico"].splitlines() == [
+        f"- {autor}: {m.content}"
+        for m, autor in zip(conversa[:6], ["Cliente", "Agente"] * 3)
+    ]
+
+
+def test_token_budget_drops_old_turns_but_always_keeps_the_latest():
+    conversa = _conversa(4)
+    dois_turnos = contar_tokens(conversa[-4:])
+
+    cabem_dois = RedutorHistorico(max_tokens=dois_turnos, max_turnos=10)
+    nenhum_cabe = RedutorHistorico(max_tokens=1, max_turnos=10)
+
+    assert _conversa_enviada(cabem_dois({"messages": conversa})) == conversa[-4:]
+    assert _conversa_enviada(nenhum_cabe({"messages": conversa})) == conversa[-2:]
+
+
+def test_summary_only_receives_messages_dropped_since_the_last_call():
+    resumidas = []
+
+    def resumir(resumo, mensagens):
+        resumidas.append([m.content for m in mensagens])
+        return resumo + f"[{len(mensagens)}]"
+
+    redutor = RedutorHistorico(max_tokens=10_000, max_turnos=1, resumir=resumir)
+    conversa = _conversa(2)
+    primeira = redutor({"messages": conversa})
+    conversa += _conversa(3)[4:]
+    segunda = redutor({"messages": conversa, **primeira})
+
+    assert resumidas == [
+        [m.content for m in conversa[:2]],
+        [m.content for m in conversa[2:4]],
+    ]
+    assert segunda["resumo_historico"] == "[2][2]"
+    assert _conversa_enviada(segunda) == conversa[-2:]
+
+
+def test_short_history_passes_through_untouched():
+    conversa = _conversa(2)
+
+    saida = RedutorHistorico()({"messages": [SISTEMA, *conversa]})
+
+    assert saida["llm_input_messages"] == [SISTEMA, *conversa]
+    assert saida["resumo_historico"] == ""
+
+
+def test_thread_history_accumulates_across_queries():
+    grafo = StateGraph(StateSuporteSimples)
+    grafo.add_node("responder", lambda state: {"response": "ok"})
+    grafo.add_edge(START, "responder")
+    grafo.add_edge("responder", END)
+    app = grafo.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "historico"}}
+
+    app.invoke(criar_estado_inicial("Primeira consulta"), config)
+    estado = app.invoke(criar_estado_inicial("Segunda consulta"), config)
+
+    assert [m.content for m in estado["messages"]] == [
+        "Primeira consulta",
+        "Segunda consulta",
+    ]
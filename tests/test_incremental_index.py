@@ -0,0 +1,178 @@
+import os
+
+import pytest
+from langchain_core.documents import Document
+
+from incremental_index import IncrementalIndexer
+
+SPLIT_CONFIG = {"separator": "\n"}
+
+
+class RecordingStore:
+    """Minimal Chroma-like store that records what gets embedded"""
+
+    def __init__(self):
+        self.chunks = {}
+        self.embedded = []
+
+    def add_documents(self, documents, ids):
+        self.embedded.extend(doc.page_content for doc in documents)
+        self.chunks.update(zip(ids, documents))
+        return ids
+
+    def delete(self, ids):
+        for i in ids:
+            self.chunks.pop(i, None)
+
+    def get(self, include=None):
+        return {"ids": list(self.chunks)}
+
+    def texts(self):
+        return sorted(doc.page_content for doc in self.chunks.values())
+
+
+class Loader:
+    def __init__(self):
+        self.loaded = []
+
+    def __call__(self, path):
+        self.loaded.append(os.path.basename(path))
+        with open(path, encoding="utf-8") as f:
+            return [Document(page_content=f.read(), metadata={"source": path})]
+
+
+def split_lines(documents):
+    return [
+        Document(page_content=line, metadata=dict(doc.metadata))
+        for doc in documents
+        for line in doc.page_content.splitlines()
+        if line
+    ]
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _indexer(tmp_path, store, loader, split_config=SPLIT_CONFIG):
+    return IncrementalIndexer(
+        store,
+        str(tmp_path / "manifest.json"),
+        load_fn=loader,
+        split_fn=split_lines,
+        split_config=split_config,
+        batch_size=2,
+    )
+
+
+def _files(tmp_path):
+    return [
+        _write(tmp_path / "a.txt", "alpha\nbeta\n"),
+        _write(tmp_path / "b.txt", "gamma\n"),
+    ]
+
+
+def test_first_sync_embeds_every_chunk(tmp_path):
+    store, loader = RecordingStore(), Loader()
+
+    stats = _indexer(tmp_path, store, loader).sync(_files(tmp_path))
+
+    assert (stats["parsed"], stats["skipped"], stats["added"]) == (2, 0, 3)
+    assert store.texts() == ["alpha", "beta", "gamma"]
+
+
+def test_unchanged_files_are_not_parsed_or_embedded_again(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+    _indexer(tmp_path, store, Loader()).sync(paths)
+    store.embedded.clear()
+
+    # A new indexer reads the manifest, like a restart
+    loader = Loader()
+    stats = _indexer(tmp_path, store, loader).sync(paths)
+
+    assert (stats["parsed"], stats["skipped"], stats["added"]) == (0, 2, 0)
+    assert loader.loaded == [] and store.embedded == []
+
+
+def test_touched_file_with_the_same_content_is_skipped(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+    _indexer(tmp_path, store, Loader()).sync(paths)
+    info = os.stat(paths[0])
+    os.utime(paths[0], ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+
+    loader = Loader()
+    stats = _indexer(tmp_path, store, loader).sync(paths)
+
+    assert stats["skipped"] == 2 and loader.loaded == []
+    # The new mtime is recorded, so the next sync skips without hashing
+    assert (
+        _indexer(tmp_path, store, loader).manifest["sources"][
+            os.path.abspath(paths[0])
+        ]["mtime_ns"]
+        == os.stat(paths[0]).st_mtime_ns
+    )
+
+
+def test_changed_file_embeds_only_new_chunks_and_deletes_stale_ones(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+    _indexer(tmp_path, store, Loader()).sync(paths)
+    store.embedded.clear()
+    _write(tmp_path / "a.txt", "alpha\ndelta\nepsilon\n")
+
+    loader = Loader()
+    stats = _indexer(tmp_path, store, loader).sync(paths)
+
+    assert loader.loaded == ["a.txt"]
+    assert sorted(store.embedded) == ["delta", "epsilon"]
+    assert (stats["added"], stats["deleted"]) == (2, 1)
+    assert store.texts() == ["alpha", "delta", "epsilon", "gamma"]
+
+
+def test_removed_file_loses_its_chunks(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+    _indexer(tmp_path, store, Loader()).sync(paths)
+
+    stats = _indexer(tmp_path, store, Loader()).sync(paths[:1])
+
+    assert stats["deleted"] == 1
+    assert store.texts() == ["alpha", "beta"]
+
+
+def test_new_splitter_settings_rebuild_the_index(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+    _indexer(tmp_path, store, Loader()).sync(paths)
+    old_ids = set(store.chunks)
+
+    loader = Loader()
+    stats = _indexer(tmp_path, store, loader, {"separator": "\n\n"}).sync(paths)
+
+    assert sorted(loader.loaded) == ["a.txt", "b.txt"]
+    assert (stats["deleted"], stats["added"]) == (3, 3)
+    assert not old_ids & set(store.chunks)
+
+
+def test_interrupted_sync_resumes_with_the_unfinished_files(tmp_path):
+    paths = _files(tmp_path)
+    store = RecordingStore()
+
+    class FailingLoader(Loader):
+        def __call__(self, path):
+            if path.endswith("b.txt"):
+                raise OSError("disk error")
+            return super().__call__(path)
+
+    with pytest.raises(OSError):
+        _indexer(tmp_path, store, FailingLoader()).sync(paths)
+
+    loader = Loader()
+    stats = _indexer(tmp_path, store, loader).sync(paths)
+
+    assert loader.loaded == ["b.txt"]
+    assert stats["skipped"] == 1
+    assert store.texts() == ["alpha", "beta", "gamma"]
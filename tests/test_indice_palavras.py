@@ -0,0 +1,45 @@
+import pytest
+
+from utils.indice_palavras import IndicePalavrasChave
+
+INDICE = IndicePalavrasChave(
+    {
+        "conexao": ["rede", "wifi"],
+        "garantia": ["troca", "defeito"],
+        "complexo": ["perda de dados"],
+    }
+)
+
+
+@pytest.mark.parametrize(
+    "texto",
+    [
+        "Quero redefinir minha senha",
+        "Preciso trocar o e-mail da conta",
+        "A perda de dadosxyz",
+        "aredes e trocas",
+    ],
+)
+def test_keyword_inside_a_longer_word_does_not_match(texto):
+    assert INDICE.buscar(texto) == []
+    assert not INDICE.contem(texto)
+
+
+@pytest.mark.parametrize(
+    "texto, chave",
+    [
+        ("rede", "conexao"),
+        ("Minha rede caiu", "conexao"),
+        ("Quero fazer a troca!", "garantia"),
+        ("Houve PERDA DE DADOS, socorro", "complexo"),
+        ("wi-fi ou wifi?", "conexao"),
+    ],
+)
+def test_whole_words_match_at_any_position(texto, chave):
+    assert [c for c, _ in INDICE.buscar(texto)] == [chave]
+
+
+def test_detailed_search_counts_distinct_keywords():
+    resultado = INDICE.buscar_detalhado("troca por defeito, troca urgente, rede")
+
+    assert resultado == [("garantia", 12, 2), ("conexao", 4, 1)]
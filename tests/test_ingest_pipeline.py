@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pymupdf
+import pytest
+from langchain_core.documents import Document
+
+from ingest_pipeline import BatchWriter, count_pages, stream_pdf_documents
+
+
+class SlowStore:
+    """Records each add_documents call and the peak number running at once"""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def add_documents(self, documents, ids):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on in ids:
+                raise RuntimeError("embedding request failed")
+            with self._lock:
+                self.calls.append(list(ids))
+        finally:
+            with self._lock:
+                self.running -= 1
+        return ids
+
+
+def _documents(prefix, count):
+    ids = [f"{prefix}{i}" for i in range(count)]
+    return [Document(page_content=i) for i in ids], ids
+
+
+def test_documents_are_written_in_fixed_size_batches():
+    store = SlowStore()
+    writer = BatchWriter(store, batch_size=2, max_concurrency=1)
+
+    writer.add(*_documents("a", 3), tag="a")
+    writer.add(*_documents("b", 2), tag="b")
+    writer.flush()
+    writer.close()
+
+    assert store.calls == [["a0", "a1"], ["a2", "b0"], ["b1"]]
+    assert writer.batches == 3
+
+
+def test_tag_is_drained_only_after_all_its_documents_are_stored():
+    writer = BatchWriter(SlowStore(), batch_size=2, max_concurrency=1)
+
+    writer.add(*_documents("a", 3), tag="a")
+    writer.flush()
+    drained = writer.drain()
+    writer.add([], [], tag="empty")
+    writer.close()
+
+    assert drained == ["a"]
+    # A file without chunks is done right away
+    assert writer.drain() == ["empty"]
+
+
+def test_batches_in_flight_are_capped():
+    store = SlowStore(delay=0.05)
+    writer = BatchWriter(store, batch_size=1, max_concurrency=2)
+
+    writer.add(*_documents("a", 6), tag="a")
+    writer.flush()
+    writer.close()
+
+    assert len(store.calls) == 6
+    assert store.peak == 2
+
+
+def test_failed_batch_is_raised_on_flush_and_its_tag_never_drains():
+    writer = BatchWriter(SlowStore(fail_on="b0"), batch_size=2, max_concurrency=1)
+
+    writer.add(*_documents("a", 2), tag="a")
+    writer.add(*_documents("b", 2), tag="b")
+    with pytest.raises(RuntimeError, match="embedding request failed"):
+        writer.flush()
+    writer.close()
+
+    assert writer.drain() == ["a"]
+    with pytest.raises(RuntimeError):
+        writer.add(*_documents("c", 1), tag="c")
+
+
+def _pdf(path, pages):
+    pdf = pymupdf.open()
+    for number in range(pages):
+        pdf.new_page().insert_text((72, 72), f"{path.stem} page {number}")
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+def test_pdfs_split_into_page_ranges_are_yielded_whole_and_in_page_order(tmp_path):
+    paths = [_pdf(tmp_path / "long.pdf", 5), _pdf(tmp_path / "short.pdf", 1)]
+
+    parsed = dict(stream_pdf_documents(paths, max_workers=2, pages_per_task=2))
+
+    assert sorted(parsed) == sorted(paths)
+    assert count_pages(paths[0]) == 5
+    long_pages = parsed[paths[0]]
+    assert [doc.page_content.strip() for doc in long_pages] == [
+        f"long page {number}" for number in range(5)
+    ]
+    assert [doc.metadata for doc in long_pages] == [
+        {"source": paths[0], "page": number, "total_pages": 5} for number in range(5)
+    ]
+    assert len(parsed[paths[1]]) == 1
@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph import workflow_suporte
+from graph.workflow_suporte import WorkflowSuporteMultiAgente, criar_workflow
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências que só os caminhos que as usam devem carregar
+IMPORTS_TARDIOS = [
+    "langchain_openai",
+    "langgraph.prebuilt",
+    "langgraph.checkpoint.sqlite",
+    "aiosqlite",
+]
+
+
+def test_importing_the_graph_loads_no_model_client_or_database():
+    codigo = f"""
+import json, sys
+sys.path.insert(0, "src")
+import graph.workflow_suporte
+from memory import workflow_memory
+print(json.dumps({{
+    "modulos": [m for m in {IMPORTS_TARDIOS!r} if m in sys.modules],
+    "abertos": [workflow_memory._checkpointer is not None,
+                workflow_memory._store is not None],
+}}))
+"""
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": ""},
+    )
+
+    resultado = json.loads(saida.stdout)
+    assert resultado == {"modulos": [], "abertos": [False, False]}
+
+
+def test_graph_is_compiled_on_first_use_and_only_once():
+    workflow = WorkflowSuporteMultiAgente(checkpointer=MemorySaver())
+    assert workflow._app is None
+
+    app = workflow.app
+
+    assert workflow.app is app
+
+
+def test_criar_workflow_reuses_the_workflow_and_skips_the_diagram(monkeypatch):
+    monkeypatch.setattr(workflow_suporte, "_workflows", {})
+    desenhados = []
+    monkeypatch.setattr(workflow_suporte, "gerar_diagrama_workflow", desenhados.append)
+
+    workflow = criar_workflow(usar_cache=False, usar_roteador=False)
+
+    assert criar_workflow(usar_cache=False, usar_roteador=False) is workflow
+    assert desenhados == []
+    criar_workflow(usar_cache=False, usar_roteador=False, gerar_diagrama=True)
+    assert desenhados == [workflow]
+    assert workflow._app is None
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow_suporte import WorkflowSuporteMultiAgente
+from utils.instrumentacao import Instrumentacao, SinkJSONL
+
+CONSULTA = "Fui cobrado em duplicata no meu cartão"
+
+
+def _processar(instrumentacao, thread_id="t1"):
+    workflow = WorkflowSuporteMultiAgente(
+        checkpointer=MemorySaver(), usar_regras=False, instrumentacao=instrumentacao
+    )
+    return workflow.processar_consulta(CONSULTA, thread_id)
+
+
+def test_every_executed_node_gets_a_latency_sample(llm_simulado):
+    instrumentacao = Instrumentacao()
+
+    _processar(instrumentacao)
+
+    nos = {no: r["contagem"] for no, r in instrumentacao.relatorio_nos()}
+    assert nos == {
+        "inicializar": 1,
+        "categorizar": 1,
+        "analisar_sentimento": 1,
+        "consolidar_triagem": 1,
+        "agent_financeiro": 1,
+    }
+    p95 = [r["p95"] for _, r in instrumentacao.relatorio_nos()]
+    assert p95 == sorted(p95, reverse=True)
+
+
+def test_tokens_are_counted_per_node_from_the_model_usage(llm_simulado):
+    instrumentacao = Instrumentacao()
+
+    _processar(instrumentacao)
+
+    tokens = {
+        (dict(r)["no"], dict(r)["tipo"]): valor
+        for r, valor in instrumentacao.tokens.valores().items()
+    }
+    for no in ("categorizar", "analisar_sentimento"):
+        assert tokens[(no, "entrada")] > 0
+        assert tokens[(no, "saida")] == 1  # Resposta de uma palavra
+
+
+def test_trace_events_carry_the_thread_id(tmp_path, llm_simulado):
+    caminho = tmp_path / "trace.jsonl"
+    sink = SinkJSONL(str(caminho))
+
+    _processar(Instrumentacao(sink=sink), thread_id="ticket-42")
+    sink.fechar()
+
+    eventos = [json.loads(linha) for linha in caminho.read_text().splitlines()]
+    tipos = {e["tipo"] for e in eventos}
+    assert {"no", "llm", "tool", "triagem"} <= tipos
+    assert {e["thread_id"] for e in eventos if e["tipo"] in ("no", "llm")} == {
+        "ticket-42"
+    }
+
+
+def test_prometheus_export_has_histograms_and_counters(llm_simulado):
+    instrumentacao = Instrumentacao()
+    _processar(instrumentacao)
+
+    texto = instrumentacao.registro.exportar_prometheus()
+
+    assert "# TYPE suporte_no_duracao_segundos histogram" in texto
+    assert 'suporte_no_duracao_segundos_count{no="categorizar"} 1' in texto
+    assert 'suporte_llm_tokens_total{no="categorizar",tipo="saida"} 1' in texto
+
+
+def test_failing_node_is_still_measured():
+    instrumentacao = Instrumentacao()
+
+    with pytest.raises(RuntimeError):
+        with instrumentacao.medir_no("quebrado"):
+            raise RuntimeError("falhou")
+
+    [(no, resumo)] = instrumentacao.relatorio_nos()
+    assert (no, resumo["contagem"]) == ("quebrado", 1)
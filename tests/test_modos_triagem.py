@@ -0,0 +1,122 @@
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow_suporte import ModoTriagem, WorkflowSuporteMultiAgente
+from utils import pool_llm
+from utils.instrumentacao import Instrumentacao
+from utils.llm_simulado import LLMSimulado, resposta_padrao
+
+# Consulta -> (categoria, sentimento, prioridade) pelo LLM simulado
+CONSULTAS = {
+    "Não consigo fazer login no sistema": ("Technical", "Neutral", "Medium"),
+    "Fui cobrado em duplicata no meu cartão": ("Billing", "Neutral", "Medium"),
+    "Qual o horário de funcionamento da empresa?": ("General", "Neutral", "Low"),
+    "O sistema travou e perdi meus dados, que raiva!": (
+        "Technical",
+        "Negative",
+        "High",
+    ),
+}
+
+
+def _workflow(modo):
+    # Sem regras: a triagem inteira passa pelo LLM
+    return WorkflowSuporteMultiAgente(
+        modo_triagem=modo,
+        checkpointer=MemorySaver(),
+        usar_regras=False,
+        instrumentacao=Instrumentacao(),
+    )
+
+
+def _passos(workflow, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    return [c.metadata["step"] for c in workflow.app.get_state_history(config)]
+
+
+@pytest.mark.parametrize("consulta, esperado", CONSULTAS.items())
+def test_parallel_triage_matches_sequential(consulta, esperado, llm_simulado):
+    resultados = {
+        modo: _workflow(modo).processar_consulta(consulta)
+        for modo in (ModoTriagem.SEQUENCIAL, ModoTriagem.PARALELA)
+    }
+
+    for resultado in resultados.values():
+        assert (
+            resultado["category"],
+            resultado["sentiment"],
+            resultado["priority"],
+        ) == esperado
+    sequencial, paralela = resultados.values()
+    assert paralela["agent_used"] == sequencial["agent_used"]
+
+
+def test_parallel_mode_runs_both_analyses_in_the_same_step(llm_simulado):
+    consulta = "Fui cobrado em duplicata no meu cartão"
+    sequencial = _workflow(ModoTriagem.SEQUENCIAL)
+    paralela = _workflow(ModoTriagem.PARALELA)
+    sequencial.processar_consulta(consulta, "t")
+    paralela.processar_consulta(consulta, "t")
+
+    assert max(_passos(paralela, "t")) == max(_passos(sequencial, "t")) - 1
+    nos = {dict(r)["no"] for r in paralela.instrumentacao.llm.resumo()}
+    assert {"categorizar", "analisar_sentimento"} <= nos
+
+
+def _estado_final(workflow, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    return workflow.app.get_state(config).values
+
+
+@pytest.mark.parametrize("consulta, esperado", CONSULTAS.items())
+def test_joint_triage_returns_the_same_state_shape_as_sequential(
+    consulta, esperado, llm_simulado
+):
+    sequencial = _workflow(ModoTriagem.SEQUENCIAL)
+    conjunta = _workflow(ModoTriagem.CONJUNTA)
+    resultado_sequencial = sequencial.processar_consulta(consulta, "t")
+    resultado_conjunta = conjunta.processar_consulta(consulta, "t")
+
+    estado_sequencial = _estado_final(sequencial, "t")
+    estado_conjunta = _estado_final(conjunta, "t")
+    assert estado_conjunta.keys() == estado_sequencial.keys()
+    for campo in ("category", "sentiment", "priority", "agent_used", "escalated"):
+        assert estado_conjunta[campo] == estado_sequencial[campo]
+    assert resultado_conjunta.keys() == resultado_sequencial.keys()
+    assert (
+        resultado_conjunta["category"],
+        resultado_conjunta["sentiment"],
+        resultado_conjunta["priority"],
+    ) == esperado
+
+
+def test_joint_triage_makes_a_single_llm_call(llm_simulado):
+    workflow = _workflow(ModoTriagem.CONJUNTA)
+
+    workflow.processar_consulta("Fui cobrado em duplicata no meu cartão")
+
+    chamadas = {
+        dict(rotulos)["no"]: r["contagem"]
+        for rotulos, r in workflow.instrumentacao.llm.resumo().items()
+    }
+    assert chamadas == {"triagem_conjunta": 1}
+
+
+def test_invalid_joint_answer_falls_back_to_the_separate_tools(llm_simulado):
+    def responder(prompt):
+        if "json" in prompt.lower():
+            return "Categoria: cobrança, acho"
+        return resposta_padrao(prompt)
+
+    pool_llm.definir_llm_override(LLMSimulado(responder=responder))
+
+    workflow = _workflow(ModoTriagem.CONJUNTA)
+
+    resultado = workflow.processar_consulta("Fui cobrado em duplicata no meu cartão")
+
+    assert (resultado["category"], resultado["sentiment"]) == ("Billing", "Neutral")
+    assert resultado["priority"] == "Medium"
+    # Conjunta inválida + categorização + sentimento, todos no mesmo nó
+    [(rotulos, chamadas)] = workflow.instrumentacao.llm.resumo().items()
+    assert dict(rotulos)["no"] == "triagem_conjunta"
+    assert chamadas["contagem"] == 3
@@ -0,0 +1,53 @@
+import pytest
+from langchain_core.prompts import ChatPromptTemplate
+
+from utils import pool_llm
+from utils.llm_simulado import LLMSimulado
+
+PROMPT = ChatPromptTemplate.from_messages([("human", "Consulta: {query}")])
+
+
+@pytest.fixture(autouse=True)
+def chave_openai(monkeypatch):
+    # Os clientes são criados, mas nenhum teste chama a API
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-teste")
+
+
+def test_same_model_and_temperature_reuse_one_client():
+    antes = pool_llm.estatisticas_pool()
+
+    llm = pool_llm.obter_llm("modelo-pool-a", 0.0)
+
+    assert pool_llm.obter_llm("modelo-pool-a", 0.0) is llm
+    assert pool_llm.obter_llm("modelo-pool-a", 0.5) is not llm
+    depois = pool_llm.estatisticas_pool()
+    assert depois["clientes_criados"] - antes["clientes_criados"] == 2
+    assert depois["clientes_reutilizados"] - antes["clientes_reutilizados"] == 1
+
+
+def test_all_clients_share_the_http_connection_pool():
+    a = pool_llm.obter_llm("modelo-pool-b", 0.0)
+    b = pool_llm.obter_llm("modelo-pool-c", None, base_url="http://localhost:1/v1")
+
+    assert a.http_client is b.http_client
+    assert a.http_async_client is b.http_async_client
+
+
+def test_chains_are_compiled_once_per_name():
+    chain = pool_llm.obter_chain("teste_pool", PROMPT, model="modelo-pool-d")
+
+    assert pool_llm.obter_chain("teste_pool", PROMPT, model="modelo-pool-d") is chain
+    assert (
+        pool_llm.obter_chain("outra_pool", PROMPT, model="modelo-pool-d") is not chain
+    )
+
+
+def test_override_replaces_the_models_of_compiled_chains():
+    pool_llm.obter_chain("teste_override", PROMPT, model="modelo-pool-e")
+    try:
+        pool_llm.definir_llm_override(LLMSimulado(responder=lambda p: "simulado"))
+        chain = pool_llm.obter_chain("teste_override", PROMPT, model="modelo-pool-e")
+
+        assert chain.invoke({"query": "oi"}).content == "simulado"
+    finally:
+        pool_llm.definir_llm_override(None)
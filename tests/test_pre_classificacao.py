@@ -0,0 +1,40 @@
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from agents.agente_coordenador import pre_classificar_consulta
+from graph.workflow_suporte import ModoTriagem, WorkflowSuporteMultiAgente
+from memory.cache_triagem import CacheTriagem
+from utils.instrumentacao import Instrumentacao
+
+# "perdi" não está nas palavras negativas das regras: só o LLM percebe o tom
+NEGATIVA = "Fui cobrado em duplicata no meu cartão e perdi o limite"
+
+
+def test_single_keyword_is_not_enough_for_the_fast_path():
+    # "login" é a única palavra-chave: confiança 1.0, mas evidência fraca
+    assert pre_classificar_consulta("Não consigo fazer login no sistema") is None
+
+
+def test_rules_classify_only_the_category():
+    triagem = pre_classificar_consulta("Fui cobrado em duplicata no meu cartão")
+
+    assert triagem["category"] == "Billing"
+    assert "sentiment" not in triagem and "priority" not in triagem
+
+
+@pytest.mark.parametrize("com_cache", [False, True])
+@pytest.mark.parametrize("modo", list(ModoTriagem))
+def test_fast_path_still_analyses_the_sentiment(modo, com_cache, llm_simulado):
+    workflow = WorkflowSuporteMultiAgente(
+        modo_triagem=modo,
+        checkpointer=MemorySaver(),
+        cache_triagem=CacheTriagem(":memory:") if com_cache else None,
+        instrumentacao=Instrumentacao(),
+    )
+
+    resultado = workflow.processar_consulta(NEGATIVA, thread_id="negativa")
+
+    assert resultado["fast_path"]
+    assert resultado["category"] == "Billing"
+    assert resultado["sentiment"] == "Negative"
+    assert resultado["priority"] == "High"
@@ -0,0 +1,57 @@
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow_suporte import WorkflowSuporteMultiAgente
+from utils import pool_llm
+from utils.instrumentacao import Instrumentacao
+from utils.llm_simulado import LLMSimulado, resposta_padrao
+
+CONSULTAS = [
+    "Não consigo fazer login no sistema",
+    "Fui cobrado em duplicata no meu cartão",
+    "Qual o horário de funcionamento da empresa?",
+]
+CATEGORIAS = ["Technical", "Billing", "General"]
+
+
+def _workflow():
+    return WorkflowSuporteMultiAgente(
+        checkpointer=MemorySaver(),
+        usar_regras=False,
+        instrumentacao=Instrumentacao(),
+    )
+
+
+def test_results_follow_the_input_order(llm_simulado):
+    resultados = _workflow().processar_lote(CONSULTAS * 3, max_concurrency=4)
+
+    assert [r["query"] for r in resultados] == CONSULTAS * 3
+    assert [r["category"] for r in resultados] == CATEGORIAS * 3
+    # Cada consulta ganha sua própria thread
+    assert len({r["thread_id"] for r in resultados}) == 9
+
+
+def test_given_thread_ids_are_used(llm_simulado):
+    resultados = _workflow().processar_lote(CONSULTAS, thread_ids=["a", "b", "c"])
+
+    assert [r["thread_id"] for r in resultados] == ["a", "b", "c"]
+
+
+def test_thread_ids_must_match_the_queries():
+    with pytest.raises(ValueError, match="mesmo tamanho"):
+        _workflow().processar_lote(CONSULTAS, thread_ids=["a"])
+
+
+def test_a_failing_query_does_not_sink_the_batch(llm_simulado):
+    def responder(prompt):
+        if "explode" in prompt:
+            raise RuntimeError("endpoint fora do ar")
+        return resposta_padrao(prompt)
+
+    pool_llm.definir_llm_override(LLMSimulado(responder=responder))
+
+    resultados = _workflow().processar_lote([CONSULTAS[0], "explode", CONSULTAS[1]])
+
+    assert "endpoint fora do ar" in resultados[1]["erro"]
+    assert resultados[1]["query"] == "explode"
+    assert [resultados[0]["category"], resultados[2]["category"]] == CATEGORIAS[:2]
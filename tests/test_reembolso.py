@@ -0,0 +1,34 @@
+import io
+
+import pytest
+
+from utils.reembolso import processar_csv
+
+CABECALHO = "pedido,valor_original,dias_desde_compra\n"
+
+
+def _processar(conteudo, tamanho_bloco=2):
+    saida = io.StringIO()
+    total = processar_csv(io.StringIO(conteudo), saida, tamanho_bloco=tamanho_bloco)
+    return total, saida.getvalue().splitlines()
+
+
+def test_blank_lines_are_skipped():
+    total, linhas = _processar(CABECALHO + "1,100.00,10\n\n2,80.00,45\n   \n\n")
+
+    assert total == 2
+    assert linhas[1:] == ["1,100.00,10,100,100.00,1", "2,80.00,45,50,40.00,1"]
+
+
+def test_short_row_reports_its_line_number():
+    conteudo = CABECALHO + "1,100.00,10\n\n2,80.00,45\n3,50.00\n"
+
+    with pytest.raises(ValueError, match="linha 5: 2 colunas"):
+        _processar(conteudo)
+
+
+def test_invalid_value_reports_the_line_after_blank_lines():
+    conteudo = CABECALHO + "\n1,100.00,10\n\n2,abc,45\n"
+
+    with pytest.raises(ValueError, match="linha 5: valor_original inválido"):
+        _processar(conteudo)
@@ -0,0 +1,106 @@
+import copy
+import json
+
+import pytest
+
+from utils.replay import (
+    carregar_corpus,
+    comparar_com_baseline,
+    executar_replay,
+    gerar_corpus,
+)
+
+
+def _ticket(i, query, categoria, sentimento="Neutral", llm=None):
+    ticket = {
+        "id": i,
+        "query": query,
+        "esperado": {"categoria": categoria, "sentimento": sentimento},
+    }
+    if llm:
+        ticket["llm"] = llm
+    return ticket
+
+
+def test_synthetic_corpus_is_reproducible(tmp_path):
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+
+    gerar_corpus(str(a), 50, semente=7)
+    gerar_corpus(str(b), 50, semente=7)
+
+    assert a.read_text() == b.read_text()
+    assert len(carregar_corpus(str(a), limite=20)) == 20
+
+
+def test_invalid_ticket_reports_its_line(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    valido = json.dumps(_ticket(0, "oi", "General"))
+    corpus.write_text(f"{valido}\n\n" + json.dumps({"query": "sem rótulo"}) + "\n")
+
+    with pytest.raises(ValueError, match="corpus.jsonl:3"):
+        carregar_corpus(str(corpus))
+
+
+def test_replay_scores_the_scripted_answers_against_the_labels():
+    tickets = [
+        _ticket(
+            0,
+            "Preciso de ajuda com a minha conta",
+            "Technical",
+            llm={"category": "Technical"},
+        ),
+        _ticket(
+            1, "Tenho uma dúvida sobre a fatura", "Billing", llm={"category": "Billing"}
+        ),
+        # O modelo erra este: vira General e cai no agente geral
+        _ticket(
+            2,
+            "Quero falar sobre a minha assinatura",
+            "Billing",
+            llm={"category": "General"},
+        ),
+        _ticket(
+            3,
+            "Vocês estão de parabéns",
+            "General",
+            "Negative",
+            llm={"sentiment": "Negative"},
+        ),
+    ]
+
+    resultado = executar_replay(tickets, atraso=0, concorrencia=2, usar_regras=False)
+
+    assert resultado["tickets"] == 4 and resultado["erros"] == 0
+    assert resultado["acuracia"]["categoria"] == 0.75
+    assert resultado["acuracia"]["sentimento"] == 1.0
+    assert resultado["confusao_categorias"]["Billing"] == {"Billing": 1, "General": 1}
+    assert "categorizar" in resultado["nos_p95_ms"]
+
+
+BASE = {
+    "vazao_tickets_s": 100.0,
+    "latencia_ms": {"p50": 10.0, "p95": 20.0, "p99": 30.0},
+    "acuracia": {"categoria": 0.9, "sentimento": 0.95},
+}
+
+
+def test_baseline_within_tolerance_has_no_regressions():
+    resultado = copy.deepcopy(BASE)
+    resultado["vazao_tickets_s"] = 95.0
+    resultado["latencia_ms"]["p95"] = 21.0
+
+    assert comparar_com_baseline(resultado, BASE) == []
+
+
+def test_baseline_flags_throughput_latency_and_accuracy_regressions():
+    resultado = copy.deepcopy(BASE)
+    resultado["vazao_tickets_s"] = 80.0
+    resultado["latencia_ms"]["p99"] = 40.0
+    resultado["acuracia"]["categoria"] = 0.85
+
+    regressoes = comparar_com_baseline(resultado, BASE)
+
+    assert len(regressoes) == 3
+    assert regressoes[0].startswith("vazão caiu")
+    assert regressoes[1].startswith("latência p99 subiu")
+    assert regressoes[2].startswith("acurácia de categoria caiu")
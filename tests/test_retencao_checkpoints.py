@@ -0,0 +1,150 @@
+import asyncio
+import os
+import sqlite3
+import time
+
+import aiosqlite
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from memory.retencao_checkpoints import (
+    AsyncSqliteSaverComRetencao,
+    SqliteSaverComRetencao,
+    compactar,
+    simular_crescimento,
+    tamanho_arquivo,
+)
+
+
+def _saver(caminho, **kwargs):
+    conn = sqlite3.connect(caminho, check_same_thread=False)
+    return SqliteSaverComRetencao(conn, intervalo_compactacao=10**9, **kwargs)
+
+
+def _gravar(saver, thread_id, passos, writes=1):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for passo in range(passos):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"query": "consulta " * 50, "passo": passo}
+        config = saver.put(config, checkpoint, {"step": passo}, {})
+        saver.put_writes(
+            config,
+            [("response", f"resposta {i}") for i in range(writes)],
+            task_id=f"{thread_id}-{passo}",
+        )
+    return config
+
+
+def _contar(saver, tabela):
+    return saver.conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+
+def test_100k_writes_stay_bounded_by_keep_last_n():
+    threads, max_checkpoints, intervalo = 200, 20, 500
+    amostras = simular_crescimento(
+        100_000, threads, max_checkpoints, intervalo_compactacao=intervalo
+    )
+
+    # Entre duas compactações entram no máximo `intervalo` checkpoints a mais
+    limite = threads * max_checkpoints + intervalo
+    for amostra in amostras:
+        assert amostra["checkpoints"] <= limite
+        assert amostra["writes"] <= limite
+    # Depois de preencher as threads o arquivo para de crescer
+    assert amostras[-1]["bytes"] <= amostras[1]["bytes"] * 1.1
+
+
+def test_ttl_removes_inactive_threads_and_frees_space(tmp_path):
+    caminho = str(tmp_path / "conversas.db")
+    saver = _saver(caminho, max_checkpoints=None, ttl_segundos=1)
+    for i in range(300):
+        _gravar(saver, f"inativa_{i}", passos=3)
+    time.sleep(1.1)
+    for i in range(10):
+        _gravar(saver, f"ativa_{i}", passos=3)
+    antes = tamanho_arquivo(caminho)
+
+    removidos = compactar(saver.conn, None, 1, vacuum=True)
+
+    assert removidos["threads_expiradas"] == 300 * 3
+    assert removidos["writes_orfaos"] == 300 * 3
+    assert _contar(saver, "checkpoints") == 10 * 3
+    assert _contar(saver, "writes") == 10 * 3
+    assert tamanho_arquivo(caminho) < antes / 5
+
+
+def test_writes_of_dropped_checkpoints_are_removed(tmp_path):
+    saver = _saver(str(tmp_path / "conversas.db"), max_checkpoints=2)
+    config = _gravar(saver, "conversa", passos=10, writes=3)
+
+    removidos = saver.compactar_agora()
+
+    assert removidos["checkpoints_antigos"] == 8
+    assert removidos["writes_orfaos"] == 8 * 3
+    assert _contar(saver, "writes") == 2 * 3
+    orfaos = saver.conn.execute(
+        """
+        SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (
+            SELECT 1 FROM checkpoints c WHERE c.checkpoint_id = w.checkpoint_id
+        )
+        """
+    ).fetchone()[0]
+    assert orfaos == 0
+    assert saver.get_tuple(config).pending_writes
+
+
+def _pragma(conn, nome):
+    return conn.execute(f"PRAGMA {nome}").fetchone()[0]
+
+
+def test_new_database_starts_with_wal_and_incremental_auto_vacuum(tmp_path):
+    saver = _saver(str(tmp_path / "conversas.db"))
+    _gravar(saver, "conversa", passos=1)
+
+    assert _pragma(saver.conn, "journal_mode") == "wal"
+    assert _pragma(saver.conn, "auto_vacuum") == 2
+
+
+def test_opening_a_legacy_database_never_runs_a_full_vacuum(tmp_path):
+    caminho = str(tmp_path / "conversas.db")
+    legado = sqlite3.connect(caminho)
+    legado.execute("CREATE TABLE antiga (x)")
+    legado.commit()
+    legado.close()
+
+    conn = sqlite3.connect(caminho, check_same_thread=False)
+    comandos = []
+    conn.set_trace_callback(comandos.append)
+    saver = SqliteSaverComRetencao(conn)
+    _gravar(saver, "conversa", passos=1)
+
+    assert not any("VACUUM" in c.upper().replace("AUTO_VACUUM", "") for c in comandos)
+    assert _pragma(conn, "auto_vacuum") == 0
+    # O VACUUM fica para a manutenção explícita (compactar --vacuum)
+    compactar(conn, vacuum=True)
+    assert _pragma(conn, "auto_vacuum") == 2
+
+
+def test_async_saver_gets_the_same_setup_and_truncates_the_wal(tmp_path):
+    caminho = str(tmp_path / "conversas.db")
+
+    async def usar():
+        conn = await aiosqlite.connect(caminho)
+        saver = AsyncSqliteSaverComRetencao(conn, max_checkpoints=1)
+        config = {"configurable": {"thread_id": "conversa", "checkpoint_ns": ""}}
+        for passo in range(5):
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"query": "consulta " * 50}
+            config = await saver.aput(config, checkpoint, {"step": passo}, {})
+        removidos = await saver.acompactar()
+        tamanho_wal = os.path.getsize(f"{caminho}-wal")
+        await conn.close()
+        return removidos, tamanho_wal
+
+    removidos, tamanho_wal = asyncio.run(usar())
+
+    assert removidos["checkpoints_antigos"] == 4
+    assert tamanho_wal == 0
+    conn = sqlite3.connect(caminho)
+    assert _pragma(conn, "journal_mode") == "wal"
+    assert _pragma(conn, "auto_vacuum") == 2
@@ -0,0 +1,215 @@
+import asyncio
+
+import pytest
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph import workflow_suporte
+from graph.workflow_suporte import WorkflowSuporteMultiAgente, criar_workflow
+from utils import pool_llm
+from utils.instrumentacao import Instrumentacao
+from utils.llm_simulado import LLMSimulado, responder_redacao
+from utils.roteador_modelos import NIVEIS_PADRAO, RoteadorModelos
+
+HORARIO = "Qual o horário de funcionamento da empresa?"
+INFORMACAO = "Abrimos de Segunda a Sexta, das 8h às 18h."
+
+
+def _workflow(roteador=None):
+    return WorkflowSuporteMultiAgente(
+        checkpointer=MemorySaver(),
+        checkpointer_async=MemorySaver(),
+        instrumentacao=Instrumentacao(),
+        roteador=roteador,
+    )
+
+
+def _roteador_incerto_no_local():
+    return RoteadorModelos(
+        llms={
+            "local": LLMSimulado(responder=lambda prompt: "Não sei responder isso."),
+            "grande": LLMSimulado(responder=responder_redacao()),
+        }
+    )
+
+
+def _resposta_transmitida(eventos):
+    """Texto que um cliente do stream exibe, apagando rascunhos descartados"""
+    texto = ""
+    for evento in eventos:
+        if evento["evento"] == "token":
+            texto += evento["valor"]
+        elif evento["evento"] == "descartado":
+            texto = ""
+        elif evento["evento"] == "resposta":
+            texto = evento["valor"]
+    return texto
+
+
+def test_stream_relays_the_model_tokens_and_discards_rejected_drafts(llm_simulado):
+    eventos = list(_workflow(_roteador_incerto_no_local()).stream_consulta(HORARIO))
+
+    resultado = eventos[-1]["resultado"]
+    tokens = [e for e in eventos if e["evento"] == "token"]
+    descartes = [e for e in eventos if e["evento"] == "descartado"]
+    assert {e["nivel"] for e in tokens} == {"local", "grande"}
+    assert [(e["valor"], e["motivo"]) for e in descartes] == [
+        ("local", "local: resposta incerta")
+    ]
+    assert not any(e["evento"] == "resposta" for e in eventos)
+    assert _resposta_transmitida(eventos) == resultado["response"]
+    assert resultado["response"].startswith("Olá! Obrigado pelo contato.")
+
+
+def test_async_stream_relays_the_model_tokens(llm_simulado):
+    workflow = _workflow(_roteador_incerto_no_local())
+
+    async def coletar():
+        return [e async for e in workflow.astream_consulta(HORARIO)]
+
+    eventos = asyncio.run(coletar())
+
+    assert any(e["evento"] == "descartado" for e in eventos)
+    assert _resposta_transmitida(eventos) == eventos[-1]["resultado"]["response"]
+
+
+def _roteador_redacao(classe=LLMSimulado):
+    return RoteadorModelos(
+        llms={nivel: classe(responder=responder_redacao()) for nivel in NIVEIS_PADRAO}
+    )
+
+
+def test_streamed_reply_records_token_usage(llm_simulado):
+    eventos = list(_workflow(_roteador_redacao()).stream_consulta(HORARIO))
+
+    roteamento = eventos[-1]["resultado"]["roteamento"]
+    assert any(e["evento"] == "token" for e in eventos)
+    assert roteamento["tokens_entrada"] > 0 and roteamento["tokens_saida"] > 0
+
+
+class LLMSemStream(LLMSimulado):
+    def _stream(self, *args, **kwargs):
+        raise AssertionError("stream sem consumidor")
+
+    async def _astream(self, *args, **kwargs):
+        raise AssertionError("stream sem consumidor")
+        yield
+
+
+def test_invoke_generates_the_reply_without_streaming(llm_simulado):
+    workflow = _workflow(_roteador_redacao(LLMSemStream))
+
+    resultados = [
+        workflow.processar_consulta(HORARIO, "sync"),
+        asyncio.run(workflow.aprocessar_consulta(HORARIO, "async")),
+    ]
+
+    for resultado in resultados:
+        assert resultado["roteamento"]["nivel"] == "local"
+        assert resultado["roteamento"]["motivos_fallback"] == []
+
+
+def test_pooled_openai_client_requests_usage_when_streaming(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-teste")
+
+    llm = pool_llm.obter_llm("modelo-teste-stream", 0.0)
+
+    assert llm.stream_usage is True
+
+
+def test_template_response_is_sent_whole_not_as_tokens(llm_simulado):
+    eventos = list(_workflow().stream_consulta(HORARIO))
+
+    assert not any(e["evento"] == "token" for e in eventos)
+    respostas = [e for e in eventos if e["evento"] == "resposta"]
+    assert [e["valor"] for e in respostas] == [eventos[-1]["resultado"]["response"]]
+
+
+def _endpoint_fora_do_ar(prompt):
+    raise ConnectionError("endpoint local indisponível")
+
+
+@pytest.mark.parametrize(
+    "responder_local, motivo",
+    [
+        (lambda prompt: "Ok.", "local: resposta curta"),
+        (
+            lambda prompt: "Não tenho certeza do horário de atendimento.",
+            "local: resposta incerta",
+        ),
+        (
+            lambda prompt: "Abrimos de Segunda a Sexta, em horário comercial.",
+            "local: fatos ausentes: 18, 8",
+        ),
+        (_endpoint_fora_do_ar, "erro: ConnectionError"),
+    ],
+)
+def test_rejected_local_answer_falls_back_to_the_large_model(responder_local, motivo):
+    roteador = RoteadorModelos(
+        llms={
+            "local": LLMSimulado(responder=responder_local),
+            "grande": LLMSimulado(responder=responder_redacao()),
+        }
+    )
+
+    texto, registro = roteador.redigir("agent_geral", HORARIO, INFORMACAO)
+
+    assert texto == f"Olá! Obrigado pelo contato. {INFORMACAO}"
+    assert registro["nivel"] == "grande"
+    assert registro["modelo"] == NIVEIS_PADRAO["grande"]["modelo"]
+    assert registro["niveis_tentados"] == ["local", "grande"]
+    assert registro["motivos_fallback"] == [motivo]
+
+
+def test_no_level_passing_keeps_the_template():
+    roteador = RoteadorModelos(
+        llms={nivel: LLMSimulado(responder=lambda p: "Ok.") for nivel in NIVEIS_PADRAO}
+    )
+
+    texto, registro = roteador.redigir("agent_geral", HORARIO, INFORMACAO)
+
+    assert texto is None
+    assert registro["nivel"] is None
+    assert registro["niveis_tentados"] == ["local", "grande"]
+
+
+def test_processar_consulta_returns_the_routing_record(llm_simulado):
+    resultado = _workflow(_roteador_redacao()).processar_consulta(HORARIO)
+
+    roteamento = resultado["roteamento"]
+    assert roteamento["rota"] == "agent_geral"
+    assert roteamento["nivel"] == "local"
+    assert roteamento["niveis_tentados"] == ["local"]
+    assert roteamento["motivos_fallback"] == []
+    assert roteamento["tokens_entrada"] > 0 and roteamento["tokens_saida"] > 0
+    # Modelo local sem custo por token
+    assert roteamento["custo_usd"] == 0.0
+    assert resultado["response"].startswith("Olá! Obrigado pelo contato.")
+
+
+def test_large_model_cost_follows_the_token_usage():
+    roteador = RoteadorModelos(
+        llms={"grande": LLMSimulado(responder=responder_redacao())}
+    )
+
+    _, registro = roteador.redigir("agent_financeiro", "Quero reembolso", INFORMACAO)
+
+    grande = NIVEIS_PADRAO["grande"]
+    esperado = (
+        registro["tokens_entrada"] * grande["custo_entrada"]
+        + registro["tokens_saida"] * grande["custo_saida"]
+    ) / 1_000_000
+    assert registro["custo_usd"] == pytest.approx(esperado)
+    assert registro["custo_usd"] > 0
+
+
+def test_criar_workflow_reads_the_router_flag_at_call_time(monkeypatch):
+    monkeypatch.setattr(workflow_suporte, "_workflows", {})
+
+    monkeypatch.setenv("ROTEADOR_MODELOS", "1")
+    com_roteador = criar_workflow(usar_cache=False)
+    monkeypatch.delenv("ROTEADOR_MODELOS")
+    sem_roteador = criar_workflow(usar_cache=False)
+
+    assert isinstance(com_roteador.roteador, RoteadorModelos)
+    assert sem_roteador.roteador is None
+    assert criar_workflow(usar_cache=False, usar_roteador=True) is com_roteador
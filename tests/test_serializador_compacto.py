@@ -0,0 +1,103 @@
+import sqlite3
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from memory.retencao_checkpoints import SqliteSaverComRetencao
+from memory.serializador_compacto import SerializadorCompacto, caminho_mensagens
+
+
+def _saver(pasta, **kwargs):
+    caminho = str(pasta / "conversas.db")
+    conn = sqlite3.connect(caminho, check_same_thread=False)
+    serde = SerializadorCompacto(caminho_mensagens(caminho))
+    return SqliteSaverComRetencao(
+        conn, serde=serde, intervalo_compactacao=10**9, **kwargs
+    )
+
+
+def _gravar(saver, thread_id, mensagens):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": mensagens}
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, checkpoint, {"step": 1}, {})
+
+
+def _mensagens_gravadas(saver):
+    conn = saver.serde.mensagens.conn
+    return conn.execute("SELECT COUNT(*) FROM mensagens_checkpoint").fetchone()[0]
+
+
+def test_messages_of_expired_threads_are_deleted(tmp_path):
+    saver = _saver(tmp_path, ttl_segundos=0)
+    for i in range(1000):
+        _gravar(saver, f"t{i}", [HumanMessage(f"consulta {i}")])
+    assert _mensagens_gravadas(saver) == 1000
+
+    # Primeira compactação só marca as órfãs; a segunda apaga
+    assert saver.compactar_agora()["mensagens_orfas"] == 0
+    assert saver.compactar_agora()["mensagens_orfas"] == 1000
+    assert _mensagens_gravadas(saver) == 0
+
+
+def test_messages_still_referenced_are_kept(tmp_path):
+    saver = _saver(tmp_path, max_checkpoints=1, ttl_segundos=None)
+    historico = []
+    for i in range(5):
+        historico = historico + [HumanMessage(f"pergunta {i}"), AIMessage(f"resp {i}")]
+        config = _gravar(saver, "conversa", historico)
+    antiga = _gravar(saver, "outra", [HumanMessage("só aqui")])
+    _gravar(saver, "outra", [HumanMessage("substituída")])
+
+    saver.compactar_agora()
+    saver.compactar_agora()
+
+    assert _mensagens_gravadas(saver) == 10 + 1
+    mensagens = saver.get_tuple(config).checkpoint["channel_values"]["messages"]
+    assert [m.content for m in mensagens] == [m.content for m in historico]
+    assert saver.get_tuple(antiga) is None
+
+
+def test_message_reused_after_deletion_is_written_again(tmp_path):
+    saver = _saver(tmp_path, ttl_segundos=0)
+    mensagem = HumanMessage("mesma mensagem")
+    _gravar(saver, "antiga", [mensagem])
+    saver.compactar_agora()
+    saver.compactar_agora()
+    assert _mensagens_gravadas(saver) == 0
+
+    # O serializador lembrava da chave: precisa gravar a mensagem de novo
+    saver.ttl_segundos = None
+    config = _gravar(saver, "nova", [mensagem])
+    outro = _saver(tmp_path)
+    lida = outro.get_tuple(config).checkpoint["channel_values"]["messages"]
+    assert lida[0].content == "mesma mensagem"
+
+
+def test_other_serializers_drop_their_cache_after_a_cleanup(tmp_path):
+    saver = _saver(tmp_path, ttl_segundos=0)
+    outro = _saver(tmp_path, ttl_segundos=None)
+    mensagem = HumanMessage("compartilhada")
+    _gravar(outro, "antiga", [mensagem])
+    saver.compactar_agora()
+    saver.compactar_agora()
+
+    config = _gravar(outro, "nova", [mensagem])
+    lida = saver.get_tuple(config).checkpoint["channel_values"]["messages"]
+    assert lida[0].content == "compartilhada"
+
+
+def test_one_commit_and_one_generation_check_per_checkpoint(tmp_path):
+    saver = _saver(tmp_path)
+    comandos = []
+    saver.serde.mensagens.conn.set_trace_callback(comandos.append)
+
+    historico = [HumanMessage(f"mensagem {i}") for i in range(10)]
+    config = _gravar(saver, "conversa", historico)
+    saver.put_writes(config, [("messages", historico[-1:])], task_id="t1")
+    saver.put_writes(config, [("messages", [AIMessage("nova")])], task_id="t2")
+
+    assert sum(c.strip().upper() == "COMMIT" for c in comandos) == 2
+    assert sum("user_version" in c for c in comandos) == 1
+    lidas = saver.get_tuple(config).checkpoint["channel_values"]["messages"]
+    assert [m.content for m in lidas] == [m.content for m in historico]
@@ -0,0 +1,75 @@
+from memory.store_sqlite import StoreSQLite
+from memory.workflow_memory import criar_store
+
+
+def _store(tmp_path):
+    return StoreSQLite(str(tmp_path / "memoria.db"))
+
+
+def test_items_survive_reopening_the_file(tmp_path):
+    store = _store(tmp_path)
+    store.put(("clientes", "c1"), "preferencias", {"canal": "email"})
+    store.fechar()
+
+    item = _store(tmp_path).get(("clientes", "c1"), "preferencias")
+
+    assert item.value == {"canal": "email"}
+    assert item.namespace == ("clientes", "c1")
+
+
+def test_delete_removes_the_item(tmp_path):
+    store = _store(tmp_path)
+    store.put(("clientes", "c1"), "nota", {"texto": "vip"})
+
+    store.delete(("clientes", "c1"), "nota")
+
+    assert store.get(("clientes", "c1"), "nota") is None
+
+
+def test_prefix_search_does_not_leak_into_sibling_namespaces(tmp_path):
+    store = _store(tmp_path)
+    store.put(("clientes", "1"), "a", {"plano": "pro"})
+    store.put(("clientes", "1", "tickets"), "b", {"plano": "pro"})
+    store.put(("clientes", "10"), "c", {"plano": "pro"})
+    store.put(("clientes", "1"), "d", {"plano": "basico"})
+
+    encontrados = store.search(("clientes", "1"), limit=10)
+    filtrados = store.search(("clientes", "1"), filter={"plano": "pro"})
+
+    assert sorted(i.key for i in encontrados) == ["a", "b", "d"]
+    assert sorted(i.key for i in filtrados) == ["a", "b"]
+
+
+def test_list_namespaces_by_prefix_and_depth(tmp_path):
+    store = _store(tmp_path)
+    for namespace in [("clientes", "1"), ("clientes", "1", "tickets"), ("outros",)]:
+        store.put(namespace, "x", {})
+
+    assert store.list_namespaces(prefix=("clientes",)) == [
+        ("clientes", "1"),
+        ("clientes", "1", "tickets"),
+    ]
+    assert store.list_namespaces(max_depth=1) == [("clientes",), ("outros",)]
+
+
+def test_batch_helpers_write_and_read_many_items(tmp_path):
+    store = _store(tmp_path)
+    itens = {f"k{i}": {"valor": i} for i in range(50)}
+
+    store.salvar_em_lote(("lote",), itens)
+    lidos = store.buscar_em_lote(("lote",), ["k0", "k49", "ausente"])
+
+    assert lidos["k0"].value == {"valor": 0}
+    assert lidos["k49"].value == {"valor": 49}
+    assert lidos["ausente"] is None
+
+
+def test_semantic_search_ranks_the_closest_item_first(tmp_path):
+    store = criar_store(str(tmp_path / "memoria.db"), indexar_vetores=True)
+    store.put(("faq",), "senha", {"texto": "como redefinir a senha de acesso"})
+    store.put(("faq",), "frete", {"texto": "prazo de entrega e frete"})
+
+    resultados = store.search(("faq",), query="esqueci minha senha de acesso")
+
+    assert resultados[0].key == "senha"
+    assert resultados[0].score > resultados[1].score